@@ -0,0 +1,85 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+# Import the dashboard schemas and the counters they are read from
+from Admin import schemas
+from Department import crud as dept_crud
+from Grievances import history
+from Grievances.models import GrievanceStatus
+from Grievances.stats import grievance_stats
+from Grievances.sla import sla_monitor
+from Grievances.ticket_cache import ticket_cache
+from User.models import User
+from database import get_db, run_db
+from config import SLA_MONITOR_ENABLED
+from dependencies import RoleChecker
+from roles import RoleEnum
+
+# Only admins and super_admins see the dashboard
+admin_only = RoleChecker([RoleEnum.admin, RoleEnum.super_admin])
+
+# Create an API router for the admin dashboard
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+# Function to shape the in-memory counters for the response; one department query for the names
+async def _dashboard(db) -> schemas.DashboardStats:
+    snapshot = grievance_stats.snapshot()
+    names = await run_db(db, dept_crud.get_department_names)
+    departments = [
+        schemas.DepartmentStats(name=names.get(department_id), **counts)
+        for department_id, counts in sorted(snapshot["departments"].items(), key=lambda item: item[0] or 0)
+        if department_id is not None
+    ]
+    by_status = {status.value: sum(getattr(d, status.value) for d in departments) for status in GrievanceStatus}
+    return schemas.DashboardStats(
+        total=sum(by_status.values()),
+        by_status=by_status,
+        departments=departments,
+        employees=snapshot["employees"],
+        resolution=snapshot["resolution"],
+        rebuilt_at=snapshot["rebuilt_at"],
+    )
+
+# Endpoint returning grievance counts per department, open tickets per employee and resolution times
+# Served from incrementally maintained counters: O(departments + employees), independent of table size
+@router.get("/stats", response_model=schemas.DashboardStats)
+async def dashboard_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(admin_only),
+):
+    return await _dashboard(db)
+
+# Endpoint recomputing the counters from the grievances table (repair after manual DB edits)
+@router.post("/stats/recompute", response_model=schemas.DashboardStats)
+async def recompute_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(admin_only),
+):
+    await run_db(db, grievance_stats.rebuild)
+    await run_db(db, sla_monitor.rebuild)
+    ticket_cache.clear()  # Cached tickets may predate the same edits
+    return await _dashboard(db)
+
+# Endpoint measuring SLA figures from the grievance event log for grievances created in [created_from, created_to)
+# Cost grows with the grievances in the window, not with the size of the tables
+@router.get("/sla", response_model=schemas.SLAReport)
+async def sla_report(
+    created_from: datetime,
+    created_to: datetime,
+    department_id: int | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(admin_only),
+):
+    if created_to <= created_from:
+        raise HTTPException(status_code=400, detail="created_to must be after created_from")
+    report = await run_db(db, history.sla_report, created_from, created_to, department_id)
+    return schemas.SLAReport(created_from=created_from, created_to=created_to, department_id=department_id,
+                             **report)
+
+# Endpoint returning the pending grievances past their SLA threshold per department, from the SLA monitor's
+# counters (no table scan), and what the monitor escalated so far
+@router.get("/sla/breaches", response_model=schemas.SLABreaches)
+async def sla_breaches(current_user: User = Depends(admin_only)):
+    return schemas.SLABreaches(enabled=SLA_MONITOR_ENABLED, **sla_monitor.snapshot())
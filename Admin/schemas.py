@@ -0,0 +1,70 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+# Time from created_at to resolved_at for closed grievances
+class ResolutionTimes(BaseModel):
+    count: int = 0                         # Grievances resolved
+    mean_seconds: Optional[float] = None   # Mean time to resolution
+    p95_seconds: Optional[float] = None    # 95th percentile (accurate to one histogram bucket)
+
+# Counters for one department
+class DepartmentStats(BaseModel):
+    department_id: int
+    name: Optional[str] = None   # Department name
+    total: int = 0               # All grievances of the department
+    pending: int = 0
+    solved: int = 0
+    not_solved: int = 0
+    unassigned: int = 0          # Pending grievances nobody is assigned to
+    resolution: ResolutionTimes
+
+# Response of GET /admin/sla: time from creation to first assignment, first response (comment by anyone
+# but the owner) and resolution, for the grievances created in the requested window
+class SLAReport(BaseModel):
+    created_from: datetime
+    created_to: datetime
+    department_id: Optional[int] = None
+    grievances: int                    # Grievances created in the window
+    unassigned: int                    # ... never assigned so far
+    unanswered: int                    # ... without a response so far
+    unresolved: int                    # ... not resolved so far
+    to_assignment: ResolutionTimes
+    to_first_response: ResolutionTimes
+    to_resolution: ResolutionTimes
+
+# Pending grievances of one department past its SLA threshold
+class DepartmentBreaches(BaseModel):
+    department_id: Optional[int] = None
+    threshold_hours: float
+    breached: int
+
+# Outcome of the SLA monitor's last check
+class SLACycle(BaseModel):
+    at: datetime
+    escalated: int                     # Grievances escalated by that check
+    elapsed_seconds: float
+
+# Response of GET /admin/sla/breaches, read from the SLA monitor's counters
+class SLABreaches(BaseModel):
+    enabled: bool                      # Whether the monitor thread runs (SLA_MONITOR_ENABLED)
+    action: str                        # flag or reassign
+    threshold_hours: float             # Default threshold; overrides are listed per department
+    breached: int                      # Pending grievances past their threshold
+    departments: List[DepartmentBreaches]
+    escalated: int                     # Grievances escalated since the process started
+    last_cycle: Optional[SLACycle] = None
+
+# Open (pending) grievances held by one employee
+class EmployeeLoad(BaseModel):
+    employee_id: int
+    open: int
+
+# Response of GET /admin/stats
+class DashboardStats(BaseModel):
+    total: int                         # All grievances
+    by_status: dict                    # Status -> grievances, across departments
+    departments: List[DepartmentStats]
+    employees: List[EmployeeLoad]
+    resolution: ResolutionTimes        # Across departments
+    rebuilt_at: Optional[datetime]     # When the counters were last recomputed from the database
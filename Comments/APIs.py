@@ -1,28 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from Comments import crud, schemas, models
-from database import get_db
+from database import get_db, release_db, run_db
 from dependencies import get_current_active_user
 from roles import RoleEnum as Role
+from config import COMMENT_GROUP_COMMIT, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from Comments.writer import comment_writer
+from pagination import NEXT_CURSOR_HEADER, decode_id_cursor, encode_id_cursor
 
 # Initialize FastAPI router with prefix and tags for comment-related endpoints
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
 @router.post("/", response_model=schemas.Comment)
-def create_comment(comment: schemas.CommentCreate, db: Session = Depends(get_db),
+async def create_comment(comment: schemas.CommentCreate, db: Session = Depends(get_db),
                   current_user = Depends(get_current_active_user)):
     # Endpoint to create a new comment, restricted to specific roles
     # Check if the current user has a role allowed to comment (user, employee, admin, super_admin)
     if current_user.role not in [Role.user.value, Role.employee.value, Role.admin.value, Role.super_admin.value]:
         # Raise an HTTP 403 error if the user is not authorized
         raise HTTPException(status_code=403, detail="Not authorized to comment")
+    # With group commit, the comment is stored together with others posted in the same few milliseconds
+    if COMMENT_GROUP_COMMIT:
+        # The writer thread needs a pooled connection; do not hold one while waiting for it
+        await release_db(db)
+        return await comment_writer.create(comment)
     # Call the CRUD function to create the comment in the database
-    return crud.create_comment(db, comment)
+    return await run_db(db, crud.create_comment, comment)
+
+# Function to fetch one page of a thread and set the cursor header
+# The X-Next-Cursor header always points just past the last comment delivered (or echoes the request's
+# cursor when nothing is new), so clients can keep polling with it and only receive new comments
+async def _comment_page(db, response: Response, grievance_id: int, cursor: Optional[str],
+                        since: Optional[datetime], limit: int, expand: bool = False):
+    after = decode_id_cursor(cursor) if cursor else None
+    rows = await run_db(db, crud.get_comments_by_grievance, grievance_id, expand=expand,
+                        after=after, since=since, limit=limit)
+    if rows:
+        response.headers[NEXT_CURSOR_HEADER] = encode_id_cursor(rows[-1].id)
+    elif cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return rows
 
 @router.get("/grievance/{grievance_id}", response_model=List[schemas.Comment])
-def get_comments(grievance_id: int, db: Session = Depends(get_db),
+async def get_comments(grievance_id: int,
+                response: Response,
+                cursor: Optional[str] = None,  # X-Next-Cursor from the previous page / poll
+                since: Optional[datetime] = None,  # Only comments posted after this time
+                limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),  # Page size
+                db: Session = Depends(get_db),
+                current_user = Depends(get_current_active_user)):
+    # Endpoint to retrieve the comments of a grievance, oldest first (in id order), one page at a time
+    return await _comment_page(db, response, grievance_id, cursor, since, limit)
+
+@router.get("/grievance/{grievance_id}/expanded", response_model=List[schemas.CommentExpanded])
+async def get_comments_expanded(grievance_id: int,
+                response: Response,
+                cursor: Optional[str] = None,
+                since: Optional[datetime] = None,
+                limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                db: Session = Depends(get_db),
                 current_user = Depends(get_current_active_user)):
-    # Endpoint to retrieve all comments associated with a specific grievance ID
-    # Call the CRUD function to fetch comments for the given grievance
-    return crud.get_comments_by_grievance(db, grievance_id)
+    # Endpoint to retrieve the comments of a grievance with author email and ticket ID
+    # Related rows are eager-loaded, so each page costs a fixed number of queries
+    return await _comment_page(db, response, grievance_id, cursor, since, limit, expand=True)
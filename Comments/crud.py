@@ -1,28 +1,97 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
 from . import models, schemas
 from datetime import datetime
+from Grievances import history
+from Grievances.models import ArchivedGrievance, Grievance, GrievanceEventKind
+from events import hub
+
+# Raised when a comment is posted to a grievance that is archived (answered 409) or does not exist (404)
+class GrievanceClosedForComments(Exception):
+    def __init__(self, grievance_id: int, archived: bool):
+        super().__init__(grievance_id)
+        self.grievance_id = grievance_id
+        self.archived = archived
+
+# Function to find which of the given grievances are live (still in the hot table) and so take comments.
+# An archived grievance's thread and timeline are read from the archive, so a comment stored in the hot
+# tables would hide its thread and never be archived. Called after the comments were flushed: on SQLite the
+# flush took the write lock, so the archiver cannot move any of them before the caller commits
+def live_grievances(db: Session, grievance_ids) -> set:
+    return set(db.scalars(select(Grievance.id).where(Grievance.id.in_(set(grievance_ids)))))
+
+# Function to build the error for a comment on a grievance that is not live
+def closed_for_comments(db: Session, grievance_id: int) -> GrievanceClosedForComments:
+    return GrievanceClosedForComments(grievance_id, db.get(ArchivedGrievance, grievance_id) is not None)
 
 # Function to create a new comment on a grievance
 def create_comment(db: Session, comment: schemas.CommentCreate):
     # Create a Comment instance using data from the input schema
-    # Add a timestamp for when the comment was created
-    db_comment = models.Comment(**comment.dict(), timestamp=datetime.now())
+    # Add a timestamp (UTC, like every other table) for when the comment was created
+    now = datetime.utcnow()
+    db_comment = models.Comment(**comment.dict(), timestamp=now)
     
     # Add the new comment to the current database session
     db.add(db_comment)
+    db.flush()
+    # Only live grievances take comments
+    if not live_grievances(db, [db_comment.grievance_id]):
+        db.rollback()
+        raise closed_for_comments(db, db_comment.grievance_id)
+
+    # Record it in the grievance's lifecycle log, in the same transaction
+    history.record(db, db_comment.grievance_id, GrievanceEventKind.commented, now,
+                   actor_id=db_comment.user_id, value=db_comment.id)
     
     # Commit the session to save the comment in the database
     db.commit()
     
     # Refresh the instance to load any updated/generated fields
     db.refresh(db_comment)
+
+    # Notify the grievance's owner and assignee (and admins) if anyone is listening
+    if hub.active:
+        grievance = db.get(Grievance, db_comment.grievance_id)
+        hub.publish("comment_created", schemas.Comment.from_orm(db_comment).dict(),
+                    [grievance.user_id, grievance.assigned_to] if grievance else [])
     
     # Return the newly created comment object
     return db_comment
 
 # Function to fetch all comments associated with a specific grievance
-def get_comments_by_grievance(db: Session, grievance_id: int):
+# Comments are returned in id order; 'after' is the id of the last comment already seen and 'since' a plain
+# timestamp, so a polling client only receives what is new. Polling is keyed on the id rather than the
+# timestamp: SQLite hands out ids in commit order, while a timestamp taken before the commit can be
+# older than that of a comment already delivered, which a timestamp cursor would then skip for good
+def get_comments_by_grievance(
+    db: Session,
+    grievance_id: int,
+    expand: bool = False,
+    after: int | None = None,
+    since: datetime | None = None,
+    limit: int | None = None,
+):
     grievance_id = int(grievance_id)  # Ensure grievance_id is treated as an integer
     
-    # Query and return all comments linked to the specified grievance
-    return db.query(models.Comment).filter(models.Comment.grievance_id == grievance_id).all()
+    # Query and return the comments linked to the specified grievance
+    rows = _thread(db, models.Comment, grievance_id, expand, after, since, limit)
+    # Archived grievances took their comments to the archive; only an empty page pays for the extra lookup
+    if not rows and db.get(ArchivedGrievance, grievance_id) is not None:
+        rows = _thread(db, models.ArchivedComment, grievance_id, expand, after, since, limit)
+    return rows
+
+# Function to read one page of a thread from `comments` or `comments_archive` (same columns and indexes)
+def _thread(db: Session, C, grievance_id: int, expand: bool, after, since, limit):
+    query = db.query(C).filter(C.grievance_id == grievance_id)
+    if after is not None:
+        # Seeks inside the (grievance_id, id) index
+        query = query.filter(C.id > after)
+    if since is not None:
+        query = query.filter(C.timestamp > since)
+    if expand:
+        # Grievance in the same statement, authors in one IN-query (2 statements in total)
+        query = query.options(joinedload(C.grievance), selectinload(C.user))
+    query = query.order_by(C.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
@@ -0,0 +1,23 @@
+# Comments/migrations.py
+# One-time data migrations of the comments table, applied at startup (see database.run_once)
+
+import time  # Local UTC offset, for databases without SQLite's 'utc' modifier
+from datetime import timedelta
+
+from sqlalchemy import func, literal, update
+
+from .models import Comment
+
+# Name recorded in schema_migrations once comment timestamps are in UTC
+TIMESTAMPS_TO_UTC = "comment_timestamps_utc"
+
+
+# Function to convert the timestamps of existing comments from the server's local time (how comments were
+# stamped before) to UTC, like every other table. SQLite's 'utc' modifier converts each value with the offset
+# of its own date (DST included) and the fraction is kept as stored; other databases get the current offset
+def timestamps_to_utc(conn):
+    if conn.dialect.name == "sqlite":
+        utc = func.strftime("%Y-%m-%d %H:%M:%S", Comment.timestamp, "utc").concat(func.substr(Comment.timestamp, 20))
+    else:
+        utc = Comment.timestamp - literal(timedelta(seconds=time.localtime().tm_gmtoff))
+    conn.execute(update(Comment).where(Comment.timestamp.isnot(None)).values(timestamp=utc))
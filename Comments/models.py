@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -16,10 +16,52 @@ class Comment(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     # Text content of the comment
     content = Column(String)
-    # Timestamp for when the comment was created, defaults to current UTC time
+    # Timestamp for when the comment was created, in UTC
     timestamp = Column(DateTime, default=datetime.utcnow)
     
     # Define relationship to the Grievance model for the associated grievance
     grievance = relationship("Grievance")
     # Define relationship to the User model for the comment creator
     user = relationship("User")
+
+    # Values read by the expanded response schema (load the relationships eagerly to avoid N+1 queries)
+    @property
+    def author_email(self):
+        return self.user.email if self.user else None
+
+    @property
+    def ticket_id(self):
+        return self.grievance.ticket_id if self.grievance else None
+
+    # Thread reads seek by grievance and walk its comments in id order, without scanning the table
+    __table_args__ = (
+        Index("ix_comments_grievance_id", "grievance_id", "id"),
+    )
+
+
+# Comments of archived grievances, moved with them by the archival job (see Grievances/archive.py)
+# Same columns and IDs as `comments`; they are no longer part of the full-text index
+class ArchivedComment(Base):
+    __tablename__ = "comments_archive"
+
+    id = Column(Integer, primary_key=True)
+    grievance_id = Column(Integer, ForeignKey("grievances_archive.id"))
+    user_id = Column(Integer, ForeignKey("users.id"))
+    content = Column(String)
+    timestamp = Column(DateTime)
+
+    grievance = relationship("ArchivedGrievance")
+    user = relationship("User")
+
+    @property
+    def author_email(self):
+        return self.user.email if self.user else None
+
+    @property
+    def ticket_id(self):
+        return self.grievance.ticket_id if self.grievance else None
+
+    # Threads are read the same way as live ones, by grievance in id order
+    __table_args__ = (
+        Index("ix_comments_archive_grievance_id", "grievance_id", "id"),
+    )
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 # Base schema containing shared fields for all comment-related operations
 class CommentBase(BaseModel):
@@ -18,3 +19,9 @@ class Comment(CommentBase):
 
     class Config:
         orm_mode = True        # Enables ORM compatibility (e.g., with SQLAlchemy models)
+        from_attributes = True  # pydantic 2 name of orm_mode, needed by from_orm()
+
+# Expanded schema for reading a comment together with its author and ticket
+class CommentExpanded(Comment):
+    author_email: Optional[str] = None  # Email of the comment's author
+    ticket_id: Optional[str] = None     # Ticket ID of the grievance the comment belongs to
@@ -0,0 +1,154 @@
+# Comments/writer.py
+# Group-commit writer for comment creation: one thread collects the comments posted within a short
+# window (or up to a row limit) and stores them in a single transaction, so a burst costs one commit
+# (one fsync on SQLite) instead of one per comment. Callers wait until their batch is committed,
+# so a comment is only acknowledged once it is as durable as with the per-request write path
+
+import asyncio  # Awaiting a commit from the event loop
+import queue  # Hand-off from request handlers to the writer thread
+import threading  # The writer thread and its start-up lock
+import time  # Batch window deadlines
+from concurrent.futures import Future  # Resolved with the stored comment once its batch commits
+from datetime import datetime
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from config import COMMENT_BATCH_MAX_ROWS, COMMENT_BATCH_WINDOW_MS, COMMENT_WRITER_QUEUE_LIMIT
+from database import SessionLocal
+from events import hub
+from Grievances import history
+from Grievances.models import Grievance, GrievanceEventKind
+from . import models, schemas
+from .crud import closed_for_comments, live_grievances
+
+
+# Raised when COMMENT_WRITER_QUEUE_LIMIT comments are already waiting to be written
+class CommentWriterSaturated(Exception):
+    pass
+
+
+class CommentWriter:
+    def __init__(self, window_ms: float = COMMENT_BATCH_WINDOW_MS, max_rows: int = COMMENT_BATCH_MAX_ROWS,
+                 queue_limit: int = COMMENT_WRITER_QUEUE_LIMIT, session_factory=SessionLocal):
+        self.window = window_ms / 1000
+        self.max_rows = max_rows
+        self._queue = queue.Queue(maxsize=queue_limit)  # (CommentCreate, timestamp, Future)
+        self._session_factory = session_factory
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0  # Transactions committed
+        self.written = 0  # Comments stored
+
+    # Function to queue a comment; the future resolves with the stored Comment (id and timestamp set)
+    def submit(self, comment: schemas.CommentCreate) -> Future:
+        self._start()
+        future = Future()
+        try:
+            # Timestamped (UTC) on arrival, not when the batch happens to run; the thread cursor is keyed on
+            # the id, so comments timestamped out of commit order are still delivered to pollers
+            self._queue.put_nowait((comment, datetime.utcnow(), future))
+        except queue.Full:
+            raise CommentWriterSaturated()
+        return future
+
+    # Async version of submit for request handlers
+    async def create(self, comment: schemas.CommentCreate) -> models.Comment:
+        return await asyncio.wrap_future(self.submit(comment))
+
+    # Function to start the writer thread on first use
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="comment-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Keep collecting until the window closes or the batch is full
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # Requests cancelled while waiting (client gone) are dropped; the others can no longer be cancelled
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if batch:
+                self._write(batch)
+
+    # Function to store one batch; if the transaction fails, every comment is retried on its own
+    # so one bad row only fails its own request
+    def _write(self, batch: list):
+        db = self._session_factory(expire_on_commit=False)
+        try:
+            try:
+                stored = self._insert(db, batch)
+            except SQLAlchemyError:
+                db.rollback()
+                stored = []
+                for item in batch:
+                    try:
+                        stored += self._insert(db, [item])
+                    except SQLAlchemyError as exc:
+                        db.rollback()
+                        item[2].set_exception(exc)
+            # Callers are answered as soon as their rows are committed, before events go out
+            for comment, future in stored:
+                future.set_result(comment)
+            if stored and hub.active:
+                self._publish(db, [comment for comment, _ in stored])
+        except Exception as exc:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        finally:
+            db.close()
+
+    # Function to insert comments in one transaction; returns (Comment, Future) pairs of the stored ones
+    # Comments on grievances that are not live (see crud.live_grievances) are taken out again before the
+    # commit, and their requests fail once it succeeded
+    def _insert(self, db: Session, batch: list) -> list:
+        comments = [models.Comment(**comment.dict(), timestamp=timestamp) for comment, timestamp, _ in batch]
+        db.add_all(comments)
+        db.flush()
+        live = live_grievances(db, [comment.grievance_id for comment in comments])
+        stored, rejected = [], []
+        for comment, (_, _, future) in zip(comments, batch):
+            if comment.grievance_id in live:
+                stored.append((comment, future))
+            else:
+                db.delete(comment)
+                rejected.append((comment.grievance_id, future))
+        at = datetime.utcnow()
+        for comment, _ in stored:
+            history.record(db, comment.grievance_id, GrievanceEventKind.commented, at,
+                           actor_id=comment.user_id, value=comment.id)
+        db.commit()
+        self.batches += 1
+        self.written += len(stored)
+        for grievance_id, future in rejected:
+            future.set_exception(closed_for_comments(db, grievance_id))
+        return stored
+
+    # Function to notify owners and assignees (and admins), with one grievance query per batch
+    def _publish(self, db: Session, comments: list):
+        grievance_ids = {comment.grievance_id for comment in comments}
+        recipients = {
+            row.id: [row.user_id, row.assigned_to]
+            for row in db.query(Grievance.id, Grievance.user_id, Grievance.assigned_to)
+                         .filter(Grievance.id.in_(grievance_ids))
+        }
+        for comment in comments:
+            hub.publish("comment_created", schemas.Comment.from_orm(comment).dict(),
+                        recipients.get(comment.grievance_id, []))
+
+
+# Shared writer used by POST /comments/ when COMMENT_GROUP_COMMIT is enabled
+comment_writer = CommentWriter()
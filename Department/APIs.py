@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 from Department import crud, schemas, models
-from database import get_db
+from database import get_db, run_db
 from dependencies import get_current_active_user, RoleChecker
 from roles import RoleEnum as Role
 from User.models import User
 from Department.models import Department
 from Department.schemas import DepartmentOut, DepartmentCreate
+import response_cache
+from config import FAST_JSON
 
 # Initialize FastAPI router with prefix and tags for department-related endpoints
 router = APIRouter(prefix="/departments", tags=["Departments"])
@@ -16,20 +18,12 @@ router = APIRouter(prefix="/departments", tags=["Departments"])
 role_admin = RoleChecker([Role.admin, Role.super_admin])
 
 @router.post("/", response_model=schemas.DepartmentOut)
-def create_department(dept: schemas.DepartmentCreate, db: Session = Depends(get_db),
+async def create_department(dept: schemas.DepartmentCreate, db: Session = Depends(get_db),
                      current_user: User = Depends(role_admin)):
     # Endpoint to create a new department, restricted to admin/super_admin
     try:
-        # Create a new Department instance with the provided name
-        new_dept = Department(name=dept.name)
-        # Add the department to the database session
-        db.add(new_dept)
-        # Commit the transaction to save the department
-        db.commit()
-        # Refresh the department object to get updated data from the database
-        db.refresh(new_dept)
-        # Return the created department
-        return new_dept
+        # Create, commit and refresh the department through the CRUD layer
+        return await run_db(db, crud.create_department, dept)
     except Exception as e:
         # Log the error for debugging purposes
         print("create_department error:", repr(e))
@@ -37,12 +31,18 @@ def create_department(dept: schemas.DepartmentCreate, db: Session = Depends(get_
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", response_model=List[schemas.Department])
-def read_departments(db: Session = Depends(get_db),
+async def read_departments(request: Request, db: Session = Depends(get_db),
                      current_user: User = Depends(get_current_active_user)):
     # Endpoint to retrieve all departments, accessible to admin, super_admin, and employees
     # Restrict access: only admin, super_admin, and employees can view departments
     if current_user.role not in [Role.admin.value, Role.employee.value, Role.super_admin.value]:
         # Raise an HTTP 403 error if the user is not authorized
         raise HTTPException(status_code=403, detail="Not authorized to view departments")
-    # Call the CRUD function to fetch all departments from the database
-    return crud.get_departments(db)
+    # Fetch and serialize all departments only when the list changed since it was last cached;
+    # clients sending the ETag back in If-None-Match get 304 without a body
+    async def render():
+        if FAST_JSON:
+            return response_cache.dump_rows(await run_db(db, crud.get_department_rows)), {}
+        departments = await run_db(db, crud.get_departments)
+        return response_cache.dump_json(List[schemas.Department], departments), {}
+    return await response_cache.conditional_response(request, response_cache.DEPARTMENTS, "all", render)
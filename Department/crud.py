@@ -1,5 +1,7 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from . import models, schemas
+import response_cache
 
 # Function to create a new department
 def create_department(db: Session, department: schemas.DepartmentCreate):
@@ -14,6 +16,7 @@ def create_department(db: Session, department: schemas.DepartmentCreate):
     
     # Refresh the instance to retrieve updated fields like generated ID
     db.refresh(db_department)
+    response_cache.bump(response_cache.DEPARTMENTS)  # Cached department lists are now stale
     
     # Return the created department object
     return db_department
@@ -22,3 +25,11 @@ def create_department(db: Session, department: schemas.DepartmentCreate):
 def get_departments(db: Session):
     # Query and return all Department records
     return db.query(models.Department).all()
+
+# Function to map department IDs to names without loading ORM objects
+def get_department_names(db: Session) -> dict:
+    return dict(db.query(models.Department.id, models.Department.name).all())
+
+# Function to select departments as plain (name, id) rows, in the field order of schemas.Department (FAST_JSON mode)
+def get_department_rows(db: Session):
+    return db.execute(select(models.Department.name, models.Department.id).order_by(models.Department.id)).all()
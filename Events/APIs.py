@@ -0,0 +1,85 @@
+# Events/APIs.py
+# Live update streams: server-sent events and WebSocket endpoints fed by the in-process event hub
+
+import asyncio  # Waiting on subscriber queues and client disconnects
+
+from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect, HTTPException, status
+from fastapi.responses import StreamingResponse  # Server-sent events response
+from fastapi.security import HTTPAuthorizationCredentials  # Bearer credentials of the SSE request
+
+from config import EVENT_KEEPALIVE_SECONDS
+from database import session_scope
+from dependencies import oauth2_scheme, resolve_principal, RoleChecker
+from events import hub
+from roles import RoleEnum
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+# Function to authenticate a stream with a session that is closed right away,
+# so open streams never hold pooled database connections
+async def _stream_principal(token: str):
+    async with session_scope() as db:
+        return await resolve_principal(token, db)
+
+
+# Endpoint streaming the current user's events as server-sent events
+@router.get("/stream", summary="Server-sent event stream of grievance and comment updates")
+async def event_stream(request: Request, credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme)):
+    current_user = await _stream_principal(credentials.credentials)
+
+    async def body():
+        # Subscribe inside the generator so the finally clause always unsubscribes
+        subscriber = hub.subscribe(current_user.id, current_user.role)
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    payload = await asyncio.wait_for(subscriber.queue.get(), EVENT_KEEPALIVE_SECONDS)
+                    yield f"data: {payload}\n\n"
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"  # Comment line keeps proxies from closing the idle stream
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(body(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# WebSocket endpoint delivering the same events; browsers cannot set headers here,
+# so the access token is passed as the 'token' query parameter
+@router.websocket("/ws")
+async def event_socket(websocket: WebSocket, token: str):
+    try:
+        principal = await _stream_principal(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    subscriber = hub.subscribe(principal.id, principal.role)
+    receiver = asyncio.create_task(websocket.receive())  # Completes when the client disconnects
+    try:
+        while True:
+            getter = asyncio.create_task(subscriber.queue.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                await websocket.send_text(getter.result())
+            else:
+                getter.cancel()
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                receiver = asyncio.create_task(websocket.receive())  # Ignore client messages
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        hub.unsubscribe(subscriber)
+
+
+# Endpoint exposing hub counters (admins only)
+@router.get("/stats", summary="Event hub counters")
+async def event_stats(current_user=Depends(RoleChecker([RoleEnum.admin, RoleEnum.super_admin]))):
+    return hub.stats()
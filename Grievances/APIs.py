@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 
 # Import custom modules for CRUD operations, schemas, and models
-from Grievances import crud, schemas, models
+from Grievances import crud, history, schemas, models
 from User.models import User
-from database import get_db
+from database import get_db, run_db, SessionLocal
 from dependencies import get_current_active_user, RoleChecker
 from roles import RoleEnum
+from config import DEFAULT_PAGE_SIZE, FAST_JSON, MAX_PAGE_SIZE
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from jobs import jobs, JobOut
+from bulk_io import ImportReport, export_response, import_rows
+from Grievances.scheduler import assignment_scheduler
+from Grievances.stats import grievance_stats
+from Grievances.sla import sla_monitor
+from Grievances.ticket_cache import ticket_cache
+import response_cache
 
 # Define role-based access control
 admin_only = RoleChecker([RoleEnum.admin, RoleEnum.super_admin])  # Only admins and super_admins
@@ -19,48 +29,191 @@ router = APIRouter(prefix="/grievances", tags=["Grievances"])
 
 # Endpoint to create a grievance (accessible only by users)
 @router.post("/", response_model=schemas.GrievanceOut)
-def create_grievance(
+async def create_grievance(
     grievance: schemas.GrievanceCreate,                  # Input grievance data
     db: Session = Depends(get_db),                       # Dependency to get DB session
     current_user: User = Depends(user_only),             # Dependency to ensure only users can access
 ):
     # Only users can raise grievances
-    return crud.create_grievance(db, grievance, current_user.id)
+    return await run_db(db, crud.create_grievance, grievance, current_user.id)
 
-# Endpoint to read grievances based on user role
-@router.get("/", response_model=List[schemas.GrievanceOut])
-def read_grievances(
-    db: Session = Depends(get_db),                       # Dependency to get DB session
+# Dependency collecting the list filters and applying role-based scoping
+# Returns None when the requested filters can never match anything the user may see
+async def grievance_list_filters(
+    status: Optional[models.GrievanceStatus] = None,     # Filter by status
+    department_id: Optional[int] = None,                 # Filter by department
+    assigned_to: Optional[int] = None,                   # Filter by assigned employee
+    created_from: Optional[datetime] = None,             # Created at or after this time
+    created_to: Optional[datetime] = None,               # Created before this time
     current_user: User = Depends(get_current_active_user),  # Get the current authenticated user
 ):
+    filters = dict(status=status, department_id=department_id, assigned_to=assigned_to,
+                   created_from=created_from, created_to=created_to)
     # Users see only their own grievances
     if current_user.role == RoleEnum.user:
-        return crud.get_grievances_by_user(db, current_user.id)
-    
+        filters["user_id"] = current_user.id
     # Employees see grievances assigned to them
-    if current_user.role == RoleEnum.employee:
-        return crud.get_grievances_by_employee(db, current_user.id)
-    
+    elif current_user.role == RoleEnum.employee:
+        if assigned_to is not None and assigned_to != current_user.id:
+            return None
+        filters["assigned_to"] = current_user.id
     # Admins and Super Admins see all grievances
-    if current_user.role in (RoleEnum.admin, RoleEnum.super_admin):
-        return crud.get_all_grievances(db)
-    
-    # If role is not recognized, deny access
-    raise HTTPException(status_code=403, detail="Not authorized")
+    elif current_user.role not in (RoleEnum.admin, RoleEnum.super_admin):
+        # If role is not recognized, deny access
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return filters
 
-# Endpoint to assign grievances to employees (accessible only by admins and super_admins)
-@router.post("/assign", status_code=status.HTTP_204_NO_CONTENT)
-def assign_all(
+# Function to fetch one page and attach the next-page cursor header
+# Pages are cached per (filters, cursor, limit) until the next grievance write, and answered with 304
+# when the client's If-None-Match still matches (see response_cache.py)
+async def _grievance_page(db, request: Request, filters, cursor, limit: int, expand: bool = False):
+    schema = schemas.GrievanceExpanded if expand else schemas.GrievanceOut
+
+    async def render():
+        if filters is None:
+            return b"[]", {}
+        after = decode_cursor(cursor) if cursor else None
+        # Fetch one extra row to learn whether another page exists
+        rows = await run_db(db, crud.list_grievances, after=after, limit=limit + 1, expand=expand,
+                            as_rows=FAST_JSON, **filters)
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].id)
+        if FAST_JSON:
+            return response_cache.dump_rows(rows), headers
+        return response_cache.dump_json(List[schema], rows), headers
+
+    # The filters already carry the role scoping (user_id / assigned_to), so they identify the audience
+    variant = (None if filters is None else tuple(sorted(filters.items())), cursor, limit, expand)
+    return await response_cache.conditional_response(request, response_cache.GRIEVANCES, variant, render)
+
+# Endpoint to read grievances based on user role, newest first, one page at a time
+# The cursor for the next page is returned in the X-Next-Cursor response header
+@router.get("/", response_model=List[schemas.GrievanceOut])
+async def read_grievances(
+    request: Request,                                    # Carries If-None-Match for conditional GETs
+    cursor: Optional[str] = None,                        # X-Next-Cursor value from the previous page
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),  # Page size
+    filters: Optional[dict] = Depends(grievance_list_filters),  # Filters scoped to the current user
     db: Session = Depends(get_db),                       # Dependency to get DB session
+):
+    return await _grievance_page(db, request, filters, cursor, limit)
+
+# Endpoint returning the same pages with department name and owner/assignee/resolver emails
+# The related rows are eager-loaded, so a page costs a fixed number of queries
+@router.get("/expanded", response_model=List[schemas.GrievanceExpanded])
+async def read_grievances_expanded(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    filters: Optional[dict] = Depends(grievance_list_filters),
+    db: Session = Depends(get_db),
+):
+    return await _grievance_page(db, request, filters, cursor, limit, expand=True)
+
+# Endpoint to bulk-import grievances from an NDJSON or CSV body (admins only)
+# Rows are validated against GrievanceImport and inserted in batched transactions; rejected rows are listed
+# Imported tickets are not auto-assigned; run POST /grievances/assign afterwards for unassigned pending ones
+@router.post("/import", response_model=ImportReport)
+async def import_grievances(
+    request: Request,                                    # Body streamed as application/x-ndjson or text/csv
+    db: Session = Depends(get_db),
+    current_user: User = Depends(admin_only),
+):
+    report = await import_rows(request, db, schemas.GrievanceImport, crud.import_grievances)
+    if report.inserted:
+        # Imported rows change open-ticket counts, dashboard totals and SLA breaches (they may be old already);
+        # reload them
+        await run_db(db, assignment_scheduler.rebuild)
+        await run_db(db, grievance_stats.rebuild)
+        await run_db(db, sla_monitor.rebuild)
+    return report
+
+# Endpoint to stream all grievances as NDJSON or CSV in id order (admins only)
+@router.get("/export")
+async def export_grievances(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),  # Output format
+    status: Optional[models.GrievanceStatus] = None,     # Only grievances with this status
+    department_id: Optional[int] = None,                 # Only grievances of this department
+    archived: bool = False,                              # Export the archived grievances instead
+    current_user: User = Depends(admin_only),
+):
+    def fetch_page(db, after_id, limit):
+        return crud.export_grievances(db, after_id, limit, status=status, department_id=department_id,
+                                      archived=archived)
+    return export_response(fetch_page, crud.EXPORT_COLUMNS, format, "grievances")
+
+# Background job body: one assignment pass with its own session
+def _assignment_job(job):
+    db = SessionLocal()
+    try:
+        return crud.assign_grievances_to_employees(db, job=job)
+    finally:
+        db.close()
+
+# Endpoint to assign grievances to employees (accessible only by admins and super_admins)
+# Starts a background job and returns it; while a pass is queued or running, the same job is returned
+@router.post("/assign", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+async def assign_all(
     current_user: User = Depends(admin_only),            # Only admin/super_admin allowed
 ):
-    # Assign all pending grievances to employees
-    crud.assign_grievances_to_employees(db)
-    return  # No content response
+    job, _ = jobs.submit("assign_grievances", _assignment_job)
+    return job
+
+# Endpoint to poll an assignment job for progress and its final report
+@router.get("/assign/{job_id}", response_model=JobOut)
+async def assignment_status(job_id: str, current_user: User = Depends(admin_only)):
+    job = jobs.get(job_id)
+    if job is None or job.kind != "assign_grievances":
+        raise HTTPException(404, "Job not found")
+    return job
+
+# Endpoint to cancel an assignment job (chunks already committed stay assigned)
+@router.delete("/assign/{job_id}", response_model=JobOut)
+async def cancel_assignment(job_id: str, current_user: User = Depends(admin_only)):
+    job = jobs.get(job_id)
+    if job is None or job.kind != "assign_grievances":
+        raise HTTPException(404, "Job not found")
+    return jobs.cancel(job_id)
+
+# Background job body: one archival pass with its own session
+def _archive_job(job):
+    db = SessionLocal()
+    try:
+        return crud.archive_closed_grievances(db, job=job)
+    finally:
+        db.close()
+
+# Endpoint to move closed grievances resolved more than ARCHIVE_AFTER_DAYS ago, with their comments and events,
+# to the archive tables (admins only). Starts a background job and returns it; while a pass is queued or
+# running, the same job is returned. Archived tickets stay readable by ID and ticket ID
+@router.post("/archive", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+async def archive_closed(
+    current_user: User = Depends(admin_only),
+):
+    job, _ = jobs.submit("archive_grievances", _archive_job)
+    return job
+
+# Endpoint to poll an archival job for progress and its final report
+@router.get("/archive/{job_id}", response_model=JobOut)
+async def archive_status(job_id: str, current_user: User = Depends(admin_only)):
+    job = jobs.get(job_id)
+    if job is None or job.kind != "archive_grievances":
+        raise HTTPException(404, "Job not found")
+    return job
+
+# Endpoint to cancel an archival job (chunks already committed stay archived)
+@router.delete("/archive/{job_id}", response_model=JobOut)
+async def cancel_archive(job_id: str, current_user: User = Depends(admin_only)):
+    job = jobs.get(job_id)
+    if job is None or job.kind != "archive_grievances":
+        raise HTTPException(404, "Job not found")
+    return jobs.cancel(job_id)
 
 # Endpoint to mark a grievance as resolved or not resolved
 @router.post("/{grievance_id}/resolve", response_model=schemas.GrievanceOut)
-def resolve_grievance(
+async def resolve_grievance(
     grievance_id: int,                                   # ID of the grievance to resolve
     resolver_id: int,                                    # ID of the person resolving it
     solved: bool = True,                                 # Status flag (solved or not)
@@ -70,7 +223,7 @@ def resolve_grievance(
     Mark a grievance as solved or not solved.
     Also updates resolver ID and resolved timestamp.
     """
-    updated = crud.resolve_grievance(db, grievance_id, resolver_id, solved)
+    updated = await run_db(db, crud.resolve_grievance, grievance_id, resolver_id, solved)
     
     # If the grievance does not exist, raise a 404 error
     if not updated:
@@ -78,3 +231,45 @@ def resolve_grievance(
     
     # Return updated grievance data
     return updated
+
+# Endpoint returning the current status of one ticket by its ticket ID, archived tickets included
+# Visible to its owner, its assignee and admins; anyone else gets the same 404 as for an unknown ticket.
+# Recently read tickets are answered from an in-memory LRU without touching the database
+@router.get("/ticket/{ticket_id}", response_model=schemas.TicketOut)
+async def read_ticket(
+    ticket_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    ticket = ticket_cache.get(ticket_id) or await run_db(db, crud.load_ticket, ticket_id)
+    if ticket is None or (current_user.id not in (ticket.user_id, ticket.assigned_to)
+                          and current_user.role not in (RoleEnum.admin, RoleEnum.super_admin)):
+        raise HTTPException(404, "Ticket not found")
+    return ticket
+
+# Endpoint returning a grievance's lifecycle events (created, assigned, resolved, commented), oldest first
+# Visible to its owner, its assignee and admins; the next-page cursor is returned in X-Next-Cursor
+@router.get("/{grievance_id}/timeline", response_model=List[schemas.GrievanceEventOut])
+async def grievance_timeline(
+    grievance_id: int,
+    response: Response,
+    cursor: Optional[str] = None,                        # X-Next-Cursor value from the previous page
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),  # Page size
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    g = await run_db(db, crud.get_grievance, grievance_id)
+    if g is None:
+        raise HTTPException(404, "Grievance not found")
+    if (current_user.id not in (g.user_id, g.assigned_to)
+            and current_user.role not in (RoleEnum.admin, RoleEnum.super_admin)):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    after = decode_cursor(cursor) if cursor else None
+    # Fetch one extra event to learn whether another page exists
+    events = await run_db(db, history.get_timeline, grievance_id, after=after, limit=limit + 1,
+                          archived=isinstance(g, models.ArchivedGrievance))
+    if len(events) > limit:
+        events = events[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(events[-1].at, events[-1].id)
+    return [schemas.GrievanceEventOut.from_event(event) for event in events]
@@ -0,0 +1,110 @@
+# Grievances/archive.py
+# Archival of closed grievances: solved / not_solved tickets resolved more than ARCHIVE_AFTER_DAYS ago are
+# moved, together with their comments and lifecycle events, from the hot tables to *_archive tables of the
+# same database. List pages, scans, counts and the hot indexes then only cover open and recent tickets,
+# while one archived ticket is still found by its ticket ID or ID (see crud.get_grievance_by_ticket).
+# Staying in one database keeps every chunk a single transaction, so a row is always in exactly one table
+
+import time  # Elapsed time reported back to the caller
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, insert, literal, select, tuple_
+from sqlalchemy.orm import Session
+
+from Comments.models import ArchivedComment, Comment
+from config import ARCHIVE_AFTER_DAYS, ARCHIVE_CHUNK_SIZE
+import response_cache
+from . import schemas
+from .models import ArchivedGrievance, ArchivedGrievanceEvent, Grievance, GrievanceEvent, GrievanceStatus
+
+G = Grievance
+
+# Hot table -> archive table for the rows that belong to a grievance, moved after the grievance itself
+_CHILDREN = [(Comment, ArchivedComment, "comments"), (GrievanceEvent, ArchivedGrievanceEvent, "events")]
+
+
+# Function to move every closed grievance resolved before now - older_than_days to the archive, chunk by chunk
+# progress(report) is called after every committed chunk; should_stop() is checked before each chunk
+def archive_closed(
+    db: Session,
+    older_than_days: float = ARCHIVE_AFTER_DAYS,
+    chunk_size: int = ARCHIVE_CHUNK_SIZE,
+    progress: Optional[Callable[[schemas.ArchiveReport], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> schemas.ArchiveReport:
+    started = time.perf_counter()
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    report = schemas.ArchiveReport(cutoff=cutoff)
+
+    # One range scan of (status, created_at, id) per closed status; a ticket resolved before the cutoff was
+    # also created before it. Rows whose resolution is still too recent are stepped over by the keyset
+    for status in (GrievanceStatus.solved, GrievanceStatus.not_solved):
+        after = None
+        while not report.cancelled:
+            if should_stop is not None and should_stop():
+                report.cancelled = True  # Chunks already committed stay archived
+                break
+            query = select(G.id, G.created_at).where(
+                G.status == status, G.created_at < cutoff, func.coalesce(G.resolved_at, G.created_at) < cutoff)
+            if after is not None:
+                query = query.where(tuple_(G.created_at, G.id) > tuple_(*after))
+            rows = db.execute(query.order_by(G.created_at, G.id).limit(chunk_size)).all()
+            if not rows:
+                break
+            after = (rows[-1].created_at, rows[-1].id)
+
+            held = _newest_holders(db)
+            grievance_ids = [row.id for row in rows if row.id not in held]
+            if grievance_ids:
+                moved = _move(db, grievance_ids)
+                report.grievances += moved["grievances"]
+                report.comments += moved["comments"]
+                report.events += moved["events"]
+                report.chunks += 1
+                response_cache.bump(response_cache.GRIEVANCES)
+                if progress is not None:
+                    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+                    progress(report)
+            if len(rows) < chunk_size:
+                break
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    return report
+
+
+# Function to find the grievances holding the largest grievance, comment and event IDs. SQLite gives a new
+# row the largest rowid + 1, so deleting those rows would hand their IDs out again and the archived copies
+# would clash with the new rows; such a grievance waits for a later pass
+def _newest_holders(db: Session) -> set:
+    held = {
+        db.scalar(select(func.max(G.id))),
+        db.scalar(select(Comment.grievance_id).order_by(Comment.id.desc()).limit(1)),
+        db.scalar(select(GrievanceEvent.grievance_id).order_by(GrievanceEvent.id.desc()).limit(1)),
+    }
+    held.discard(None)
+    return held
+
+
+# Function to move a chunk of grievances with their comments and events in one transaction:
+# INSERT ... SELECT into the archive tables, then DELETE from the hot ones (children first).
+# Deleting the comments also takes them out of the full-text index (see Search/index.py triggers)
+def _move(db: Session, grievance_ids: list) -> dict:
+    moved = {}
+    try:
+        columns = [column.name for column in G.__table__.columns]
+        rows = select(*G.__table__.columns, literal(datetime.utcnow())).where(G.id.in_(grievance_ids))
+        db.execute(insert(ArchivedGrievance).from_select(columns + ["archived_at"], rows))
+        for hot, archived, name in _CHILDREN:
+            owned = hot.grievance_id.in_(grievance_ids)
+            moved[name] = db.execute(insert(archived).from_select(
+                [column.name for column in hot.__table__.columns], select(*hot.__table__.columns).where(owned)
+            )).rowcount
+            db.execute(delete(hot).where(owned).execution_options(synchronize_session=False))
+        moved["grievances"] = db.execute(
+            delete(G).where(G.id.in_(grievance_ids)).execution_options(synchronize_session=False)).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return moved
@@ -0,0 +1,135 @@
+# Grievances/assignment.py
+# Set-based bulk assignment of unassigned grievances to employees of the same department
+
+import heapq  # Min-heap of (open tickets, employee ID) per department
+import time  # Elapsed time reported back to the caller
+from datetime import datetime  # Time recorded on assignment events
+from typing import Callable, Optional  # Progress / cancellation hooks
+from collections import defaultdict  # Grievance IDs grouped by chosen employee
+
+from sqlalchemy import func, update  # Aggregate counts and bulk UPDATE statements
+from sqlalchemy.orm import Session
+
+from . import history, models, schemas
+from .models import GrievanceStatus
+from User.models import User
+from roles import RoleEnum
+from config import ASSIGN_CHUNK_SIZE
+from events import hub
+from .stats import grievance_stats
+from .ticket_cache import ticket_cache
+import response_cache
+
+
+# Function to build a least-loaded-first heap of employees for every department
+# Employees without a department form the fallback pool (key None) for departments with no staff
+def load_employee_heaps(db: Session) -> dict[int | None, list[tuple[int, int]]]:
+    employees = db.query(User.id, User.department_id).filter(User.role == RoleEnum.employee).all()
+    # Current open (pending) tickets per employee, in one grouped query
+    open_counts = dict(
+        db.query(models.Grievance.assigned_to, func.count())
+        .filter(models.Grievance.status == GrievanceStatus.pending, models.Grievance.assigned_to.isnot(None))
+        .group_by(models.Grievance.assigned_to)
+        .all()
+    )
+    heaps = defaultdict(list)
+    for emp_id, department_id in employees:
+        heaps[department_id].append((open_counts.get(emp_id, 0), emp_id))
+    for heap in heaps.values():
+        heapq.heapify(heap)
+    return dict(heaps)
+
+
+# Function to assign every pending, unassigned grievance, chunk by chunk, with bulk UPDATEs
+# Closed tickets without an assignee (e.g. imported as solved) are left alone
+# progress(report) is called after every committed chunk; should_stop() is checked before each chunk
+def assign_pending(
+    db: Session,
+    chunk_size: int = ASSIGN_CHUNK_SIZE,
+    progress: Optional[Callable[[schemas.AssignmentReport], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> schemas.AssignmentReport:
+    started = time.perf_counter()
+    report = schemas.AssignmentReport()
+    heaps = load_employee_heaps(db)
+    G = models.Grievance
+    unassigned = (G.assigned_to.is_(None), G.status == GrievanceStatus.pending)
+    report.total = db.query(func.count(G.id)).filter(*unassigned).scalar()
+
+    # Departments that currently have unassigned grievances
+    departments = [d for (d,) in db.query(G.department_id).filter(*unassigned).distinct()]
+    for department_id in departments:
+        heap = heaps.get(department_id) or heaps.get(None)
+        if not heap:
+            # Nobody can take these tickets; leave them for when staff is added
+            report.skipped += db.query(func.count(G.id)).filter(
+                *unassigned, G.department_id == department_id).scalar()
+            continue
+
+        last_id = 0
+        while not report.cancelled:
+            if should_stop is not None and should_stop():
+                report.cancelled = True  # Chunks already committed stay assigned
+                break
+            # Next chunk of unassigned IDs (owners, tickets) in this department (keyset on id, backed by an index)
+            rows = (db.query(G.id, G.user_id, G.ticket_id)
+                    .filter(*unassigned, G.department_id == department_id, G.id > last_id)
+                    .order_by(G.id).limit(chunk_size).all())
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            # Give each ticket to the currently least-loaded employee
+            batches = defaultdict(list)
+            owners = defaultdict(list)
+            for gid, owner_id, _ in rows:
+                load, emp_id = heapq.heappop(heap)
+                batches[emp_id].append(gid)
+                owners[owner_id].append((gid, emp_id))
+                heapq.heappush(heap, (load + 1, emp_id))
+
+            # One UPDATE per employee per chunk; the guard skips rows assigned or resolved concurrently,
+            # and RETURNING tells which tickets this pass actually assigned
+            updated = {}
+            now = datetime.utcnow()
+            for emp_id, gids in batches.items():
+                updated[emp_id] = list(db.scalars(
+                    update(G)
+                    .where(G.id.in_(gids), *unassigned)
+                    .values(assigned_to=emp_id)
+                    .returning(G.id)
+                    .execution_options(synchronize_session=False)
+                ))
+                report.assigned += len(updated[emp_id])
+                # Lifecycle events in the same transaction as the assignment
+                history.record_assignments(db, emp_id, updated[emp_id], now)
+            # Commit per chunk so the write lock is held only briefly
+            db.commit()
+            for emp_id, gids in updated.items():
+                grievance_stats.assigned(department_id, emp_id, len(gids))
+            ticket_cache.invalidate(*(ticket_id for _, _, ticket_id in rows))
+            response_cache.bump(response_cache.GRIEVANCES)
+            report.chunks += 1
+            _publish_chunk(updated, owners)
+            if progress is not None:
+                report.elapsed_seconds = round(time.perf_counter() - started, 3)
+                progress(report)
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    return report
+
+
+# Function to announce one committed chunk: one event per employee (also seen by admins)
+# and one per grievance owner, so a large pass does not emit an event per ticket to everyone.
+# 'updated' holds the tickets actually assigned; picks skipped by the UPDATE guard are left out
+def _publish_chunk(updated: dict, owners: dict):
+    if not hub.active:
+        return
+    done = {gid for gids in updated.values() for gid in gids}
+    for emp_id, gids in updated.items():
+        if gids:
+            hub.publish("grievances_assigned", {"assigned_to": emp_id, "grievance_ids": gids}, [emp_id])
+    for owner_id, pairs in owners.items():
+        assignments = [{"grievance_id": gid, "assigned_to": emp} for gid, emp in pairs if gid in done]
+        if assignments:
+            hub.publish("grievances_assigned", {"assignments": assignments}, [owner_id], admins=False)
@@ -1,44 +1,107 @@
-from sqlalchemy.orm import Session
-from . import models, schemas
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+from . import models, schemas, archive, assignment, history
 from User.models import User
-from .models import GrievanceStatus
-from roles import RoleEnum
+from Department.models import Department
+from .models import STATUS_CODES, GrievanceEventKind, GrievanceStatus
+from config import AUTO_ASSIGN_ON_CREATE
+from .scheduler import assignment_scheduler
+from .sla import sla_monitor
+from .stats import grievance_stats
+from .ticket_cache import ticket_cache
+from events import hub
+from bulk_io import insert_many
+import response_cache
 import uuid
 import datetime
 
 def create_grievance(db: Session, grievance: schemas.GrievanceCreate, user_id: int):
     # Generate a unique ticket ID using UUID4
     ticket = str(uuid.uuid4())
+    # Route the grievance to the least-loaded employee of its department right away
+    assignee = assignment_scheduler.pick(grievance.department_id) if AUTO_ASSIGN_ON_CREATE else None
     # Create a new Grievance object with ticket ID, user ID, and department ID
     db_g = models.Grievance(
         ticket_id=ticket,
         user_id=user_id,
-        department_id=grievance.department_id
+        department_id=grievance.department_id,
+        assigned_to=assignee,
+        # Set in Python (microsecond precision) so keyset pagination rarely sees ties
+        created_at=datetime.datetime.utcnow()
     )
     # Add the grievance to the database session
     db.add(db_g)
-    # Commit the transaction to save the grievance to the database
-    db.commit()
+    # Commit the transaction to save the grievance (and its lifecycle events) to the database
+    try:
+        db.flush()  # Assigns the ID the events refer to
+        history.record(db, db_g.id, GrievanceEventKind.created, db_g.created_at, actor_id=user_id)
+        if assignee is not None:
+            history.record(db, db_g.id, GrievanceEventKind.assigned, db_g.created_at, value=assignee)
+        db.commit()
+    except Exception:
+        db.rollback()
+        assignment_scheduler.release(assignee)  # The ticket was never stored; give the slot back
+        raise
     # Refresh the grievance object to get updated data from the database
     db.refresh(db_g)
+    grievance_stats.created(db_g.department_id, db_g.assigned_to)
+    response_cache.bump(response_cache.GRIEVANCES)
+    # Tell the owner, the assignee and admins about the new ticket (if anyone is listening)
+    if hub.active:
+        hub.publish("grievance_created", schemas.GrievanceOut.from_orm(db_g).dict(),
+                    [db_g.user_id, db_g.assigned_to])
     # Return the created grievance object
     return db_g
 
-def assign_grievances_to_employees(db: Session):
-    # Query all unassigned grievances (where assigned_to is None)
-    pend = db.query(models.Grievance)\
-             .filter(models.Grievance.assigned_to.is_(None))\
-             .all()
-    # Query all users with the role of employee
-    emps = db.query(User).filter(User.role == RoleEnum.employee).all()
-    # If no employees are found, exit the function
-    if not emps:
-        return
-    # Assign grievances to employees in a round-robin fashion
-    for i, g in enumerate(pend):
-        g.assigned_to = emps[i % len(emps)].id
-    # Commit the changes to the database
-    db.commit()
+def assign_grievances_to_employees(db: Session, job=None) -> schemas.AssignmentReport:
+    # Assign all unassigned grievances to the least-loaded employee of their department,
+    # in chunks of bulk UPDATEs (see assignment.py); returns counts and duration
+    # When run as a background job, progress is published on it and cancellation is honoured
+    if job is None:
+        report = assignment.assign_pending(db)
+    else:
+        report = assignment.assign_pending(
+            db,
+            progress=lambda report: job.report(**report.dict()),
+            should_stop=job.cancel_requested,
+        )
+    # The pass changed open-ticket counts behind the scheduler's back; reload them
+    assignment_scheduler.rebuild(db)
+    return report
+
+def archive_closed_grievances(db: Session, job=None) -> schemas.ArchiveReport:
+    # Move closed grievances past ARCHIVE_AFTER_DAYS, with their comments and events, to the archive tables
+    # (see archive.py); when run as a background job, progress is published on it and cancellation is honoured
+    if job is None:
+        return archive.archive_closed(db)
+    return archive.archive_closed(
+        db,
+        progress=lambda report: job.report(**report.dict()),
+        should_stop=job.cancel_requested,
+    )
+
+def get_grievance(db: Session, grievance_id: int):
+    # Look up one grievance by primary key, in the archive if it was moved there (None if it does not exist)
+    return db.get(models.Grievance, grievance_id) or db.get(models.ArchivedGrievance, grievance_id)
+
+def get_grievance_by_ticket(db: Session, ticket_id: str):
+    # Look up one grievance by ticket ID through the unique index, then in the archive's
+    if not models.valid_ticket_id(ticket_id):
+        return None  # Cannot be stored, so cannot exist
+    return db.query(models.Grievance).filter(models.Grievance.ticket_id == ticket_id).first() \
+        or db.query(models.ArchivedGrievance).filter(models.ArchivedGrievance.ticket_id == ticket_id).first()
+
+def load_ticket(db: Session, ticket_id: str) -> schemas.TicketOut | None:
+    # Status of one ticket for GET /grievances/ticket/{ticket_id} on a hot-ticket cache miss: one index lookup
+    # (two for archived tickets), whose result is cached
+    version = ticket_cache.version
+    g = get_grievance_by_ticket(db, ticket_id)
+    if g is None:
+        return None
+    ticket = schemas.TicketOut.from_orm(g)
+    # Keyed by the stored form, which the write paths invalidate (blob storage also accepts other spellings)
+    ticket_cache.put(ticket.ticket_id, ticket, version)
+    return ticket
 
 def get_grievances_by_user(db: Session, user_id: int):
     # Query all grievances associated with the given user ID
@@ -56,6 +119,76 @@ def get_all_grievances(db: Session):
     # Query all grievances in the database
     return db.query(models.Grievance).all()
 
+def list_grievances(
+    db: Session,
+    user_id: int | None = None,
+    assigned_to: int | None = None,
+    status: GrievanceStatus | None = None,
+    department_id: int | None = None,
+    created_from: datetime.datetime | None = None,
+    created_to: datetime.datetime | None = None,
+    after: tuple[datetime.datetime, int] | None = None,
+    limit: int = 50,
+    expand: bool = False,
+    as_rows: bool = False,
+):
+    # Newest-first page of grievances matching every given filter
+    # Keyset pagination: 'after' is the (created_at, id) of the last row of the previous page
+    # With as_rows, returns plain rows labelled like GrievanceOut / GrievanceExpanded (FAST_JSON mode)
+    G = models.Grievance
+    if as_rows:
+        query = _row_select(expand)
+    else:
+        query = db.query(G)
+    if expand and not as_rows:
+        # Department in the same statement; users in one IN-query per relationship (4 statements in total)
+        query = query.options(
+            joinedload(G.department),
+            selectinload(G.user),
+            selectinload(G.employee),
+            selectinload(G.resolver),
+        )
+    if user_id is not None:
+        query = query.filter(G.user_id == user_id)
+    if assigned_to is not None:
+        query = query.filter(G.assigned_to == assigned_to)
+    if status is not None:
+        query = query.filter(G.status == status)
+    if department_id is not None:
+        query = query.filter(G.department_id == department_id)
+    if created_from is not None:
+        query = query.filter(G.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(G.created_at < created_to)
+    if after is not None:
+        # Row-value comparison lets the (…, created_at, id) indexes seek straight to the page
+        query = query.filter(tuple_(G.created_at, G.id) < tuple_(*after))
+    query = query.order_by(G.created_at.desc(), G.id.desc()).limit(limit)
+    return db.execute(query).all() if as_rows else query.all()
+
+def _row_select(expand: bool):
+    # Core column select in the field order of GrievanceOut (plus GrievanceExpanded's extra fields),
+    # so rows serialize without building ORM objects or revalidating them
+    G = models.Grievance
+    columns = [G.id, G.ticket_id, G.user_id, G.department_id, G.assigned_to, G.status, G.created_at]
+    if not expand:
+        return select(*columns)
+    # Names come from outer joins in the same statement instead of relationship loads
+    owner, assignee, resolver = aliased(User), aliased(User), aliased(User)
+    return (
+        select(*columns,
+               Department.name.label("department_name"),
+               owner.email.label("owner_email"),
+               assignee.email.label("assignee_email"),
+               G.resolved_by,
+               resolver.email.label("resolver_email"),
+               G.resolved_at)
+        .outerjoin(Department, Department.id == G.department_id)
+        .outerjoin(owner, owner.id == G.user_id)
+        .outerjoin(assignee, assignee.id == G.assigned_to)
+        .outerjoin(resolver, resolver.id == G.resolved_by)
+    )
+
 def resolve_grievance(
     db: Session,
     grievance_id: int,
@@ -67,15 +200,96 @@ def resolve_grievance(
     # If grievance not found, return None
     if not g:
         return None
+    # Only the first resolution of a pending ticket frees a slot of its assignee
+    old_status = g.status
+    was_open = old_status == GrievanceStatus.pending
     # Update grievance status based on the 'solved' parameter
     g.status = GrievanceStatus.solved if solved else GrievanceStatus.not_solved
     # Record the ID of the resolver
     g.resolved_by = resolver_id
     # Record the current UTC timestamp as the resolution time
     g.resolved_at = datetime.datetime.utcnow()
-    # Commit the changes to the database
+    history.record(db, g.id, GrievanceEventKind.resolved, g.resolved_at, actor_id=resolver_id,
+                   value=STATUS_CODES[g.status])
+    # Commit the changes (and the event) to the database
     db.commit()
     # Refresh the grievance object to get updated data
     db.refresh(g)
+    ticket_cache.invalidate(g.ticket_id)
+    if was_open:
+        assignment_scheduler.release(g.assigned_to)
+        sla_monitor.resolved(g.department_id, g.created_at)
+    grievance_stats.resolved(g.department_id, g.assigned_to, old_status, g.status, g.created_at, g.resolved_at)
+    response_cache.bump(response_cache.GRIEVANCES)
+    # Tell the owner, the assignee and admins about the status change (if anyone is listening)
+    if hub.active:
+        hub.publish("grievance_resolved", schemas.GrievanceOut.from_orm(g).dict(), [g.user_id, g.assigned_to])
     # Return the updated grievance object
     return g
+
+# Columns written by GET /grievances/export, in order (id first, for keyset paging)
+EXPORT_COLUMNS = ["id", "ticket_id", "user_id", "department_id", "assigned_to", "status",
+                  "created_at", "resolved_by", "resolved_at"]
+
+def import_grievances(db: Session, rows: list) -> list:
+    # Insert one batch of validated GrievanceImport rows with a single executemany
+    # Referenced users/departments and ticket IDs are checked with one IN query each;
+    # returns (position, message) for every row that was not stored
+    user_ids = {r.user_id for r in rows} | {r.assigned_to for r in rows} | {r.resolved_by for r in rows}
+    user_ids.discard(None)
+    known_users = set(db.scalars(select(User.id).where(User.id.in_(user_ids))))
+    known_departments = set(db.scalars(select(Department.id).where(
+        Department.id.in_({r.department_id for r in rows}))))
+    tickets = {r.ticket_id for r in rows if r.ticket_id and models.valid_ticket_id(r.ticket_id)}
+    taken = set(db.scalars(select(models.Grievance.ticket_id).where(models.Grievance.ticket_id.in_(tickets))))
+    # Archived tickets keep their IDs too
+    taken |= set(db.scalars(select(models.ArchivedGrievance.ticket_id).where(
+        models.ArchivedGrievance.ticket_id.in_(tickets))))
+
+    failures, values, positions = [], [], []
+    now = datetime.datetime.utcnow()
+    for position, r in enumerate(rows):
+        missing = [f"{field} {getattr(r, field)}" for field in ("user_id", "assigned_to", "resolved_by")
+                   if getattr(r, field) is not None and getattr(r, field) not in known_users]
+        if r.department_id not in known_departments:
+            missing.append(f"department_id {r.department_id}")
+        if missing:
+            failures.append((position, "Unknown " + ", ".join(missing)))
+            continue
+        if r.ticket_id and not models.valid_ticket_id(r.ticket_id):
+            failures.append((position, f"ticket_id {r.ticket_id} is not a UUID"))
+            continue
+        if r.ticket_id in taken:
+            failures.append((position, f"Duplicate ticket_id {r.ticket_id}"))
+            continue
+        if r.ticket_id:
+            taken.add(r.ticket_id)  # Also rejects repeats within the batch
+        values.append(dict(
+            ticket_id=r.ticket_id or str(uuid.uuid4()),
+            user_id=r.user_id,
+            department_id=r.department_id,
+            assigned_to=r.assigned_to,
+            status=r.status,
+            created_at=r.created_at or now,
+            resolved_by=r.resolved_by,
+            resolved_at=r.resolved_at,
+        ))
+        positions.append(position)
+    failures += insert_many(db, models.Grievance, values, positions)
+    if values:
+        # Lifecycle events of the stored rows, reconstructed from the imported state
+        history.backfill(db, [v["ticket_id"] for v in values])
+        response_cache.bump(response_cache.GRIEVANCES)
+    return failures
+
+def export_grievances(db: Session, after_id: int, limit: int, status=None, department_id=None,
+                      archived: bool = False):
+    # One page of GET /grievances/export: plain column tuples in id order, no ORM objects
+    # With archived=True the page is read from the archive table instead
+    G = models.ArchivedGrievance if archived else models.Grievance
+    query = select(*(getattr(G, c) for c in EXPORT_COLUMNS)).where(G.id > after_id)
+    if status is not None:
+        query = query.where(G.status == status)
+    if department_id is not None:
+        query = query.where(G.department_id == department_id)
+    return db.execute(query.order_by(G.id).limit(limit)).all()
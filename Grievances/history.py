@@ -0,0 +1,157 @@
+# Grievances/history.py
+# Append-only grievance lifecycle log (grievance_events): the write paths add one row per creation,
+# assignment, resolution and comment in the same transaction as the change itself, so timelines and
+# SLA figures are read back with index range scans instead of being guessed from the current state
+
+from datetime import datetime
+
+from sqlalchemy import and_, case, exists, func, insert, literal, null, select, tuple_
+from sqlalchemy.orm import Session
+
+from Comments.models import Comment
+from .models import (STATUS_CODES, ArchivedGrievanceEvent, Grievance, GrievanceEvent, GrievanceEventKind as Kind,
+                     GrievanceStatus)
+from .stats import DurationHistogram
+
+E = GrievanceEvent
+G = Grievance
+
+
+# Function to add one event to the session; it is written by the caller's commit
+def record(db: Session, grievance_id: int, kind: Kind, at: datetime, actor_id: int | None = None,
+           value: int | None = None):
+    db.add(E(grievance_id=grievance_id, kind=int(kind), actor_id=actor_id, value=value, at=at))
+
+
+# Function to add events of one kind for many grievances with a single executemany, bypassing the ORM
+# unit of work; values are (grievance_id, value) pairs
+def record_many(db: Session, kind: Kind, at: datetime, values: list):
+    if values:
+        db.execute(insert(E), [{"grievance_id": grievance_id, "kind": int(kind), "actor_id": None,
+                                "value": value, "at": at} for grievance_id, value in values])
+
+
+# Function to build "this grievance has an event of this kind" for WHERE clauses. The kind is compared as an
+# expression (kind + 0) so the planner seeks the grievance's own events through (grievance_id, at, id)
+# instead of walking every event of that kind through (kind, at) for each grievance
+def has_event(kind: Kind):
+    return exists().where(E.grievance_id == G.id, E.kind + 0 == int(kind))
+
+
+# Function to record the assignment of several grievances to one employee with a single INSERT ... SELECT
+# (used by the bulk assignment engine next to its UPDATE, before the chunk is committed)
+def record_assignments(db: Session, emp_id: int, grievance_ids: list, at: datetime):
+    rows = select(G.id, literal(int(Kind.assigned)), null(), literal(emp_id), literal(at)).where(
+        G.id.in_(grievance_ids), G.assigned_to == emp_id)
+    db.execute(insert(E).from_select(["grievance_id", "kind", "actor_id", "value", "at"], rows))
+
+
+# Function to synthesize events for the given tickets that have none (rows imported in bulk), from what their
+# current state still tells: creation, assignee, resolution and comments. The assignment time is unknown for
+# those, so it is recorded at creation. Returns the grievances covered
+def backfill(db: Session, ticket_ids: list) -> int:
+    missing = ~has_event(Kind.created)
+    grievance_ids = list(db.scalars(select(G.id).where(G.ticket_id.in_(ticket_ids), missing)))
+    if not grievance_ids:
+        return 0
+    return _insert_events(db, [G.id.in_(grievance_ids)])
+
+
+# Function to fill an empty log from every grievance. The indexes are dropped for the load and built again
+# afterwards: one sorted build is several times faster than maintaining them row by row in random order
+def _backfill_all(db: Session) -> int:
+    conn = db.connection()
+    indexes = list(E.__table__.indexes)
+    for index in indexes:
+        index.drop(bind=conn)
+    try:
+        added = _insert_events(db, [], commit=False)
+        for index in indexes:
+            index.create(bind=conn)
+    except Exception:
+        db.rollback()
+        raise
+    db.commit()
+    return added
+
+
+# Function to insert the synthesized events of the grievances matching 'scope' (a list of WHERE clauses)
+def _insert_events(db: Session, scope: list, commit: bool = True) -> int:
+    columns = ["grievance_id", "kind", "actor_id", "value", "at"]
+    status_code = case(*((G.status == status, code) for status, code in STATUS_CODES.items()))
+    selects = [
+        select(G.id, literal(int(Kind.created)), G.user_id, null(), func.coalesce(G.created_at, func.now()))
+        .where(*scope),
+        select(G.id, literal(int(Kind.assigned)), null(), G.assigned_to, G.created_at)
+        .where(G.assigned_to.isnot(None), *scope),
+        select(G.id, literal(int(Kind.resolved)), G.resolved_by, status_code, G.resolved_at)
+        .where(G.resolved_at.isnot(None), G.status != GrievanceStatus.pending, *scope),
+        select(G.id, literal(int(Kind.commented)), Comment.user_id, Comment.id, Comment.timestamp)
+        .join(Comment, Comment.grievance_id == G.id).where(Comment.timestamp.isnot(None), *scope),
+    ]
+    # 'created' first, so it also comes first among events sharing its timestamp
+    added = db.execute(insert(E).from_select(columns, selects[0])).rowcount
+    for rows in selects[1:]:
+        db.execute(insert(E).from_select(columns, rows))
+    if commit:
+        db.commit()
+    return added  # 'created' events added, one per grievance
+
+
+# Function to backfill the whole table once, when the log is empty but grievances exist (first start)
+def ensure_history(db: Session) -> int:
+    if db.query(E.id).first() is not None or db.query(G.id).first() is None:
+        return 0
+    return _backfill_all(db)
+
+
+# Function to fetch a grievance's events, oldest first; 'after' is the (at, id) of the last event seen
+# Events of archived grievances are read from the archive (see archive.py)
+def get_timeline(db: Session, grievance_id: int, after: tuple[datetime, int] | None = None, limit: int = 50,
+                 archived: bool = False):
+    events = ArchivedGrievanceEvent if archived else E
+    query = db.query(events).filter(events.grievance_id == grievance_id)
+    if after is not None:
+        # Row-value comparison seeks inside the (grievance_id, at, id) index
+        query = query.filter(tuple_(events.at, events.id) > tuple_(*after))
+    return query.order_by(events.at, events.id).limit(limit).all()
+
+
+# Function to measure SLA figures for the grievances created in [created_from, created_to):
+# time to first assignment, to the first comment by someone other than the owner, and to resolution.
+# Created events are found by a range scan of (kind, at), the later events by one seek per grievance.
+# Archived grievances took their events with them, so windows older than ARCHIVE_AFTER_DAYS come out partial
+def sla_report(db: Session, created_from: datetime, created_to: datetime,
+               department_id: int | None = None) -> dict:
+    created = E.__table__.alias("created")
+
+    def first(condition):
+        return func.min(case((condition, E.at)))
+
+    query = (
+        select(
+            created.c.at,
+            first(E.kind == int(Kind.assigned)),
+            first(and_(E.kind == int(Kind.commented), E.actor_id != created.c.actor_id)),
+            first(E.kind == int(Kind.resolved)),
+        )
+        .select_from(created)
+        .join(E, E.grievance_id == created.c.grievance_id)
+        .where(created.c.kind == int(Kind.created), created.c.at >= created_from, created.c.at < created_to)
+        .group_by(created.c.grievance_id, created.c.at)
+    )
+    if department_id is not None:
+        query = query.join(G, G.id == created.c.grievance_id).where(G.department_id == department_id)
+
+    histograms = {name: DurationHistogram() for name in ("to_assignment", "to_first_response", "to_resolution")}
+    report = {"grievances": 0, "unassigned": 0, "unanswered": 0, "unresolved": 0}
+    for created_at, *firsts in db.execute(query):
+        report["grievances"] += 1
+        for (name, histogram), missing, at in zip(histograms.items(),
+                                                  ("unassigned", "unanswered", "unresolved"), firsts):
+            if at is None:
+                report[missing] += 1
+            else:
+                histogram.add((at - created_at).total_seconds())
+    report.update({name: histogram.summary() for name, histogram in histograms.items()})
+    return report
@@ -1,11 +1,14 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String
+from sqlalchemy import Column, Integer, SmallInteger, ForeignKey, DateTime, String, Index, LargeBinary, inspect
 from sqlalchemy.orm import relationship
 from sqlalchemy import Enum as SQLEnum
-from enum import Enum as PyEnum
+from sqlalchemy.types import TypeDecorator
+from enum import Enum as PyEnum, IntEnum
 from sqlalchemy.sql import func
 from datetime import datetime
+import uuid
 from database import Base
 from roles import RoleEnum
+from config import TICKET_ID_STORAGE
 
 class GrievanceStatus(str, PyEnum):
     # Define grievance status options as an enumeration
@@ -13,6 +16,46 @@ class GrievanceStatus(str, PyEnum):
     solved = "solved"
     not_solved = "not_solved"
 
+class TicketID(TypeDecorator):
+    # Ticket ID column: a string, or with TICKET_ID_STORAGE=blob the 16 bytes of the UUID (less than half the
+    # size in the table and its unique index), read back as the usual lowercase hyphenated string
+    impl = String
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if TICKET_ID_STORAGE == "blob":
+            return dialect.type_descriptor(LargeBinary(16))
+        return dialect.type_descriptor(String())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or TICKET_ID_STORAGE != "blob":
+            return value
+        return uuid.UUID(value).bytes  # Callers check valid_ticket_id first
+
+    def process_result_value(self, value, dialect):
+        if value is None or TICKET_ID_STORAGE != "blob":
+            return value
+        return str(uuid.UUID(bytes=bytes(value)))
+
+# Function to tell whether a ticket ID can be stored and looked up (with blob storage, only UUIDs)
+def valid_ticket_id(value: str) -> bool:
+    if TICKET_ID_STORAGE != "blob":
+        return True
+    try:
+        uuid.UUID(value)
+    except (ValueError, TypeError, AttributeError):
+        return False
+    return True
+
+# Function to refuse to start on a database whose ticket IDs are stored differently from TICKET_ID_STORAGE
+# (every lookup would miss); switching an existing database means exporting and importing it
+def check_ticket_storage(bind):
+    column = next(c for c in inspect(bind).get_columns("grievances") if c["name"] == "ticket_id")
+    stored_as_blob = isinstance(column["type"], LargeBinary)
+    if stored_as_blob != (TICKET_ID_STORAGE == "blob"):
+        raise RuntimeError(f"grievances.ticket_id is stored as {'blob' if stored_as_blob else 'text'}, "
+                           f"but TICKET_ID_STORAGE={TICKET_ID_STORAGE}")
+
 class Grievance(Base):
     # Define the database table name for grievances
     __tablename__ = "grievances"
@@ -20,7 +63,7 @@ class Grievance(Base):
     # Primary key column for unique grievance ID
     id = Column(Integer, primary_key=True, index=True)
     # Unique ticket ID for each grievance, indexed for faster lookup
-    ticket_id = Column(String, unique=True, index=True)
+    ticket_id = Column(TicketID, unique=True, index=True)
     # Foreign key linking to the user who created the grievance
     user_id = Column(Integer, ForeignKey("users.id"))
     # Foreign key linking to the department associated with the grievance
@@ -44,3 +87,103 @@ class Grievance(Base):
     employee = relationship("User", foreign_keys=[assigned_to])
     # Define relationship to the User model for the resolver
     resolver = relationship("User", foreign_keys=[resolved_by])
+
+    # Values read by the expanded response schema (load the relationships eagerly to avoid N+1 queries)
+    @property
+    def department_name(self):
+        return self.department.name if self.department else None
+
+    @property
+    def owner_email(self):
+        return self.user.email if self.user else None
+
+    @property
+    def assignee_email(self):
+        return self.employee.email if self.employee else None
+
+    @property
+    def resolver_email(self):
+        return self.resolver.email if self.resolver else None
+
+    # Composite indexes backing keyset pagination on (created_at, id) and the list filters
+    __table_args__ = (
+        Index("ix_grievances_created_at_id", "created_at", "id"),
+        Index("ix_grievances_user_created", "user_id", "created_at", "id"),
+        Index("ix_grievances_assigned_created", "assigned_to", "created_at", "id"),
+        Index("ix_grievances_department_created", "department_id", "created_at", "id"),
+        Index("ix_grievances_status_created", "status", "created_at", "id"),
+        # Unassigned grievances of one department, in id order, for the bulk assignment engine
+        Index("ix_grievances_assigned_department", "assigned_to", "department_id", "id"),
+    )
+
+
+class GrievanceEventKind(IntEnum):
+    # Integer codes of lifecycle events (stored as SMALLINT; never renumber existing codes)
+    created = 1
+    assigned = 2
+    resolved = 3
+    commented = 4
+    escalated = 5
+
+# Integer codes of statuses recorded by 'resolved' events
+STATUS_CODES = {GrievanceStatus.pending: 0, GrievanceStatus.solved: 1, GrievanceStatus.not_solved: 2}
+
+class GrievanceEvent(Base):
+    # Append-only lifecycle log; the grievances row is the materialized current state it leads to
+    __tablename__ = "grievance_events"
+
+    # Primary key, also orders events recorded within the same instant
+    id = Column(Integer, primary_key=True)
+    # Grievance the event belongs to
+    grievance_id = Column(Integer, ForeignKey("grievances.id"), nullable=False)
+    # GrievanceEventKind code
+    kind = Column(SmallInteger, nullable=False)
+    # User who caused the event (owner, resolver, comment author); None for automatic assignment
+    actor_id = Column(Integer, nullable=True)
+    # Kind-specific value: the assignee for 'assigned', a STATUS_CODES code for 'resolved',
+    # the comment ID for 'commented', the assignee who held the ticket when it breached for 'escalated'
+    value = Column(Integer, nullable=True)
+    # When the event happened (UTC)
+    at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Timeline of one grievance, in order
+        Index("ix_grievance_events_grievance_at", "grievance_id", "at", "id"),
+        # Events of one kind in a time window (e.g. grievances created in a reporting period)
+        Index("ix_grievance_events_kind_at", "kind", "at"),
+    )
+
+
+class ArchivedGrievance(Base):
+    # Closed grievances moved out of `grievances` by the archival job (see archive.py); same columns and IDs,
+    # so IDs stored elsewhere (comments, events, search results) still point at the right ticket
+    __tablename__ = "grievances_archive"
+
+    id = Column(Integer, primary_key=True)
+    # Still unique across both tables; archived tickets are looked up by it
+    ticket_id = Column(TicketID, unique=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    department_id = Column(Integer, ForeignKey("departments.id"))
+    assigned_to = Column(Integer, ForeignKey("users.id"), nullable=True)
+    status = Column(SQLEnum(GrievanceStatus))
+    created_at = Column(DateTime(timezone=True))
+    resolved_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    resolved_at = Column(DateTime(timezone=True), nullable=True)
+    # When the row was moved to the archive
+    archived_at = Column(DateTime, nullable=False)
+
+
+class ArchivedGrievanceEvent(Base):
+    # Lifecycle events of archived grievances, moved with them; read only for their timelines
+    __tablename__ = "grievance_events_archive"
+
+    id = Column(Integer, primary_key=True)
+    grievance_id = Column(Integer, ForeignKey("grievances_archive.id"), nullable=False)
+    kind = Column(SmallInteger, nullable=False)
+    actor_id = Column(Integer, nullable=True)
+    value = Column(Integer, nullable=True)
+    at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_grievance_events_archive_grievance_at", "grievance_id", "at", "id"),
+    )
@@ -0,0 +1,80 @@
+# Grievances/scheduler.py
+# In-memory assignment scheduler: routes each new grievance to the least-loaded employee of its
+# department in O(log n), using per-department heaps of open-ticket counts rebuilt from the DB at startup
+
+import heapq  # Min-heaps of (open tickets, employee ID)
+import threading  # Creation and resolution can happen on several threads at once
+
+from sqlalchemy.orm import Session
+
+from .assignment import load_employee_heaps  # Same load query the bulk engine uses
+
+
+class AssignmentScheduler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heaps = {}  # department ID (None = fallback pool) -> heap of (open count, employee ID)
+        self._counts = {}  # employee ID -> current open count (authoritative; heap entries may be stale)
+        self._departments = {}  # employee ID -> department ID
+
+    # Function to reload employees and their open-ticket counts from the database
+    def rebuild(self, db: Session):
+        heaps = load_employee_heaps(db)
+        with self._lock:
+            self._heaps = heaps
+            self._counts = {emp_id: count for heap in heaps.values() for count, emp_id in heap}
+            self._departments = {emp_id: dept for dept, heap in heaps.items() for _, emp_id in heap}
+
+    # Function to choose (and charge) the least-loaded employee for a department, or None if nobody can take it
+    def pick(self, department_id: int | None) -> int | None:
+        with self._lock:
+            for key in (department_id, None):  # Department staff first, then the fallback pool
+                heap = self._heaps.get(key)
+                if heap and self._discard_stale(heap):
+                    count, emp_id = heapq.heappop(heap)
+                    self._counts[emp_id] = count + 1
+                    heapq.heappush(heap, (count + 1, emp_id))
+                    return emp_id
+            return None
+
+    # Function to return a ticket's slot after it was resolved (or a pick was not persisted)
+    def release(self, emp_id: int | None):
+        with self._lock:
+            if emp_id not in self._counts:
+                return
+            self._counts[emp_id] = max(0, self._counts[emp_id] - 1)
+            # Push the new count; the old entry becomes stale and is skipped lazily
+            heap = self._heaps[self._departments[emp_id]]
+            heapq.heappush(heap, (self._counts[emp_id], emp_id))
+            if len(heap) > 2 * len(self._counts) + 16:
+                self._compact(self._departments[emp_id])
+
+    # Function to start routing tickets to a new employee
+    def add_employee(self, emp_id: int, department_id: int | None, open_count: int = 0):
+        with self._lock:
+            self._counts[emp_id] = open_count
+            self._departments[emp_id] = department_id
+            heapq.heappush(self._heaps.setdefault(department_id, []), (open_count, emp_id))
+
+    # Function to stop routing tickets to an employee (role change)
+    def remove_employee(self, emp_id: int):
+        with self._lock:
+            self._counts.pop(emp_id, None)  # Remaining heap entries become stale
+            self._departments.pop(emp_id, None)
+
+    # Pop entries whose count no longer matches the employee's current count; True if a live entry remains
+    def _discard_stale(self, heap: list) -> bool:
+        while heap and self._counts.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return bool(heap)
+
+    # Rebuild one department heap from the authoritative counts
+    def _compact(self, department_id):
+        heap = [(count, emp_id) for emp_id, count in self._counts.items()
+                if self._departments.get(emp_id) == department_id]
+        heapq.heapify(heap)
+        self._heaps[department_id] = heap
+
+
+# Shared scheduler instance, rebuilt from the database at startup (see main.py)
+assignment_scheduler = AssignmentScheduler()
@@ -1,10 +1,23 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
+from .models import STATUS_CODES, GrievanceEventKind, GrievanceStatus
 
 # Schema for creating a new grievance (input model)
 class GrievanceCreate(BaseModel):
     department_id: int  # ID of the department to which the grievance is related
 
+# Schema for one row of a bulk import (see POST /grievances/import)
+# Lets migrations carry over ticket IDs, assignment, status and timestamps; omitted values get the usual defaults
+class GrievanceImport(GrievanceCreate):
+    user_id: int                                       # ID of the user who raised the grievance
+    ticket_id: Optional[str] = None                    # Generated when omitted
+    assigned_to: Optional[int] = None                  # Left unassigned when omitted
+    status: GrievanceStatus = GrievanceStatus.pending
+    created_at: Optional[datetime] = None              # Import time when omitted
+    resolved_by: Optional[int] = None
+    resolved_at: Optional[datetime] = None
+
 # Schema for reading grievance details (output model)
 class GrievanceOut(BaseModel):
     id: int                    # Auto-incremented primary key ID of the grievance
@@ -18,3 +31,62 @@ class GrievanceOut(BaseModel):
     class Config:
         # Enable compatibility with ORM objects (e.g., SQLAlchemy models)
         orm_mode = True
+        from_attributes = True  # pydantic 2 name of orm_mode, needed by from_orm()
+
+# Schema returned by the ticket lookup (GET /grievances/ticket/{ticket_id}); kept in the hot-ticket cache
+class TicketOut(GrievanceOut):
+    resolved_at: Optional[datetime] = None  # When the grievance was resolved
+
+# Expanded output schema with related names, for screens that would otherwise look them up per row
+class GrievanceExpanded(GrievanceOut):
+    department_name: Optional[str] = None   # Name of the department
+    owner_email: Optional[str] = None       # Email of the user who raised the grievance
+    assignee_email: Optional[str] = None    # Email of the assigned employee
+    resolved_by: Optional[int] = None       # ID of the resolver
+    resolver_email: Optional[str] = None    # Email of the resolver
+    resolved_at: Optional[datetime] = None  # When the grievance was resolved
+
+# Schema reporting the outcome of a bulk assignment pass
+class AssignmentReport(BaseModel):
+    total: int = 0                # Unassigned grievances found when the pass started
+    assigned: int = 0             # Grievances given an assignee
+    skipped: int = 0              # Unassigned grievances in departments without any employee
+    chunks: int = 0               # Transactions committed
+    elapsed_seconds: float = 0.0  # Wall-clock duration of the pass
+    cancelled: bool = False       # True if the pass stopped early on request
+
+# Schema reporting the outcome of an archival pass (see POST /grievances/archive)
+class ArchiveReport(BaseModel):
+    cutoff: Optional[datetime] = None  # Grievances resolved before this time were eligible
+    grievances: int = 0           # Grievances moved to the archive
+    comments: int = 0             # Their comments
+    events: int = 0               # Their lifecycle events
+    chunks: int = 0               # Transactions committed
+    elapsed_seconds: float = 0.0  # Wall-clock duration of the pass
+    cancelled: bool = False       # True if the pass stopped early on request
+
+# Schema for one entry of a grievance's timeline (GET /grievances/{id}/timeline)
+# The event row stores a single integer value; it is decoded into the field matching its kind
+class GrievanceEventOut(BaseModel):
+    id: int
+    kind: str                                # created, assigned, resolved or commented
+    at: datetime                             # When it happened
+    actor_id: Optional[int] = None           # Owner (created), resolver (resolved) or author (commented)
+    assigned_to: Optional[int] = None        # Assignee (assigned), or holder when the SLA was breached (escalated)
+    status: Optional[GrievanceStatus] = None # Outcome (resolved)
+    comment_id: Optional[int] = None         # The comment (commented)
+
+    # Function to build the output from a GrievanceEvent row
+    @classmethod
+    def from_event(cls, event) -> "GrievanceEventOut":
+        kind = GrievanceEventKind(event.kind)
+        out = cls(id=event.id, kind=kind.name, at=event.at, actor_id=event.actor_id)
+        if kind in (GrievanceEventKind.assigned, GrievanceEventKind.escalated):
+            out.assigned_to = event.value
+        elif kind == GrievanceEventKind.resolved:
+            out.status = _STATUS_BY_CODE.get(event.value)
+        elif kind == GrievanceEventKind.commented:
+            out.comment_id = event.value
+        return out
+
+_STATUS_BY_CODE = {code: status for status, code in STATUS_CODES.items()}
@@ -0,0 +1,279 @@
+# Grievances/sla.py
+# SLA breach monitor: a background thread that escalates pending grievances which have waited longer than
+# their department's threshold. Grievances age past the threshold in created_at order, so each cycle reads
+# only the slice of the (status, created_at) index that crossed it since the previous cycle (a watermark),
+# however many tickets are open. Breach counts per department are kept in memory, like the dashboard
+# counters, and published to admins
+
+import logging  # A failed cycle is logged and retried on the next one
+import threading  # The monitor thread and the counters it shares with request threads
+import time  # Cycle durations
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, or_, tuple_, update
+from sqlalchemy.orm import Session
+
+from config import (ASSIGN_CHUNK_SIZE, SLA_CHECK_INTERVAL_SECONDS, SLA_DEPARTMENT_HOURS, SLA_ESCALATION,
+                    SLA_PENDING_HOURS)
+from database import SessionLocal
+from events import hub
+import response_cache
+from . import history
+from .models import Grievance, GrievanceEventKind, GrievanceStatus
+from .scheduler import assignment_scheduler
+from .stats import grievance_stats
+from .ticket_cache import ticket_cache
+
+log = logging.getLogger("grievance.sla_monitor")
+
+G = Grievance
+
+
+# Function to drop the time zone of database timestamps (naive values are UTC), for comparisons
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    return value.replace(tzinfo=None) if value is not None and value.tzinfo is not None else value
+
+
+class SLAMonitor:
+    def __init__(self, hours: float = SLA_PENDING_HOURS, department_hours: dict = SLA_DEPARTMENT_HOURS,
+                 interval: float = SLA_CHECK_INTERVAL_SECONDS, action: str = SLA_ESCALATION,
+                 chunk_size: int = ASSIGN_CHUNK_SIZE, session_factory=SessionLocal):
+        self.hours = hours
+        # Overrides equal to the default add nothing; dropping them keeps one watermark per threshold
+        self.department_hours = {dept: h for dept, h in department_hours.items() if h != hours}
+        self.interval = interval
+        self.action = action
+        self.chunk_size = chunk_size
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._cycle_lock = threading.Lock()  # A rebuild waits for a running cycle instead of interleaving
+        self._watermarks = {}  # threshold hours -> created_at up to which breaches were counted
+        self._breached = Counter()  # department ID -> pending grievances past their threshold
+        self._catch_up = True  # Next cycle also escalates older breaches that have no 'escalated' event yet
+        self._stop = threading.Event()
+        self._thread = None
+        self.escalated = 0  # Grievances escalated since start
+        self.last_cycle = None  # When the last cycle ran, how long it took and what it escalated
+
+    # Function to get the threshold (hours) of a department
+    def threshold(self, department_id: Optional[int]) -> float:
+        return self.department_hours.get(department_id, self.hours)
+
+    # Departments sharing a threshold, as (hours, WHERE clause on department_id or None for all)
+    def _groups(self) -> list:
+        by_hours = {}
+        for department_id, hours in self.department_hours.items():
+            by_hours.setdefault(hours, []).append(department_id)
+        if not by_hours:
+            return [(self.hours, None)]
+        others = or_(G.department_id.is_(None), G.department_id.notin_(list(self.department_hours)))
+        return [(self.hours, others)] + [(hours, G.department_id.in_(ids)) for hours, ids in by_hours.items()]
+
+    # Function to count the current breaches per department and restart the watermarks from now
+    # (startup, repair, after bulk imports). One grouped count per threshold
+    def rebuild(self, db: Session):
+        with self._cycle_lock:
+            self._rebuild(db)
+
+    def _rebuild(self, db: Session):
+        now = datetime.utcnow()
+        breached, watermarks = Counter(), {}
+        for hours, scope in self._groups():
+            cutoff = now - timedelta(hours=hours)
+            query = db.query(G.department_id, func.count(G.id)).filter(
+                G.status == GrievanceStatus.pending, G.created_at <= cutoff)
+            if scope is not None:
+                query = query.filter(scope)
+            breached.update(dict(query.group_by(G.department_id).all()))
+            watermarks[hours] = cutoff
+        with self._lock:
+            self._breached = breached
+            self._watermarks = watermarks
+            self._catch_up = True
+
+    # Function to run one check: escalate the grievances that breached since the last one
+    # Returns the number of grievances escalated
+    def run_once(self, db: Session) -> int:
+        with self._cycle_lock:
+            return self._run_once(db)
+
+    def _run_once(self, db: Session) -> int:
+        if not self._watermarks:
+            self._rebuild(db)
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        escalated = 0
+        for hours, scope in self._groups():
+            with self._lock:
+                low = self._watermarks[hours]
+            if self._catch_up:
+                # Breaches that were already counted by rebuild() but may never have been escalated
+                # (first start, or the monitor was off); this pass probes the log once per overdue ticket
+                escalated += self._escalate_range(db, hours, scope, None, low, count=False)
+            escalated += self._escalate_range(db, hours, scope, low, now - timedelta(hours=hours), count=True)
+        self._catch_up = False
+        self.last_cycle = {"at": now, "escalated": escalated,
+                           "elapsed_seconds": round(time.perf_counter() - started, 3)}
+        if escalated:
+            hub.publish("sla_breaches", self.snapshot())
+        return escalated
+
+    # Function to escalate the pending grievances created in (low, high] in created_at order, one chunk per
+    # transaction. count=True adds them to the breach counters and moves the watermark along; otherwise
+    # grievances that were already escalated are skipped
+    def _escalate_range(self, db: Session, hours: float, scope, low: Optional[datetime], high: datetime,
+                        count: bool) -> int:
+        query = db.query(G.id, G.ticket_id, G.department_id, G.user_id, G.assigned_to, G.created_at).filter(
+            G.status == GrievanceStatus.pending, G.created_at <= high)
+        if low is not None:
+            query = query.filter(G.created_at > low)
+        if scope is not None:
+            query = query.filter(scope)
+        if not count:
+            query = query.filter(~history.has_event(GrievanceEventKind.escalated))
+
+        total, after = 0, None
+        while not self._stop.is_set():
+            page = query if after is None else query.filter(tuple_(G.created_at, G.id) > tuple_(*after))
+            rows = page.order_by(G.created_at, G.id).limit(self.chunk_size).all()
+            if not rows:
+                break
+            self._escalate(db, rows, hours)
+            after = (rows[-1].created_at, rows[-1].id)
+            with self._lock:
+                if count:
+                    self._breached.update(row.department_id for row in rows)
+                    self._watermarks[hours] = _naive(rows[-1].created_at)
+                self.escalated += len(rows)
+            total += len(rows)
+            if len(rows) < self.chunk_size:
+                break
+        if count and not self._stop.is_set():
+            with self._lock:
+                self._watermarks[hours] = high
+        return total
+
+    # Function to escalate one chunk in one transaction: an 'escalated' event for every grievance and,
+    # with SLA_ESCALATION=reassign, a move to the least-loaded employee of its department
+    def _escalate(self, db: Session, rows: list, hours: float):
+        now = datetime.utcnow()
+        moved = []  # (row, new assignee)
+        try:
+            history.record_many(db, GrievanceEventKind.escalated, now, [(row.id, row.assigned_to) for row in rows])
+            if self.action == "reassign":
+                for row in rows:
+                    new = assignment_scheduler.pick(row.department_id)
+                    if new is None:
+                        continue
+                    if new == row.assigned_to:
+                        assignment_scheduler.release(new)  # Nobody else can take it; undo the extra charge
+                        continue
+                    if self._reassign(db, row, new):
+                        moved.append((row, new))
+                    else:
+                        assignment_scheduler.release(new)
+            history.record_many(db, GrievanceEventKind.assigned, now, [(row.id, new) for row, new in moved])
+            db.commit()
+        except Exception:
+            db.rollback()
+            for _, new in moved:
+                assignment_scheduler.release(new)
+            raise
+        for row, new in moved:
+            assignment_scheduler.release(row.assigned_to)
+            grievance_stats.reassigned(row.department_id, row.assigned_to, new)
+        if moved:
+            ticket_cache.invalidate(*(row.ticket_id for row, _ in moved))
+            response_cache.bump(response_cache.GRIEVANCES)
+        if hub.active:
+            new_assignees = {row.id: new for row, new in moved}
+            for row in rows:
+                assignee = new_assignees.get(row.id, row.assigned_to)
+                hub.publish("grievance_escalated", {
+                    "grievance_id": row.id, "ticket_id": row.ticket_id, "department_id": row.department_id,
+                    "created_at": row.created_at, "threshold_hours": hours,
+                    "previous_assignee": row.assigned_to, "assigned_to": assignee,
+                }, [row.user_id, row.assigned_to, assignee])
+
+    # Function to move one ticket to a new assignee; the guards skip tickets resolved or reassigned since
+    # they were read. Returns False if the row was not updated
+    def _reassign(self, db: Session, row, new: int) -> bool:
+        holder = G.assigned_to.is_(None) if row.assigned_to is None else G.assigned_to == row.assigned_to
+        try:
+            result = db.execute(update(G).where(G.id == row.id, G.status == GrievanceStatus.pending, holder)
+                                .values(assigned_to=new))
+        except Exception:
+            assignment_scheduler.release(new)
+            raise
+        return result.rowcount > 0
+
+    # Function to take a closed ticket out of the breach counters (called by resolve_grievance)
+    def resolved(self, department_id: Optional[int], created_at: Optional[datetime]):
+        created_at = _naive(created_at)
+        with self._lock:
+            watermark = self._watermarks.get(self.threshold(department_id))
+            if watermark is not None and created_at is not None and created_at <= watermark \
+                    and self._breached[department_id] > 0:
+                self._breached[department_id] -= 1
+
+    # Function to copy the breach counters for GET /admin/sla/breaches and the sla_breaches event
+    def snapshot(self) -> dict:
+        with self._lock:
+            departments = [
+                {"department_id": department_id, "threshold_hours": self.threshold(department_id), "breached": count}
+                for department_id, count in sorted(self._breached.items(), key=lambda item: item[0] or 0)
+                if count > 0
+            ]
+            return {
+                "action": self.action,
+                "threshold_hours": self.hours,
+                "breached": sum(d["breached"] for d in departments),
+                "departments": departments,
+                "escalated": self.escalated,
+                "last_cycle": self.last_cycle,
+            }
+
+    # Function to render the counters in the Prometheus text format (registered with metrics.registry)
+    def metric_lines(self) -> list:
+        snapshot = self.snapshot()
+        lines = ["# HELP sla_breached_grievances Pending grievances past their department's SLA threshold.",
+                 "# TYPE sla_breached_grievances gauge"]
+        for department in snapshot["departments"]:
+            lines.append(f'sla_breached_grievances{{department="{department["department_id"]}"}} '
+                         f'{department["breached"]}')
+        lines += ["# HELP sla_escalations_total Grievances escalated by the SLA monitor.",
+                  "# TYPE sla_escalations_total counter",
+                  f"sla_escalations_total {snapshot['escalated']}"]
+        return lines
+
+    # Function to start the monitor thread (a cycle right away, then one every `interval` seconds)
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sla-monitor", daemon=True)
+        self._thread.start()
+
+    # Function to stop the monitor thread; a running cycle finishes its current chunk
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            db = self._session_factory()
+            try:
+                self.run_once(db)
+            except Exception:
+                log.exception("SLA monitor cycle failed")
+            finally:
+                db.close()
+            self._stop.wait(self.interval)
+
+
+# Shared monitor, rebuilt at startup and started when SLA_MONITOR_ENABLED (see main.py)
+sla_monitor = SLAMonitor()
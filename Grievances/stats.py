@@ -0,0 +1,193 @@
+# Grievances/stats.py
+# In-memory dashboard counters: grievances by status per department, open tickets per employee and
+# time-to-resolution histograms. Rebuilt from the DB at startup and updated by the CRUD write paths,
+# so reading them costs O(departments + employees) instead of a scan of the grievances table
+
+import math  # Log-spaced histogram buckets
+import threading  # Writes arrive from several request threads at once
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import ArchivedGrievance, Grievance, GrievanceStatus
+
+
+# Histogram of durations with 4 log-spaced buckets per doubling (about 19% wide), so memory stays
+# constant per department and percentiles are accurate to within a bucket
+class DurationHistogram:
+    BUCKETS_PER_DOUBLING = 4
+
+    def __init__(self):
+        self.buckets = Counter()  # bucket index -> samples
+        self.count = 0
+        self.total = 0.0  # Sum of all samples, for the mean
+
+    # Bucket 0 holds [0, 1) seconds, bucket i > 0 holds [2^((i-1)/4), 2^(i/4))
+    def _index(self, seconds: float) -> int:
+        if seconds < 1:
+            return 0
+        return int(math.log2(seconds) * self.BUCKETS_PER_DOUBLING) + 1
+
+    def _bounds(self, index: int):
+        if index == 0:
+            return 0.0, 1.0
+        return (2 ** ((index - 1) / self.BUCKETS_PER_DOUBLING), 2 ** (index / self.BUCKETS_PER_DOUBLING))
+
+    def add(self, seconds: float):
+        seconds = max(seconds, 0.0)
+        self.buckets[self._index(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def merge(self, other: "DurationHistogram"):
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+
+    # Value below which a fraction q of the samples fall, interpolated inside its bucket
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            in_bucket = self.buckets[index]
+            if seen + in_bucket >= rank:
+                low, high = self._bounds(index)
+                return low + (high - low) * (rank - seen) / in_bucket
+            seen += in_bucket
+        return self._bounds(max(self.buckets))[1]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_seconds": round(self.total / self.count, 1) if self.count else None,
+            "p95_seconds": round(self.quantile(0.95), 1) if self.count else None,
+        }
+
+
+# Function to compute resolved_at - created_at in seconds (naive values are UTC)
+def _duration(created_at: Optional[datetime], resolved_at: Optional[datetime]) -> Optional[float]:
+    if created_at is None or resolved_at is None:
+        return None
+    if (created_at.tzinfo is None) != (resolved_at.tzinfo is None):
+        created_at, resolved_at = created_at.replace(tzinfo=None), resolved_at.replace(tzinfo=None)
+    return (resolved_at - created_at).total_seconds()
+
+
+class GrievanceStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_department = defaultdict(Counter)  # department ID -> status -> grievances
+        self._unassigned = Counter()  # department ID -> pending grievances without an assignee
+        self._open_by_employee = Counter()  # employee ID -> pending grievances assigned to them
+        self._resolution = defaultdict(DurationHistogram)  # department ID -> time-to-resolution
+        self.rebuilt_at = None  # When the counters were last recomputed from the database
+
+    # Function to recompute every counter from the database (startup, repair, after bulk imports)
+    # Grouped counts are aggregated in SQL; only resolution timestamps are streamed
+    # Archived grievances still count towards the totals and resolution times (see archive.py)
+    def rebuild(self, db: Session):
+        G = Grievance
+        by_department = defaultdict(Counter)
+        resolution = defaultdict(DurationHistogram)
+        for table in (Grievance, ArchivedGrievance):
+            counts = (db.query(table.department_id, table.status, func.count(table.id))
+                      .group_by(table.department_id, table.status))
+            for department_id, status, count in counts:
+                by_department[department_id][GrievanceStatus(status)] += count
+            rows = (db.query(table.department_id, table.created_at, table.resolved_at)
+                    .filter(table.resolved_at.isnot(None)).yield_per(10_000))
+            for department_id, created_at, resolved_at in rows:
+                seconds = _duration(created_at, resolved_at)
+                if seconds is not None:
+                    resolution[department_id].add(seconds)
+        unassigned = Counter(dict(
+            db.query(G.department_id, func.count(G.id))
+            .filter(G.status == GrievanceStatus.pending, G.assigned_to.is_(None))
+            .group_by(G.department_id).all()))
+        open_by_employee = Counter(dict(
+            db.query(G.assigned_to, func.count(G.id))
+            .filter(G.status == GrievanceStatus.pending, G.assigned_to.isnot(None))
+            .group_by(G.assigned_to).all()))
+        with self._lock:
+            self._by_department = by_department
+            self._unassigned = unassigned
+            self._open_by_employee = open_by_employee
+            self._resolution = resolution
+            self.rebuilt_at = datetime.utcnow()
+
+    # Function to count a new grievance
+    def created(self, department_id: int, assigned_to: Optional[int], status=GrievanceStatus.pending):
+        with self._lock:
+            self._by_department[department_id][GrievanceStatus(status)] += 1
+            if status == GrievanceStatus.pending:
+                if assigned_to is None:
+                    self._unassigned[department_id] += 1
+                else:
+                    self._open_by_employee[assigned_to] += 1
+
+    # Function to move `count` pending, unassigned grievances of a department to an employee
+    def assigned(self, department_id: int, employee_id: int, count: int):
+        with self._lock:
+            self._unassigned[department_id] -= count
+            self._open_by_employee[employee_id] += count
+
+    # Function to move one pending grievance to another employee (SLA escalation)
+    def reassigned(self, department_id: int, old_employee: Optional[int], new_employee: int):
+        with self._lock:
+            if old_employee is None:
+                self._unassigned[department_id] -= 1
+            else:
+                self._open_by_employee[old_employee] -= 1
+            self._open_by_employee[new_employee] += 1
+
+    # Function to record a status change made by resolve_grievance
+    def resolved(self, department_id: int, assigned_to: Optional[int], old_status, new_status,
+                 created_at: Optional[datetime], resolved_at: Optional[datetime]):
+        old_status, new_status = GrievanceStatus(old_status), GrievanceStatus(new_status)
+        with self._lock:
+            counts = self._by_department[department_id]
+            counts[old_status] -= 1
+            counts[new_status] += 1
+            # Only the first close of a pending ticket frees a slot and measures resolution time
+            if old_status == GrievanceStatus.pending and new_status != GrievanceStatus.pending:
+                if assigned_to is None:
+                    self._unassigned[department_id] -= 1
+                else:
+                    self._open_by_employee[assigned_to] -= 1
+                seconds = _duration(created_at, resolved_at)
+                if seconds is not None:
+                    self._resolution[department_id].add(seconds)
+
+    # Function to copy the counters for the dashboard: O(departments + employees)
+    def snapshot(self) -> dict:
+        with self._lock:
+            departments = {}
+            overall = DurationHistogram()
+            for department_id in set(self._by_department) | set(self._resolution):
+                counts = self._by_department.get(department_id, Counter())
+                histogram = self._resolution.get(department_id, DurationHistogram())
+                overall.merge(histogram)
+                departments[department_id] = {
+                    "department_id": department_id,
+                    "total": sum(counts.values()),
+                    **{status.value: counts[status] for status in GrievanceStatus},
+                    "unassigned": self._unassigned[department_id],
+                    "resolution": histogram.summary(),
+                }
+            employees = [{"employee_id": emp_id, "open": count}
+                         for emp_id, count in sorted(self._open_by_employee.items()) if count > 0]
+            return {
+                "departments": departments,
+                "employees": employees,
+                "resolution": overall.summary(),
+                "rebuilt_at": self.rebuilt_at,
+            }
+
+
+# Shared counters fed by Grievances/crud.py and Grievances/assignment.py
+grievance_stats = GrievanceStats()
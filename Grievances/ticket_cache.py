@@ -0,0 +1,48 @@
+# Grievances/ticket_cache.py
+# Per-process LRU of recently looked-up tickets for GET /grievances/ticket/{ticket_id}, so a client polling
+# its ticket's status is answered without a query. The write paths that change what a lookup returns
+# (resolve, bulk assignment, SLA reassignment) drop the ticket; the TTL bounds how stale another process'
+# copy can be
+
+import threading  # The invalidation counter is shared by request threads
+
+from config import TICKET_CACHE_SIZE, TICKET_CACHE_TTL_SECONDS
+from ttl_cache import TTLCache
+
+
+class TicketCache:
+    def __init__(self, maxsize: int = TICKET_CACHE_SIZE, ttl: float = TICKET_CACHE_TTL_SECONDS):
+        self._cache = TTLCache(maxsize, ttl)  # ticket ID -> schemas.TicketOut
+        self._lock = threading.Lock()
+        self.version = 0  # Bumped by every invalidation
+
+    # Function to get a cached ticket (None if absent or expired)
+    def get(self, ticket_id: str):
+        return self._cache.get(ticket_id)
+
+    # Function to cache a ticket read from the database. 'version' is the value seen before the read: if a
+    # write invalidated anything since, the row read may already be stale and is not cached
+    def put(self, ticket_id: str, ticket, version: int):
+        with self._lock:
+            if version == self.version:
+                self._cache.set(ticket_id, ticket)
+
+    # Function to drop tickets whose row changed (called after the write committed)
+    def invalidate(self, *ticket_ids: str):
+        with self._lock:
+            self.version += 1
+            for ticket_id in ticket_ids:
+                self._cache.pop(ticket_id)
+
+    # Function to drop every ticket (after repairs that bypass the write paths)
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+# Shared cache read by GET /grievances/ticket/{ticket_id}
+ticket_cache = TicketCache()
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from Search import crud, index, schemas
+from database import get_db, run_db
+from dependencies import get_current_active_user
+from roles import RoleEnum as Role
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from pagination import (NEXT_CURSOR_HEADER, decode_id_cursor, decode_rank_cursor, encode_id_cursor,
+                        encode_rank_cursor)
+
+# Initialize FastAPI router with prefix and tags for search endpoints
+router = APIRouter(prefix="/search", tags=["Search"])
+
+# Endpoint to search comment text, one page at a time
+# Users search the threads of their own grievances, employees those assigned to them, admins everything.
+# The cursor for the next page is returned in the X-Next-Cursor response header
+@router.get("/", response_model=List[schemas.SearchHit])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),   # Words to find; "word*" matches a prefix
+    sort: Literal["relevance", "recent"] = "relevance",   # Best matches first, or newest first
+    grievance_id: Optional[int] = None,                  # Search a single thread
+    cursor: Optional[str] = None,                        # X-Next-Cursor value from the previous page
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),  # Page size
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_active_user),
+):
+    if not index.fts_enabled:
+        raise HTTPException(status_code=501, detail="Search requires SQLite FTS5")
+    match = crud.match_expression(q)
+    if match is None:
+        raise HTTPException(status_code=400, detail="Search query has no searchable words")
+
+    # Scope the search to the threads the user may read
+    scope = {"grievance_id": grievance_id}
+    if current_user.role == Role.user:
+        scope["owner_id"] = current_user.id
+    elif current_user.role == Role.employee:
+        scope["assignee_id"] = current_user.id
+    elif current_user.role not in (Role.admin, Role.super_admin):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    if sort == "recent":
+        after = decode_id_cursor(cursor) if cursor else None
+    else:
+        after = decode_rank_cursor(cursor) if cursor else None
+    # Fetch one extra hit to learn whether another page exists
+    hits = await run_db(db, crud.search_comments, match, sort=sort, after=after, limit=limit + 1, **scope)
+    if len(hits) > limit:
+        hits = hits[:limit]
+        last = hits[-1]
+        response.headers[NEXT_CURSOR_HEADER] = (
+            encode_id_cursor(last["comment_id"]) if sort == "recent"
+            else encode_rank_cursor(last["score"], last["comment_id"])
+        )
+    return hits
@@ -0,0 +1,87 @@
+import re
+from typing import Optional
+
+from sqlalchemy import DateTime, Float, text
+from sqlalchemy.orm import Session
+
+from Grievances.models import TicketID
+from .index import COMMENTS_FTS, CONTENT_COLUMN, SCOPE_COLUMN
+
+# Highlighted excerpt of the matching comment: up to 12 tokens around the best match
+_SNIPPET = f"snippet({COMMENTS_FTS}, 0, '<mark>', '</mark>', '…', 12)"
+# bm25 is lower for better matches; negated so that higher scores rank first. Scope tokens weigh nothing
+_SCORE = f"-bm25({COMMENTS_FTS}, 1.0, 0.0)"
+
+
+# Function to turn free text into a safe FTS5 query: every word becomes a quoted phrase (all must match)
+# and a trailing * keeps prefix search. Returns None when nothing searchable is left
+def match_expression(q: str) -> Optional[str]:
+    terms = []
+    for word in q.split():
+        prefix = word.endswith("*")
+        word = word.replace('"', "").rstrip("*")
+        if re.search(r"\w", word):
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms) or None
+
+
+# Function to search comment text, ranked by relevance (sort="relevance") or newest first (sort="recent")
+# owner_id / assignee_id / grievance_id restrict the search to some grievances. 'after' is the position
+# of the last hit already returned: (score, comment ID) for relevance, the comment ID for recent
+def search_comments(
+    db: Session,
+    match: str,
+    sort: str = "relevance",
+    owner_id: int | None = None,
+    assignee_id: int | None = None,
+    grievance_id: int | None = None,
+    after=None,
+    limit: int = 50,
+):
+    # The words only match comment text; the scope tokens are ANDed in, so FTS5 only walks hits in scope
+    expression = f"{CONTENT_COLUMN} : ({match})"
+    for prefix, value in (("u", owner_id), ("a", assignee_id), ("g", grievance_id)):
+        if value is not None:
+            expression += f' AND {SCOPE_COLUMN} : "{prefix}{int(value)}"'
+    params = {"match": expression, "limit": limit}
+    columns = "c.id AS comment_id, c.grievance_id, g.ticket_id, c.user_id, c.timestamp"
+    joins = "JOIN comments c ON c.id = {id} LEFT JOIN grievances g ON g.id = c.grievance_id"
+
+    if sort == "recent":
+        # FTS5 walks its doclists in rowid order, so newest-first pages stop after `limit` hits.
+        # Not scored: bm25 would first count every match of every word in the whole index
+        after_clause = ""
+        if after is not None:
+            after_clause = f" AND {COMMENTS_FTS}.rowid < :after_id"
+            params["after_id"] = after
+        statement = text(
+            f"SELECT {columns}, {_SNIPPET} AS snippet, NULL AS score FROM {COMMENTS_FTS} "
+            f"{joins.format(id=COMMENTS_FTS + '.rowid')} "
+            f"WHERE {COMMENTS_FTS} MATCH :match{after_clause} ORDER BY {COMMENTS_FTS}.rowid DESC LIMIT :limit"
+        )
+    else:
+        after_clause = ""
+        if after is not None:
+            after_clause = (f" AND ({_SCORE} < :after_score OR "
+                            f"({_SCORE} = :after_score AND {COMMENTS_FTS}.rowid > :after_id))")
+            params["after_score"], params["after_id"] = after
+        if "*" in match:
+            # Probing the index again for the snippets would expand every prefix once per row
+            statement = text(
+                f"SELECT {columns}, {_SNIPPET} AS snippet, {_SCORE} AS score FROM {COMMENTS_FTS} "
+                f"{joins.format(id=COMMENTS_FTS + '.rowid')} "
+                f"WHERE {COMMENTS_FTS} MATCH :match{after_clause} ORDER BY score DESC, c.id LIMIT :limit"
+            )
+        else:
+            # Every match has to be scored, so the page is ranked on the index alone first; the joins and
+            # the snippets (which re-read and re-tokenize the text) are then only paid for the rows returned
+            ranked = (f"SELECT rowid AS id, {_SCORE} AS score FROM {COMMENTS_FTS} "
+                      f"WHERE {COMMENTS_FTS} MATCH :match{after_clause} ORDER BY score DESC, rowid LIMIT :limit")
+            statement = text(
+                f"SELECT {columns}, {_SNIPPET} AS snippet, page.score FROM ({ranked}) AS page "
+                f"CROSS JOIN {COMMENTS_FTS} {joins.format(id='page.id')} "
+                f"WHERE {COMMENTS_FTS} MATCH :match AND {COMMENTS_FTS}.rowid = page.id "
+                f"ORDER BY page.score DESC, page.id"
+            )
+    statement = statement.columns(timestamp=DateTime, score=Float, ticket_id=TicketID)
+    return db.execute(statement, params).mappings().all()
@@ -0,0 +1,90 @@
+# Search/index.py
+# SQLite FTS5 index over comment text. It is an external-content table: the index stores only the
+# tokens and reads the text back through a view over `comments`. Triggers on `comments` and `grievances`
+# update it in the same transaction as every write, so ORM writes, bulk inserts and raw SQL are all covered
+#
+# Besides the text, every comment is indexed with scope tokens naming its grievance, the grievance's owner
+# and its assignee ("g12 u5 a40"). Role-scoped searches add one of them to the MATCH, so FTS5 intersects
+# the two doclists instead of the database joining every match against grievances
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# Name of the FTS5 table; its rowid is comments.id
+COMMENTS_FTS = "comments_fts"
+# View the index reads its rows from (comment text plus the scope tokens of its grievance)
+_SOURCE = "comments_fts_source"
+
+# Columns of the index, in order: 0 is searched and highlighted, 1 only narrows searches to a scope
+CONTENT_COLUMN = "content"
+SCOPE_COLUMN = "scope"
+
+_CREATE_VIEW = f"""
+CREATE VIEW IF NOT EXISTS {_SOURCE} AS
+SELECT c.id AS id,
+       c.content AS {CONTENT_COLUMN},
+       'g' || c.grievance_id || IFNULL(' u' || g.user_id, '') || IFNULL(' a' || g.assigned_to, '') AS {SCOPE_COLUMN}
+FROM comments c LEFT JOIN grievances g ON g.id = c.grievance_id
+"""
+
+# unicode61 folds case and, with remove_diacritics 2, accents ("resume" matches "résumé")
+_CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE {COMMENTS_FTS} USING fts5(
+    {CONTENT_COLUMN},
+    {SCOPE_COLUMN},
+    content='{_SOURCE}',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+# External-content deletes must pass the values that were indexed, so entries are removed before a row
+# changes (reading the old values from the view) and added back after it
+_REMOVE = (f"INSERT INTO {COMMENTS_FTS}({COMMENTS_FTS}, rowid, {CONTENT_COLUMN}, {SCOPE_COLUMN}) "
+           f"SELECT 'delete', id, {CONTENT_COLUMN}, {SCOPE_COLUMN} FROM {_SOURCE} WHERE id {{where}};")
+_ADD = (f"INSERT INTO {COMMENTS_FTS}(rowid, {CONTENT_COLUMN}, {SCOPE_COLUMN}) "
+        f"SELECT id, {CONTENT_COLUMN}, {SCOPE_COLUMN} FROM {_SOURCE} WHERE id {{where}};")
+_THREAD = "IN (SELECT id FROM comments WHERE grievance_id = {row}.id)"
+# A grievance's owner or assignee moves its comments to another scope
+_SCOPE_CHANGED = "old.user_id IS NOT new.user_id OR old.assigned_to IS NOT new.assigned_to"
+
+_TRIGGERS = {
+    f"{COMMENTS_FTS}_ai": f"AFTER INSERT ON comments BEGIN {_ADD.format(where='= new.id')} END",
+    f"{COMMENTS_FTS}_bd": f"BEFORE DELETE ON comments BEGIN {_REMOVE.format(where='= old.id')} END",
+    f"{COMMENTS_FTS}_bu": (f"BEFORE UPDATE OF content, grievance_id ON comments "
+                           f"BEGIN {_REMOVE.format(where='= old.id')} END"),
+    f"{COMMENTS_FTS}_au": (f"AFTER UPDATE OF content, grievance_id ON comments "
+                           f"BEGIN {_ADD.format(where='= new.id')} END"),
+    f"{COMMENTS_FTS}_grievance_bu": (f"BEFORE UPDATE OF user_id, assigned_to ON grievances WHEN {_SCOPE_CHANGED} "
+                                     f"BEGIN {_REMOVE.format(where=_THREAD.format(row='old'))} END"),
+    f"{COMMENTS_FTS}_grievance_au": (f"AFTER UPDATE OF user_id, assigned_to ON grievances WHEN {_SCOPE_CHANGED} "
+                                     f"BEGIN {_ADD.format(where=_THREAD.format(row='new'))} END"),
+    f"{COMMENTS_FTS}_grievance_bd": (f"BEFORE DELETE ON grievances "
+                                     f"BEGIN {_REMOVE.format(where=_THREAD.format(row='old'))} END"),
+    f"{COMMENTS_FTS}_grievance_ad": (f"AFTER DELETE ON grievances "
+                                     f"BEGIN {_ADD.format(where=_THREAD.format(row='old'))} END"),
+}
+
+# Set by ensure_search_index: False on databases without FTS5 (e.g. Postgres), where search is disabled
+fts_enabled = False
+
+
+# Function to create the index, its view and triggers if missing; a new index is filled from existing comments
+def ensure_search_index(engine: Engine) -> bool:
+    global fts_enabled
+    if engine.dialect.name != "sqlite":
+        fts_enabled = False
+        return False
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": COMMENTS_FTS}
+        ).first()
+        conn.execute(text(_CREATE_VIEW))
+        if not exists:
+            conn.execute(text(_CREATE_TABLE))
+        for name, body in _TRIGGERS.items():
+            conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+        if not exists:
+            conn.execute(text(f"INSERT INTO {COMMENTS_FTS}({COMMENTS_FTS}) VALUES ('rebuild')"))
+    fts_enabled = True
+    return True
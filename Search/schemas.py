@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+# One comment matching a search, with the ticket it belongs to
+class SearchHit(BaseModel):
+    comment_id: int
+    grievance_id: int
+    ticket_id: Optional[str] = None     # Ticket of the grievance the comment was posted on
+    user_id: Optional[int] = None       # Author of the comment
+    timestamp: Optional[datetime] = None
+    snippet: str                        # Excerpt with the matched words wrapped in <mark>...</mark>
+    score: Optional[float] = None       # Relevance (BM25), higher is better; not computed for sort=recent
+
+    class Config:
+        orm_mode = True
+        from_attributes = True
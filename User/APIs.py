@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from typing import List, Union
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Union
 from passlib.context import CryptContext
-from User import crud, schemas, models
-from database import get_db
+from User import crud, schemas, models, hashing
+from database import get_db, run_db
 from dependencies import get_current_active_user, RoleChecker
 from roles import RoleEnum as Role
+from bulk_io import ImportReport, export_response, import_rows
+from Grievances.scheduler import assignment_scheduler
+import response_cache
+from config import DEFAULT_PAGE_SIZE, FAST_JSON, MAX_PAGE_SIZE
+from pagination import NEXT_CURSOR_HEADER, decode_id_cursor, encode_id_cursor
 
 # Initialize FastAPI router with prefix and tags for user-related endpoints
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -15,40 +21,109 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Create a role checker for admin, employee, and super_admin roles
 role_admin_employee_super = RoleChecker([Role.admin, Role.employee, Role.super_admin])
+# Create a role checker for admin and super_admin roles
+role_admin_super = RoleChecker([Role.admin, Role.super_admin])
 
 @router.post("/", response_model=schemas.UserFull)
-def create_user(
+async def create_user(
     user: schemas.UserCreate,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(role_admin_employee_super),
 ):
     # Endpoint to create a new user, restricted to admin, employee, or super_admin
+    # Hash the password on the dedicated bcrypt pool (503 if it is saturated)
+    hashed = await hashing.hash_password(user.password)
     # Call the CRUD function to create and return the user
-    return crud.create_user(db, user)
+    try:
+        return await run_db(db, crud.create_user, user, hashed)
+    except IntegrityError:
+        # The unique index on users.email rejected a duplicate
+        raise HTTPException(status_code=400, detail="Email already registered")
 
 @router.get("/", response_model=List[Union[schemas.UserLimited, schemas.UserFull]])
-def read_users(
+async def read_users(
+    request: Request,
+    cursor: Optional[str] = None,  # X-Next-Cursor value from the previous page
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),  # Page size
+    role: Optional[Role] = None,  # Only users with this role
+    department_id: Optional[int] = None,  # Only users of this department
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user),
 ):
-    # Endpoint to retrieve all users, with role-based response data
-    # Fetch all users from the database
-    users = crud.get_users(db)
-    # If the current user is a regular user, return limited user information
-    if current_user.role == Role.user:
-        return [schemas.UserLimited.from_orm(u) for u in users]
-    # If the current user is admin, employee, or super_admin, return full user information
-    return [schemas.UserFull.from_orm(u) for u in users]
+    # Endpoint to list users in id order, one page at a time, with role-based response data
+    # If the current user is a regular user, return limited user information;
+    # if the current user is admin, employee, or super_admin, return full user information
+    schema = schemas.UserLimited if current_user.role == Role.user else schemas.UserFull
+    # Regular users cannot see departments, so they cannot filter by them either
+    if department_id is not None and schema is schemas.UserLimited:
+        raise HTTPException(status_code=403, detail="Not authorized to filter by department")
+
+    # Select only the schema's columns; password hashes are never read
+    # Pages are cached until the next user write (ETag / If-None-Match, see response_cache.py)
+    async def render():
+        after_id = decode_id_cursor(cursor) if cursor else None
+        # Fetch one extra row to learn whether another page exists
+        rows = await run_db(db, crud.list_users, list(schema.model_fields), role=role,
+                            department_id=department_id, after_id=after_id, limit=limit + 1)
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers[NEXT_CURSOR_HEADER] = encode_id_cursor(rows[-1].id)
+        if FAST_JSON:
+            return response_cache.dump_rows(rows), headers
+        return response_cache.dump_json(List[schema], rows), headers
+
+    variant = (schema.__name__, role, department_id, cursor, limit)
+    return await response_cache.conditional_response(request, response_cache.USERS, variant, render)
+
+# Function hashing the plain passwords of an import batch on the bcrypt pool
+async def _hash_import_batch(rows: List[schemas.UserImport]):
+    pending = [r for r in rows if r.password_hash is None]
+    for row, hashed in zip(pending, await hashing.hash_passwords([r.password for r in pending])):
+        row.password_hash = hashed
+
+@router.post("/import", response_model=ImportReport)
+async def import_users(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(role_admin_super),
+):
+    # Endpoint to bulk-import users from an NDJSON or CSV body, restricted to admin or super_admin
+    # Rows are validated against UserImport, plain passwords are hashed on the bcrypt pool,
+    # and each batch is inserted with one executemany; rejected rows are listed in the report
+    # Only super_admin may carry over existing password hashes (as only super_admin can export them)
+    schema = schemas.UserImport if current_user.role == Role.super_admin else schemas.UserImportPlain
+    report = await import_rows(request, db, schema, crud.import_users, prepare=_hash_import_batch)
+    if report.inserted:
+        # New employees join the assignment pool
+        await run_db(db, assignment_scheduler.rebuild)
+    return report
+
+@router.get("/export")
+async def export_users(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    include_password_hash: bool = False,
+    current_user: models.User = Depends(role_admin_super),
+):
+    # Endpoint to stream all users as NDJSON or CSV in id order, restricted to admin or super_admin
+    # Password hashes (for re-import elsewhere) are only included for super_admin
+    if include_password_hash and current_user.role != Role.super_admin:
+        raise HTTPException(status_code=403, detail="Only super_admin can export password hashes")
+    columns = crud.EXPORT_COLUMNS + (["password_hash"] if include_password_hash else [])
+
+    def fetch_page(db, after_id, limit):
+        return crud.export_users(db, after_id, limit, with_password_hash=include_password_hash)
+    return export_response(fetch_page, columns, format, "users")
 
 @router.get("/{user_id}", response_model=Union[schemas.UserLimited, schemas.UserFull])
-def read_user(
+async def read_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user),
 ):
     # Endpoint to retrieve a single user by ID, with role-based response data
     # Fetch the user by ID from the database
-    user = crud.get_user(db, user_id)
+    user = await run_db(db, crud.get_user, user_id)
     # Raise an HTTP 404 error if the user is not found
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -65,5 +140,32 @@ def read_user(
     raise HTTPException(status_code=403, detail="Not authorized")
 
 @router.post("/reset-password")
-def reset_password(data: schemas.PasswordReset, db: Session = Depends(get_db)):
-    # Endpoint to reset a user's password using
+async def reset_password(
+    data: schemas.PasswordReset,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user),
+):
+    # Endpoint to reset a password: users change their own by confirming the old one,
+    # admin resets other accounts below admin, and super_admin resets any account
+    is_admin = current_user.role in [Role.admin, Role.super_admin]
+    # Look up the user through the unique email index
+    user = await run_db(db, crud.get_user_by_email, data.email)
+    # Raise an HTTP 404 error if no account uses this email (only admins learn whether it exists)
+    if not user:
+        if is_admin:
+            raise HTTPException(status_code=404, detail="User not found")
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    if user.id == current_user.id:
+        # A self-reset must prove knowledge of the current password, so a stolen token cannot lock the owner out
+        if data.old_password is None or not await hashing.verify_password(data.old_password, user.password):
+            raise HTTPException(status_code=403, detail="Old password is incorrect")
+    elif not is_admin:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    elif current_user.role != Role.super_admin and user.role in [Role.admin, Role.super_admin]:
+        raise HTTPException(status_code=403, detail="Only super_admin can reset an admin's password")
+
+    # Hash on the bcrypt pool, then store it (also invalidates the cached principal)
+    hashed = await hashing.hash_password(data.new_password)
+    await run_db(db, crud.update_user_password, user, data.new_password, hashed)
+    return {"detail": "Password reset successful"}
@@ -1,9 +1,16 @@
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from . import models, schemas
 from Department.models import Department
 from Department.crud import create_department, get_departments
 from passlib.context import CryptContext
 from typing import List, Optional
+from roles import RoleEnum
+import auth_cache
+import response_cache
+from Grievances.scheduler import assignment_scheduler
+from bulk_io import insert_many
 
 # Password hashing context using bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -16,43 +23,78 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+# Function to check that a hash stored as is (bulk import) is one verify_password can read later;
+# a malformed value would make every login of that account fail
+def is_password_hash(value: str) -> bool:
+    handler = pwd_context.identify(value, resolve=True)
+    if handler is None:
+        return False
+    try:
+        handler.from_string(value)  # Parses the cost, salt and checksum
+    except (ValueError, TypeError):
+        return False
+    return True
+
+# Function to return the ID of the fallback department "OTR", creating it if needed
+def get_fallback_department_id(db: Session) -> int:
+    print("No department_id provided, checking for OTR...")
+    department = db.query(Department).filter_by(name="OTR").first()
+    if not department:
+        print("OTR not found, creating...")
+        department = Department(name="OTR")  # Create a new Department instance
+        db.add(department)                  # Add department to the session
+        db.commit()                         # Commit to persist the new department
+        db.refresh(department)              # Refresh to get the assigned ID
+        response_cache.bump(response_cache.DEPARTMENTS)
+        print("OTR created.")
+    print("Using department_id:", department.id)
+    return department.id                    # Use the fetched/created department's ID
+
 # Function to create a new user in the database
-def create_user(db: Session, user: schemas.UserCreate):
+# hashed_password lets async callers hash on the bcrypt pool (User/hashing.py) beforehand
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
     # If department_id is not provided, use/create a fallback department "OTR"
     if user.department_id is None:
-        print("No department_id provided, checking for OTR...")
-        department = db.query(Department).filter_by(name="OTR").first()
-        if not department:
-            print("OTR not found, creating...")
-            department = Department(name="OTR")  # Create a new Department instance
-            db.add(department)                  # Add department to the session
-            db.commit()                         # Commit to persist the new department
-            db.refresh(department)              # Refresh to get the assigned ID
-            print("OTR created.")
-        department_id = department.id           # Use the fetched/created department's ID
-        print("Using department_id:", department_id)
+        department_id = get_fallback_department_id(db)
     else:
         department_id = user.department_id      # Use the provided department ID
 
     # Create a new User instance with hashed password
     db_user = models.User(
         email=user.email,
-        password=get_password_hash(user.password),  # Hash password for secure storage
+        password=hashed_password or get_password_hash(user.password),  # Hash password for secure storage
         department_id=department_id,
         role=user.role
     )
 
     # Add user to the session and commit to save
     db.add(db_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # Leave the session usable; the caller reports the duplicate email
+        raise
     db.refresh(db_user)  # Refresh to get generated fields like ID
+    response_cache.bump(response_cache.USERS)  # Cached user lists are now stale
+    # New employees start receiving grievances of their department immediately
+    if db_user.role == RoleEnum.employee:
+        assignment_scheduler.add_employee(db_user.id, db_user.department_id)
     return db_user       # Return the created user object
 
+# Function to check whether an email is already registered
+# Uses an EXISTS probe on the unique index of users.email instead of loading any rows
+def email_exists(db: Session, email: str) -> bool:
+    return db.query(exists().where(models.User.email == email)).scalar()
+
+# Function to fetch a single user by email through the unique email index
+def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
+    return db.query(models.User).filter(models.User.email == email).first()
+
 # Function to authenticate user credentials
 def authenticate_user(db: Session, email: str, password: str) -> Optional[models.User]:
     # Find user by email
-    user = db.query(models.User).filter(models.User.email == email).first()
-    
+    user = get_user_by_email(db, email)
+
     # If user not found or password doesn't match, return None
     if not user:
         return None
@@ -73,6 +115,95 @@ def get_users(db: Session, role_filter: List[str] = None):
     # Return all matched users
     return query.all()
 
+# Function to list users page by page, selecting only the given columns (never more than the caller may see)
+# Keyset pagination on id; the (role, department_id, id) index serves the role/department filters
+def list_users(db: Session, fields: List[str], role: Optional[RoleEnum] = None,
+               department_id: Optional[int] = None, after_id: Optional[int] = None, limit: int = 50):
+    U = models.User
+    query = select(*[getattr(U, field) for field in fields])
+    if role is not None:
+        query = query.where(U.role == role)
+    if department_id is not None:
+        query = query.where(U.department_id == department_id)
+    if after_id is not None:
+        query = query.where(U.id > after_id)
+    return db.execute(query.order_by(U.id).limit(limit)).all()
+
 # Function to get a user by user ID
 def get_user(db: Session, user_id: int):
     return db.query(models.User).filter(models.User.id == user_id).first()
+
+# Function to replace a user's password with a new hashed password
+def update_user_password(db: Session, user: models.User, new_password: str,
+                         hashed_password: Optional[str] = None) -> models.User:
+    user.password = hashed_password or get_password_hash(new_password)  # Hash the new password before storing it
+    db.commit()
+    db.refresh(user)
+    auth_cache.invalidate_user(user.id)  # Cached principals must not outlive a credential change
+    response_cache.bump(response_cache.USERS)
+    return user
+
+# Function to change a user's role
+def update_user_role(db: Session, user_id: int, role: RoleEnum) -> Optional[models.User]:
+    user = get_user(db, user_id)
+    if not user:
+        return None
+    was_employee = user.role == RoleEnum.employee
+    user.role = role
+    db.commit()
+    db.refresh(user)
+    auth_cache.invalidate_user(user.id)  # Drop the cached principal so the new role applies immediately
+    response_cache.bump(response_cache.USERS)
+    # Keep the assignment scheduler's employee pool in step with the role
+    if was_employee and user.role != RoleEnum.employee:
+        assignment_scheduler.remove_employee(user.id)
+    elif not was_employee and user.role == RoleEnum.employee:
+        assignment_scheduler.rebuild(db)  # Picks up the employee together with any tickets they hold
+    return user
+
+# Columns written by GET /users/export, in order (id first, for keyset paging)
+EXPORT_COLUMNS = ["id", "email", "name", "department_id", "role"]
+
+# Function to insert one batch of validated UserImport rows with a single executemany
+# Passwords must already be hashed into password_hash (see User/hashing.hash_passwords);
+# returns (position, message) for every row that was not stored
+def import_users(db: Session, rows: List[schemas.UserImport]) -> list:
+    taken = set(db.scalars(select(models.User.email).where(models.User.email.in_({r.email for r in rows}))))
+    known_departments = set(db.scalars(select(Department.id).where(
+        Department.id.in_({r.department_id for r in rows if r.department_id is not None}))))
+    fallback_id = None
+
+    failures, values, positions = [], [], []
+    for position, r in enumerate(rows):
+        if r.email in taken:
+            failures.append((position, f"Email already registered: {r.email}"))
+            continue
+        if not is_password_hash(r.password_hash):
+            failures.append((position, "password_hash is not a bcrypt hash"))
+            continue
+        if r.department_id is not None and r.department_id not in known_departments:
+            failures.append((position, f"Unknown department_id {r.department_id}"))
+            continue
+        if r.department_id is None and fallback_id is None:
+            fallback_id = get_fallback_department_id(db)
+        taken.add(r.email)  # Also rejects repeats within the batch
+        values.append(dict(
+            email=r.email,
+            name=r.name,
+            password=r.password_hash,
+            department_id=r.department_id if r.department_id is not None else fallback_id,
+            role=r.role,
+        ))
+        positions.append(position)
+    failures += insert_many(db, models.User, values, positions)
+    if values:
+        response_cache.bump(response_cache.USERS)
+    return failures
+
+# Function to fetch one page of GET /users/export as plain column tuples in id order
+def export_users(db: Session, after_id: int, limit: int, with_password_hash: bool = False):
+    columns = [getattr(models.User, c) for c in EXPORT_COLUMNS]
+    if with_password_hash:
+        columns.append(models.User.password)
+    query = select(*columns).where(models.User.id > after_id).order_by(models.User.id).limit(limit)
+    return db.execute(query).all()
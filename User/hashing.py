@@ -0,0 +1,74 @@
+# User/hashing.py
+# Runs bcrypt hashing and verification on a dedicated, bounded thread pool
+# so password work cannot occupy the request threadpool or the event loop
+
+import asyncio  # Awaiting work submitted to the executor
+import threading  # Semaphore that bounds running + queued hash jobs
+import time  # bcrypt timing for metrics
+from concurrent.futures import ThreadPoolExecutor  # Dedicated bcrypt worker threads
+
+from config import HASH_POOL_SIZE, HASH_QUEUE_LIMIT  # Pool size and queue limit
+from User import crud  # Synchronous passlib helpers
+import metrics  # Time spent in bcrypt, per route
+
+
+# Raised when the pool already holds HASH_POOL_SIZE running and HASH_QUEUE_LIMIT queued jobs
+class HashingPoolSaturated(Exception):
+    pass
+
+
+# Worker threads dedicated to bcrypt (bcrypt releases the GIL, so they run in parallel)
+_executor = ThreadPoolExecutor(max_workers=HASH_POOL_SIZE, thread_name_prefix="bcrypt")
+# One slot per running or waiting job; taking a slot never blocks
+_slots = threading.BoundedSemaphore(HASH_POOL_SIZE + HASH_QUEUE_LIMIT)
+
+
+# Function run on a worker thread: fn(*args) and how long it took (queue wait excluded)
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+# Function to run fn(*args) on the hashing pool, rejecting immediately when it is full
+async def _run(operation: str, fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise HashingPoolSaturated()
+    try:
+        job = _executor.submit(_timed, fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    # The slot is held until the job itself is done, not until the awaiting request is: when a request is
+    # cancelled (client gone) its queued job is dropped, but a running one keeps counting against the limit
+    job.add_done_callback(lambda _: _slots.release())
+    result, seconds = await asyncio.wrap_future(job)
+    metrics.record_crypto(operation, seconds)
+    return result
+
+
+# Async version of crud.get_password_hash
+async def hash_password(password: str) -> str:
+    return await _run("bcrypt_hash", crud.get_password_hash, password)
+
+
+# Async version of crud.verify_password
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await _run("bcrypt_verify", crud.verify_password, plain, hashed)
+
+
+# Hash a batch of passwords for a bulk import, HASH_POOL_SIZE at a time
+# Waits for free slots instead of failing, and never takes more than the pool size,
+# so interactive signups and logins keep the queue
+async def hash_passwords(passwords: list) -> list:
+    async def one(password):
+        while True:
+            try:
+                return await hash_password(password)
+            except HashingPoolSaturated:
+                await asyncio.sleep(0.05)
+
+    hashes = []
+    for start in range(0, len(passwords), HASH_POOL_SIZE):
+        hashes += await asyncio.gather(*(one(p) for p in passwords[start:start + HASH_POOL_SIZE]))
+    return hashes
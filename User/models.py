@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey  # Import necessary SQLAlchemy classes
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, Index  # Import necessary SQLAlchemy classes
 from database import Base  # Import Base class for SQLAlchemy model inheritance
 from roles import RoleEnum  # Import custom Enum class for user roles
 
@@ -12,3 +12,8 @@ class User(Base):
     password = Column(String)  # Hashed password for the user
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)  # Foreign key to departments table (optional)
     role = Column(Enum(RoleEnum), default=RoleEnum.user)  # Role of the user, defaults to 'user' from RoleEnum
+
+    # Composite index for the user listing filtered by role and/or department, in id order
+    __table_args__ = (
+        Index("ix_users_role_department", "role", "department_id", "id"),
+    )
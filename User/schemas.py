@@ -1,15 +1,16 @@
 # User/schemas.py
 # Defines Pydantic models for user-related data validation and serialization in the application
 
-from pydantic import BaseModel  # Import BaseModel for creating Pydantic models
+from pydantic import BaseModel, model_validator  # Import BaseModel for creating Pydantic models
 from pydantic.networks import EmailStr  # Import EmailStr for email validation
 from typing import Optional  # Import Optional for optional type hints
 from roles import RoleEnum  # Import RoleEnum for user role enumeration
 
-# Model for password reset requests
+# Model for password reset requests (see POST /users/reset-password)
 class PasswordReset(BaseModel):
     email: EmailStr  # User's email address, validated as a proper email format
     new_password: str  # New password to be set for the user
+    old_password: Optional[str] = None  # Current password, required when resetting one's own
 
 # Base model containing common user attributes
 class UserBase(BaseModel):
@@ -18,23 +19,49 @@ class UserBase(BaseModel):
     department_id: Optional[int] = None  # Optional department ID, defaults to None if not provided
     role: RoleEnum = RoleEnum.user  # User role, defaults to 'user' from RoleEnum
 
-# Model for limited user data, inheriting from UserBase
-class UserLimited(UserBase):
-    # Inherits all fields from UserBase, intentionally excludes department info in usage
-    pass
-
-# Model for complete user data, including department ID
-class UserFull(UserBase):
-    department_id: Optional[int]  # Explicitly includes department ID, remains optional
+# Model for limited user data shown to regular users: no department info and never the password hash
+# The listing selects exactly these columns (see crud.list_users), in this order
+class UserLimited(BaseModel):
+    id: int  # User ID
+    email: str  # User's email address
+    role: RoleEnum  # User role
 
     # Pydantic configuration for the model
     class Config:
         orm_mode = True  # Enables ORM compatibility for database interactions
         from_attributes = True  # Allows model instantiation from object attributes
 
+# Model for complete user data, including department ID (still without the password hash)
+class UserFull(UserLimited):
+    name: Optional[str] = None  # User's name, if set
+    department_id: Optional[int] = None  # Explicitly includes department ID, remains optional
+
 # Model for creating new users
 class UserCreate(BaseModel):
     email: str  # Email address for the new user
     password: str  # Password for the new user
     department_id: Optional[int] = None  # Optional department ID, defaults to None
     role: RoleEnum  # Role for the new user, must be a valid RoleEnum value
+
+# Model for one row of a bulk import (see POST /users/import)
+# Carries either a plain password (hashed during the import) or an existing bcrypt hash, e.g. from GET /users/export
+class UserImport(UserCreate):
+    password: Optional[str] = None  # Plain password, hashed on the bcrypt pool
+    password_hash: Optional[str] = None  # Already-hashed password, stored as is
+    name: Optional[str] = None  # Optional display name
+    role: RoleEnum = RoleEnum.user  # Role for the imported user, defaults to 'user'
+
+    @model_validator(mode="after")
+    def one_password(self):
+        # Exactly one of the two password fields must be given
+        if (self.password is None) == (self.password_hash is None):
+            raise ValueError("Provide exactly one of password or password_hash")
+        return self
+
+# Import row accepted from admins: plain passwords only. Raw hashes, like their export, are for super_admin
+class UserImportPlain(UserImport):
+    @model_validator(mode="after")
+    def no_password_hash(self):
+        if self.password_hash is not None:
+            raise ValueError("Only super_admin can import password_hash")
+        return self
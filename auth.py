@@ -1,33 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException, status  # FastAPI modules for routing, dependency injection, and error handling
 from sqlalchemy.orm import Session  # SQLAlchemy session for database interaction
+from sqlalchemy.exc import IntegrityError  # Raised when the unique email index rejects a duplicate
 from fastapi.security import OAuth2PasswordRequestForm  # Form class for handling OAuth2 login requests
 from datetime import timedelta  # To set token expiration time
 
-from database import get_db  # Dependency to get database session
-from User import crud, schemas  # Importing CRUD operations and data schemas for the User
-from dependencies import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES  # JWT utility functions and token duration
+from database import get_db, run_db  # Database session dependency and CRUD runner
+from User import crud, schemas, hashing  # CRUD operations, data schemas and the bcrypt pool for the User
+from dependencies import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, RoleChecker  # JWT utilities, token duration, role checks
 from roles import RoleEnum  # Enum class for user roles
+import auth_cache  # Token / principal caches used by get_current_user
 
 # Create a new API router for authentication-related endpoints
 router = APIRouter(tags=["Authentication"])
 
 # Endpoint for user registration (signup)
 @router.post("/signup", response_model=schemas.UserFull, status_code=status.HTTP_201_CREATED)
-def signup(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
-    # Fetch all existing users (optionally filter by role)
-    existing = crud.get_users(db, role_filter=None)
-    # Check if the email is already registered
-    if any(u.email == user_in.email for u in existing):
+async def signup(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
+    # Check if the email is already registered (single indexed lookup)
+    if await run_db(db, crud.email_exists, user_in.email):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    # Hash the password on the dedicated bcrypt pool (503 if it is saturated)
+    hashed = await hashing.hash_password(user_in.password)
+    try:
+        # Create a new user if email is unique
+        return await run_db(db, crud.create_user, user_in, hashed)
+    except IntegrityError:
+        # A concurrent signup inserted the same email between the check and the commit
         raise HTTPException(status_code=400, detail="Email already registered")
-    # Create a new user if email is unique
-    return crud.create_user(db, user_in)
 
 # Endpoint for user login and JWT generation
 @router.post("/login", summary="Login and get JWT")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    # Authenticate user with provided email and password
-    user = crud.authenticate_user(db, form_data.username, form_data.password)
-    if not user:
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    # Find the user by email, then verify the password on the bcrypt pool
+    user = await run_db(db, crud.get_user_by_email, form_data.username)
+    if not user or not await hashing.verify_password(form_data.password, user.password):
         # Raise error if authentication fails
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,3 +49,8 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     )
     # Return the token in response
     return {"access_token": access_token, "token_type": "bearer"}
+
+# Endpoint exposing hit/miss counters of the authentication caches (admins only)
+@router.get("/auth/cache-stats", summary="Authentication cache counters")
+def cache_stats(current_user=Depends(RoleChecker([RoleEnum.admin, RoleEnum.super_admin]))):
+    return auth_cache.cache_stats()
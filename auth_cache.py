@@ -0,0 +1,31 @@
+# auth_cache.py
+# Caches used by dependencies.get_current_user to skip JWT decoding and the user lookup
+
+from dataclasses import dataclass  # Lightweight immutable record for resolved users
+
+from config import AUTH_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS  # Cache bounds
+from ttl_cache import TTLCache  # Bounded LRU cache with expiry
+
+
+# The parts of a user that authorization needs, detached from any database session
+@dataclass(frozen=True)
+class Principal:
+    id: int  # User ID
+    role: str  # User role (RoleEnum value)
+    department_id: int | None  # Department the user belongs to
+
+
+# token -> user ID, for tokens whose signature and expiry were already verified
+token_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS)
+# user ID -> Principal, so an authenticated request does not query the users table
+principal_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS)
+
+
+# Function to drop a user's cached principal after their role or password changed
+def invalidate_user(user_id: int):
+    principal_cache.pop(user_id)
+
+
+# Function to report hit/miss counters for both caches
+def cache_stats() -> dict:
+    return {"tokens": token_cache.stats(), "principals": principal_cache.stats()}
@@ -0,0 +1,126 @@
+# benchmarks/bench_archive.py
+# Cost and effect of archiving closed grievances (Grievances/archive.py): the archival pass itself, the size of
+# the hot tables and the scans over them before and after, and point reads of live vs archived tickets
+# (by ticket ID, timeline and comment thread), which should cost about the same. The first pass moves
+# everything past the cutoff; the pass a day later shows the steady state
+#
+# Usage: python benchmarks/bench_archive.py [--sizes 100000 1000000] [--older-than-days 90]
+
+import argparse  # Command line options
+import json  # Results are exchanged and printed as JSON
+import os  # DATABASE_URL is passed to each worker through the environment
+import random  # Lookup targets
+import subprocess  # One interpreter per size, since the app reads DATABASE_URL at import time
+import sys  # Path of the running interpreter
+import time  # Wall clock
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Archival pass, hot-table scans and archived ticket reads")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="grievances")
+    parser.add_argument("--comments-per-grievance", type=int, default=2)
+    parser.add_argument("--older-than-days", type=float, default=90, help="archive tickets resolved before this")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def timed(fn) -> tuple:
+    started = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - started) * 1000, 1)
+
+
+# Worker: seed one database, measure the scans, archive, measure again and compare point reads
+def measure(size: int, comments_per_grievance: int, older_than_days: float) -> dict:
+    from common import (make_session_factory, seed_comments, seed_departments, seed_grievances, seed_users,
+                        time_calls)
+    from roles import RoleEnum
+    from sqlalchemy import text
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, 20)
+    seed_users(engine, 1_000)
+    seed_users(engine, 50, start=1_000, role=RoleEnum.employee, department_id=department_ids[0])
+    seed_grievances(engine, size, list(range(1, 1_001)), department_ids, employee_ids=list(range(1_001, 1_051)))
+    seed_comments(engine, size * comments_per_grievance, size, list(range(1, 1_051)))
+
+    import main  # Startup backfills the event log
+    from database import SessionLocal
+    from Comments import crud as comment_crud
+    from Grievances import archive, crud, history
+
+    db = SessionLocal()
+    rng = random.Random(5)
+
+    def rows(table):
+        return db.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+
+    def scans() -> dict:
+        # An unpaginated per-user list, a grouped count over the whole table and a full read of one status
+        return {
+            "user_list_ms": time_calls(lambda _: crud.get_grievances_by_user(db, rng.randrange(1, 1_001)),
+                                       20)["p50_ms"],
+            "grouped_count_ms": timed(lambda: db.execute(text(
+                "SELECT department_id, status, count(*) FROM grievances GROUP BY department_id, status")).all())[1],
+            "solved_scan_ms": timed(lambda: db.execute(text(
+                "SELECT id, created_at FROM grievances WHERE status = 'solved'")).all())[1],
+        }
+
+    before = {"grievances": rows("grievances"), "comments": rows("comments"), **scans()}
+    report, archive_ms = timed(lambda: archive.archive_closed(db, older_than_days=older_than_days))
+    after = {"grievances": rows("grievances"), "comments": rows("comments"), **scans()}
+    # A day later, the next pass only finds the tickets that aged past the cutoff since
+    next_day, next_day_ms = timed(lambda: archive.archive_closed(db, older_than_days=older_than_days - 1))
+
+    live = [tuple(r) for r in db.execute(text("SELECT id, ticket_id FROM grievances")).all()]
+    archived = [tuple(r) for r in db.execute(text("SELECT id, ticket_id FROM grievances_archive")).all()]
+
+    def reads(targets: list, is_archived: bool) -> dict:
+        picks = [rng.choice(targets) for _ in range(500)]
+        return {
+            "by_ticket": time_calls(lambda i: crud.get_grievance_by_ticket(db, picks[i][1]), 500)["p50_ms"],
+            "timeline": time_calls(lambda i: history.get_timeline(db, picks[i][0], archived=is_archived),
+                                   500)["p50_ms"],
+            "comments": time_calls(lambda i: comment_crud.get_comments_by_grievance(db, picks[i][0], limit=50),
+                                   500)["p50_ms"],
+        }
+
+    result = {
+        "grievances": size,
+        "archived": report.grievances,
+        "archived_comments": report.comments,
+        "archived_events": report.events,
+        "archive_ms": archive_ms,
+        "grievances_per_second": round(report.grievances / (archive_ms / 1000)) if archive_ms else None,
+        "next_day": {"archived": next_day.grievances, "ms": next_day_ms},
+        "before": before,
+        "after": after,
+        "live_reads": reads(live, False),
+        "archived_reads": reads(archived, True),
+    }
+    db.close()
+    return result
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.comments_per_grievance, args.older_than_days)))
+        return
+
+    from common import temp_sqlite_url
+    report = []
+    for size in args.sizes:
+        env = dict(os.environ, DATABASE_URL=temp_sqlite_url(), METRICS_ENABLED="false", SLA_MONITOR_ENABLED="false")
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", str(size),
+             "--comments-per-grievance", str(args.comments_per_grievance),
+             "--older-than-days", str(args.older_than_days)],
+            env=env, check=True, capture_output=True, text=True,
+        )
+        report.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_bulk_import.py
+# Compares loading data one request at a time (POST /grievances/, POST /users/) with the streaming
+# bulk endpoints (POST /grievances/import, POST /users/import), and times the streaming exports
+#
+# Usage: python benchmarks/bench_bulk_import.py [--grievances 20000] [--users 20000] [--single 100]
+
+import argparse  # Command line options
+import asyncio  # In-process ASGI client
+import json  # Request bodies and results
+import os  # Seeding targets the temporary DATABASE_URL chosen by common
+import time  # Wall clock
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-at-a-time inserts vs streaming bulk import/export")
+    parser.add_argument("--grievances", type=int, default=20_000, help="rows sent to /grievances/import")
+    parser.add_argument("--users", type=int, default=20_000, help="rows sent to /users/import (with hashes)")
+    parser.add_argument("--single", type=int, default=100, help="rows sent one request at a time")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+async def run(args) -> dict:
+    import httpx
+    from common import SEED_PASSWORD_HASH, make_session_factory, seed_departments, seed_users
+    from dependencies import create_access_token
+    from roles import RoleEnum
+    import main as app_main
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, 5)
+    seed_users(engine, 100)  # IDs 1..100 raise grievances
+    seed_users(engine, 1, start=100, role=RoleEnum.super_admin)  # ID 101 runs the imports
+    admin = {"Authorization": "Bearer " + create_access_token({"sub": "101"})}
+    user = {"Authorization": "Bearer " + create_access_token({"sub": "1"})}
+
+    def rate(rows, seconds):
+        return {"rows": rows, "seconds": round(seconds, 2), "rows_per_s": round(rows / seconds, 1)}
+
+    report = {}
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Grievances: one POST per row vs one streamed import
+        started = time.perf_counter()
+        for i in range(args.single):
+            r = await client.post("/grievances/", json={"department_id": department_ids[i % 5]}, headers=user)
+            assert r.status_code == 200, r.text
+        report["grievances_single"] = rate(args.single, time.perf_counter() - started)
+
+        async def grievance_rows():
+            for i in range(args.grievances):
+                row = {"user_id": 1 + i % 100, "department_id": department_ids[i % 5]}
+                yield (json.dumps(row) + "\n").encode()
+
+        started = time.perf_counter()
+        r = await client.post("/grievances/import", content=grievance_rows(),
+                              headers={**admin, "Content-Type": "application/x-ndjson"})
+        body = r.json()
+        report["grievances_import"] = {**rate(body["inserted"], time.perf_counter() - started),
+                                       "batches": body["batches"], "failed": body["failed"]}
+
+        # Users: one POST per row (bcrypt each) vs an import carrying existing hashes
+        started = time.perf_counter()
+        for i in range(args.single):
+            r = await client.post("/users/", headers=admin, json={
+                "email": f"single{i}@bench.local", "password": "password", "role": "user"})
+            assert r.status_code == 200, r.text
+        report["users_single"] = rate(args.single, time.perf_counter() - started)
+
+        async def user_rows():
+            for i in range(args.users):
+                row = {"email": f"import{i}@bench.local", "password_hash": SEED_PASSWORD_HASH,
+                       "department_id": department_ids[i % 5]}
+                yield (json.dumps(row) + "\n").encode()
+
+        started = time.perf_counter()
+        r = await client.post("/users/import", content=user_rows(),
+                              headers={**admin, "Content-Type": "application/x-ndjson"})
+        body = r.json()
+        report["users_import"] = {**rate(body["inserted"], time.perf_counter() - started),
+                                  "batches": body["batches"], "failed": body["failed"]}
+
+        # Exports stream page by page
+        for path in ("/grievances/export", "/users/export"):
+            started = time.perf_counter()
+            lines = 0
+            async with client.stream("GET", path, headers=admin) as r:
+                async for _ in r.aiter_lines():
+                    lines += 1
+            report[path.strip("/").replace("/", "_")] = rate(lines, time.perf_counter() - started)
+    return report
+
+
+if __name__ == "__main__":
+    main()
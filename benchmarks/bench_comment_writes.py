@@ -0,0 +1,136 @@
+# benchmarks/bench_comment_writes.py
+# Sustained POST /comments/ throughput with one commit per comment (default) and with the group-commit
+# writer (COMMENT_GROUP_COMMIT=true), for each SQLITE_SYNCHRONOUS level (FULL syncs the WAL on every commit).
+# "direct" is the same comparison on the write path alone (crud.create_comment from a thread pool vs the
+# writer), without HTTP, authentication and validation
+#
+# Usage: python benchmarks/bench_comment_writes.py [--concurrency 50 200] [--requests 5000]
+#                                                   [--synchronous NORMAL FULL]
+
+import argparse  # Command line options
+import asyncio  # Concurrent in-process clients
+import json  # Results are exchanged and printed as JSON
+import os  # Settings are passed to each worker through the environment
+import subprocess  # Each configuration runs in a fresh interpreter, since settings are read at import time
+import sys  # Path of the running interpreter
+import time  # Wall clock for throughput
+from concurrent.futures import ThreadPoolExecutor, wait  # Concurrent direct writes
+
+USERS = 1_000
+DEPARTMENTS = 10
+GRIEVANCES = 5_000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-request commits vs group commit for comment writes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--requests", type=int, default=5_000, help="comments posted per concurrency level")
+    parser.add_argument("--synchronous", nargs="+", default=["NORMAL", "FULL"])
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+# Seed one database that every configuration writes to
+def seed():
+    from common import seed_departments, seed_grievances, seed_users, make_session_factory
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, DEPARTMENTS)
+    seed_users(engine, USERS)
+    seed_grievances(engine, GRIEVANCES, list(range(1, USERS + 1)), department_ids)
+
+
+# Worker: post comments through the app imported with the current settings
+async def drive(args) -> list[dict]:
+    import httpx
+    from common import summarize
+    from dependencies import create_access_token
+    from Comments.writer import comment_writer
+    import main
+
+    user_headers = [{"Authorization": "Bearer " + create_access_token({"sub": str(i)})}
+                    for i in range(1, USERS + 1)]
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for concurrency in args.concurrency:
+            gate = asyncio.Semaphore(concurrency)
+            latencies, errors = [], 0
+            batches_before = comment_writer.batches
+
+            async def one(i):
+                nonlocal errors
+                async with gate:
+                    started = time.perf_counter()
+                    r = await client.post("/comments/", headers=user_headers[i % USERS],
+                                          json={"grievance_id": 1 + i % GRIEVANCES,
+                                                "user_id": 1 + i % USERS, "content": f"comment {i}"})
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    if r.status_code >= 400:
+                        errors += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.requests)))
+            elapsed = time.perf_counter() - started
+            batches = comment_writer.batches - batches_before
+            results.append({
+                "concurrency": concurrency,
+                "comments_per_s": round(args.requests / elapsed, 1),
+                "errors": errors,
+                "transactions": batches or args.requests - errors,
+                "latency": summarize(latencies),
+            })
+    return results
+
+
+# Worker: store comments without going through HTTP, as concurrent request handlers would
+def direct(args, group_commit: bool) -> dict:
+    from Comments import crud, schemas
+    from Comments.writer import comment_writer
+    from database import SessionLocal
+
+    comments = [schemas.CommentCreate(grievance_id=1 + i % GRIEVANCES, user_id=1 + i % USERS, content=f"direct {i}")
+                for i in range(args.requests)]
+
+    def one(comment):
+        db = SessionLocal()
+        try:
+            crud.create_comment(db, comment)
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    if group_commit:
+        wait([comment_writer.submit(comment) for comment in comments])
+    else:
+        with ThreadPoolExecutor(max_workers=max(args.concurrency)) as pool:
+            list(pool.map(one, comments))
+    return {"comments_per_s": round(args.requests / (time.perf_counter() - started), 1)}
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        http = asyncio.run(drive(args))
+        from config import COMMENT_GROUP_COMMIT  # Importable once drive() has loaded common
+        print(json.dumps({"http": http, "direct": direct(args, COMMENT_GROUP_COMMIT)}))
+        return
+
+    import common  # Selects a temporary DATABASE_URL for this run
+    seed()
+    report = {}
+    for synchronous in args.synchronous:
+        for mode, group_commit in (("per_request", "false"), ("group_commit", "true")):
+            env = dict(os.environ, SQLITE_SYNCHRONOUS=synchronous, COMMENT_GROUP_COMMIT=group_commit,
+                       METRICS_ENABLED="false")
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker",
+                 "--requests", str(args.requests), "--concurrency", *map(str, args.concurrency)],
+                env=env, check=True, capture_output=True, text=True,
+            )
+            report[f"{mode} synchronous={synchronous}"] = json.loads(out.stdout)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_conditional_get.py
+# Latency of the cached read endpoints in three cases: rendered from the database (cache cleared before
+# every call), served from the cached body, and answered 304 Not Modified from If-None-Match
+#
+# Usage: python benchmarks/bench_conditional_get.py [--departments 200] [--users 5000] [--repeat 300]
+
+import argparse  # Command line options
+import json  # Results are printed as JSON
+import os  # Seeding targets the temporary DATABASE_URL chosen by common
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uncached vs cached vs 304 reads")
+    parser.add_argument("--departments", type=int, default=200)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--grievances", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    from common import make_session_factory, seed_departments, seed_grievances, seed_users, time_calls
+    from fastapi.testclient import TestClient
+    from dependencies import create_access_token
+    from roles import RoleEnum
+    import main as app_main
+    import response_cache
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, args.departments)
+    seed_users(engine, args.users)
+    seed_users(engine, 1, start=args.users, role=RoleEnum.admin)
+    seed_grievances(engine, args.grievances, list(range(1, args.users + 1)), department_ids)
+
+    client = TestClient(app_main.app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": str(args.users + 1)})}
+    report = {}
+    for path, params in (("/departments/", {}), ("/users/", {}), ("/grievances/", {"limit": 100})):
+        etag = client.get(path, params=params, headers=headers).headers["etag"]
+
+        def uncached(_):
+            response_cache.body_cache.clear()
+            client.get(path, params=params, headers=headers)
+
+        report[path] = {
+            "uncached": time_calls(uncached, args.repeat),
+            "cached_body": time_calls(lambda _: client.get(path, params=params, headers=headers), args.repeat),
+            "not_modified": time_calls(
+                lambda _: client.get(path, params=params, headers={**headers, "If-None-Match": etag}), args.repeat),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/bench_dashboard_stats.py
+# Compares building the admin dashboard by downloading every grievance page (what admins had to do)
+# with GET /admin/stats, which reads the incrementally maintained counters in Grievances/stats.py
+#
+# Usage: python benchmarks/bench_dashboard_stats.py [--sizes 10000 100000] [--departments 20]
+
+import argparse  # Command line options
+import json  # Results are exchanged and printed as JSON
+import os  # DATABASE_URL is passed to each worker through the environment
+import subprocess  # One interpreter per size, since the app reads DATABASE_URL at import time
+import sys  # Path of the running interpreter
+import time  # Wall clock
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Dashboard from full list downloads vs /admin/stats")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="grievances")
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+# Worker: seed one database, start the app on it and time both ways of getting the numbers
+def measure(size: int, department_count: int) -> dict:
+    from collections import Counter
+    from common import make_session_factory, seed_departments, seed_grievances, seed_users, time_calls
+    from roles import RoleEnum
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, department_count)
+    seed_users(engine, 1_000)
+    seed_users(engine, 50, start=1_000, role=RoleEnum.employee, department_id=department_ids[0])
+    seed_users(engine, 1, start=1_050, role=RoleEnum.admin)
+    seed_grievances(engine, size, list(range(1, 1_001)), department_ids, employee_ids=list(range(1_001, 1_051)))
+
+    started = time.perf_counter()
+    import main  # Startup rebuilds the scheduler and the dashboard counters
+    startup_ms = (time.perf_counter() - started) * 1000
+    from fastapi.testclient import TestClient
+    from dependencies import create_access_token
+
+    client = TestClient(main.app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1051"})}
+
+    # The old way: page through every grievance and count on the client
+    def download(_):
+        counts, cursor = Counter(), None
+        while True:
+            params = {"limit": 500, **({"cursor": cursor} if cursor else {})}
+            r = client.get("/grievances/", params=params, headers=headers)
+            counts.update((g["department_id"], g["status"]) for g in r.json())
+            cursor = r.headers.get("x-next-cursor")
+            if not cursor:
+                return counts
+
+    return {
+        "grievances": size,
+        "startup_ms": round(startup_ms, 1),
+        "download_all_pages": time_calls(download, 3),
+        "admin_stats": time_calls(lambda _: client.get("/admin/stats", headers=headers), 200),
+        "recompute": time_calls(lambda _: client.post("/admin/stats/recompute", headers=headers), 3),
+    }
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.departments)))
+        return
+
+    from common import temp_sqlite_url
+    report = []
+    for size in args.sizes:
+        env = dict(os.environ, DATABASE_URL=temp_sqlite_url())
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", str(size), "--departments", str(args.departments)],
+            env=env, check=True, capture_output=True, text=True,
+        )
+        report.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
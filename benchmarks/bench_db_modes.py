@@ -0,0 +1,117 @@
+# benchmarks/bench_db_modes.py
+# Compares DB_MODE=sync (threadpool + Session) with DB_MODE=async (event loop + AsyncSession)
+# by running the same concurrent request mix through the ASGI app in each mode
+#
+# Usage: python benchmarks/bench_db_modes.py [--concurrency 50 200 500] [--requests 2000]
+
+import argparse  # Command line options
+import asyncio  # Concurrent in-process clients
+import json  # Results are exchanged and printed as JSON
+import os  # DB_MODE / DATABASE_URL are passed to each worker through the environment
+import subprocess  # Each mode runs in a fresh interpreter, since the mode is read at import time
+import sys  # Path of the running interpreter
+import time  # Wall clock for throughput
+
+USERS = 1_000  # Regular users (IDs 1..USERS)
+EMPLOYEES = 50  # Employees (IDs USERS+1..USERS+EMPLOYEES)
+DEPARTMENTS = 10
+GRIEVANCES = 20_000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync vs async database mode under concurrent load")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--requests", type=int, default=2_000, help="requests per concurrency level")
+    parser.add_argument("--worker", choices=["sync", "async"], help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+# Seed one database that both modes will read and write
+def seed() -> str:
+    from common import seed_departments, seed_grievances, seed_users, make_session_factory
+    from roles import RoleEnum
+
+    url = os.environ["DATABASE_URL"]
+    engine, _ = make_session_factory(url)
+    department_ids = seed_departments(engine, DEPARTMENTS)
+    seed_users(engine, USERS)
+    seed_users(engine, EMPLOYEES, start=USERS, role=RoleEnum.employee, department_id=department_ids[0])
+    seed_grievances(engine, GRIEVANCES, list(range(1, USERS + 1)), department_ids,
+                    employee_ids=list(range(USERS + 1, USERS + EMPLOYEES + 1)))
+    return url
+
+
+# Worker: drive the request mix against the app imported in the current DB_MODE
+async def drive(args) -> list[dict]:
+    import httpx
+    from common import summarize
+    from dependencies import create_access_token
+    import main
+
+    def headers(user_id: int) -> dict:
+        return {"Authorization": "Bearer " + create_access_token({"sub": str(user_id)})}
+
+    user_headers = [headers(i) for i in range(1, USERS + 1)]
+    employee_headers = [headers(USERS + i) for i in range(1, EMPLOYEES + 1)]
+
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for concurrency in args.concurrency:
+            gate = asyncio.Semaphore(concurrency)
+            latencies, errors = [], 0
+
+            async def one(i):
+                nonlocal errors
+                async with gate:
+                    started = time.perf_counter()
+                    kind = i % 4
+                    if kind == 0:  # A user listing their own grievances
+                        r = await client.get("/grievances/", headers=user_headers[i % USERS])
+                    elif kind == 1:  # An employee listing assigned grievances
+                        r = await client.get("/grievances/", headers=employee_headers[i % EMPLOYEES])
+                    elif kind == 2:  # Reading a comment thread
+                        r = await client.get(f"/comments/grievance/{1 + i % GRIEVANCES}",
+                                             headers=user_headers[i % USERS])
+                    else:  # Writing a comment
+                        r = await client.post("/comments/", headers=user_headers[i % USERS],
+                                              json={"grievance_id": 1 + i % GRIEVANCES,
+                                                    "user_id": 1 + i % USERS, "content": "load test"})
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    if r.status_code >= 400:
+                        errors += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.requests)))
+            elapsed = time.perf_counter() - started
+            results.append({
+                "concurrency": concurrency,
+                "requests_per_s": round(args.requests / elapsed, 1),
+                "errors": errors,
+                "latency": summarize(latencies),
+            })
+    return results
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        print(json.dumps(asyncio.run(drive(args))))
+        return
+
+    import common  # Selects a temporary DATABASE_URL for this run
+    seed()
+    report = {}
+    for mode in ("sync", "async"):
+        env = dict(os.environ, DB_MODE=mode)
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", mode,
+             "--requests", str(args.requests), "--concurrency", *map(str, args.concurrency)],
+            env=env, check=True, capture_output=True, text=True,
+        )
+        report[mode] = json.loads(out.stdout)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
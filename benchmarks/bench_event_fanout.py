@@ -0,0 +1,130 @@
+# benchmarks/bench_event_fanout.py
+# Compares polling with push: measures what N clients polling GET /grievances/ would cost, then connects
+# N idle subscribers to events.hub and measures publish-to-queue latency for events published from
+# worker threads (as the CRUD write paths do under DB_MODE=sync)
+#
+# Usage: python benchmarks/bench_event_fanout.py [--subscribers 5000] [--events 2000] [--poll-interval 5]
+
+import argparse  # Command line options
+import asyncio  # Subscribers live on one event loop, like the SSE/WebSocket handlers
+import json  # Results are printed as JSON
+import os  # Seeding targets the temporary DATABASE_URL chosen by common
+import random  # Event audiences
+import threading  # Publishers run off the loop
+import time  # Latency samples
+
+USERS = 1_000
+EMPLOYEES = 20
+GRIEVANCES = 20_000
+
+
+# Time the request a polling client repeats; returns per-request latency samples in ms
+async def measure_poll(samples: int) -> list:
+    import httpx
+    from common import make_session_factory, seed_departments, seed_grievances, seed_users
+    from dependencies import create_access_token
+    from roles import RoleEnum
+    import main as app_main
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, 5)
+    seed_users(engine, USERS)
+    seed_users(engine, EMPLOYEES, start=USERS, role=RoleEnum.employee, department_id=department_ids[0])
+    seed_grievances(engine, GRIEVANCES, list(range(1, USERS + 1)), department_ids,
+                    employee_ids=list(range(USERS + 1, USERS + EMPLOYEES + 1)))
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(samples):
+            headers = {"Authorization": "Bearer " + create_access_token({"sub": str(1 + i % USERS)})}
+            started = time.perf_counter()
+            r = await client.get("/grievances/", headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert r.status_code == 200, r.text
+    return latencies
+
+
+# Connect idle subscribers and time events from publish() to arrival in the recipient's queue
+async def measure_push(subscribers: int, events: int, publishers: int) -> dict:
+    from events import hub
+
+    loop = asyncio.get_running_loop()
+    subs = [hub.subscribe(1 + i % USERS, "user") for i in range(subscribers)]
+    latencies = []
+    received = 0
+    pending = []
+
+    # Each published event carries its publish time; measure on arrival
+    async def drain(sub):
+        nonlocal received
+        while True:
+            payload = await sub.queue.get()
+            sent = json.loads(payload)["data"]["sent"]
+            latencies.append((time.perf_counter() - sent) * 1000)
+            received += 1
+
+    readers = [asyncio.create_task(drain(sub)) for sub in subs]
+
+    def publish(n):
+        rng = random.Random(n)
+        for _ in range(events // publishers):
+            owner, assignee = rng.randint(1, USERS), rng.randint(1, USERS)
+            hub.publish("comment_created", {"sent": time.perf_counter()}, [owner, assignee])
+            time.sleep(0.0005)  # Spread the load like real writes instead of one burst
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=publish, args=(n,)) for n in range(publishers)]
+    for t in threads:
+        t.start()
+    await loop.run_in_executor(None, lambda: [t.join() for t in threads])
+    await asyncio.sleep(0.2)  # Let the last deliveries drain
+    elapsed = time.perf_counter() - started
+
+    for task in readers:
+        task.cancel()
+    for sub in subs:
+        hub.unsubscribe(sub)
+    return {"elapsed_s": round(elapsed, 2), "received": received, "latencies": latencies,
+            "hub": hub.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Polling load vs push fan-out with idle subscribers")
+    parser.add_argument("--subscribers", type=int, default=5_000, help="connected idle clients")
+    parser.add_argument("--events", type=int, default=2_000, help="events published in total")
+    parser.add_argument("--publishers", type=int, default=4, help="publishing threads")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="seconds between polls per client")
+    parser.add_argument("--poll-samples", type=int, default=300)
+    args = parser.parse_args()
+
+    from common import summarize
+
+    poll_ms = asyncio.run(measure_poll(args.poll_samples))
+    mean_poll_ms = sum(poll_ms) / len(poll_ms)
+    polls_per_s = args.subscribers / args.poll_interval
+
+    push = asyncio.run(measure_push(args.subscribers, args.events, args.publishers))
+    print(json.dumps({
+        "polling": {
+            "clients": args.subscribers,
+            "interval_s": args.poll_interval,
+            "requests_per_s": round(polls_per_s, 1),
+            "request_latency": summarize(poll_ms),
+            # Server time spent answering polls per wall-clock second (>1 means one core cannot keep up)
+            "server_seconds_per_s": round(polls_per_s * mean_poll_ms / 1000, 2),
+        },
+        "push": {
+            "subscribers": args.subscribers,
+            "events": args.events,
+            "delivered": push["received"],
+            "elapsed_s": push["elapsed_s"],
+            "delivery_latency": summarize(push["latencies"]),
+            "hub": push["hub"],
+            "requests_per_s_while_idle": 0,
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_fast_json.py
+# Compares the default serialization path (ORM objects validated through response_model schemas)
+# with FAST_JSON=true (Core column selects encoded by orjson) on GET /grievances/ with 10k-row pages
+#
+# Usage: python benchmarks/bench_fast_json.py [--rows 10000] [--repeat 20]
+
+import argparse  # Command line options
+import json  # Results are exchanged and printed as JSON
+import os  # FAST_JSON / DATABASE_URL are passed to each worker through the environment
+import subprocess  # Each mode runs in a fresh interpreter, since the mode is read at import time
+import sys  # Path of the running interpreter
+
+USERS = 1_000
+DEPARTMENTS = 10
+EMPLOYEES = 50
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Default vs FAST_JSON serialization of list endpoints")
+    parser.add_argument("--rows", type=int, default=10_000, help="grievances, all returned in one page")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+# Worker: time full-page reads with the response cache cleared before every call
+def measure(args) -> dict:
+    from common import time_calls
+    from fastapi.testclient import TestClient
+    from dependencies import create_access_token
+    import main
+    import response_cache
+
+    client = TestClient(main.app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": str(USERS + EMPLOYEES + 1)})}
+    report = {}
+    for path in ("/grievances/", "/grievances/expanded"):
+        params = {"limit": args.rows}
+        size = len(client.get(path, params=params, headers=headers).content)
+
+        def call(_):
+            response_cache.body_cache.clear()
+            r = client.get(path, params=params, headers=headers)
+            assert r.status_code == 200 and len(r.content) == size
+
+        report[path] = {"bytes": size, **time_calls(call, args.repeat)}
+    return report
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        print(json.dumps(measure(args)))
+        return
+
+    from common import make_session_factory, seed_departments, seed_grievances, seed_users
+    from roles import RoleEnum
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, DEPARTMENTS)
+    seed_users(engine, USERS)
+    seed_users(engine, EMPLOYEES, start=USERS, role=RoleEnum.employee, department_id=department_ids[0])
+    seed_users(engine, 1, start=USERS + EMPLOYEES, role=RoleEnum.admin)
+    seed_grievances(engine, args.rows, list(range(1, USERS + 1)), department_ids,
+                    employee_ids=list(range(USERS + 1, USERS + EMPLOYEES + 1)))
+
+    report = {}
+    for mode in ("false", "true"):
+        env = dict(os.environ, FAST_JSON=mode, MAX_PAGE_SIZE=str(args.rows))
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", "--rows", str(args.rows),
+             "--repeat", str(args.repeat)],
+            env=env, check=True, capture_output=True, text=True,
+        )
+        report["fast_json" if mode == "true" else "default"] = json.loads(out.stdout.strip().splitlines()[-1])
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
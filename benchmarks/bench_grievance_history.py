@@ -0,0 +1,96 @@
+# benchmarks/bench_grievance_history.py
+# Cost of the grievance event log (Grievances/history.py): the one-off backfill on first start, then
+# GET /grievances/{id}/timeline and GET /admin/sla over day, week and month windows, which read
+# index ranges of grievance_events and should not grow with the table
+#
+# Usage: python benchmarks/bench_grievance_history.py [--sizes 100000 1000000] [--comments-per-grievance 2]
+
+import argparse  # Command line options
+import datetime  # SLA report windows
+import json  # Results are exchanged and printed as JSON
+import os  # DATABASE_URL is passed to each worker through the environment
+import random  # Timeline targets
+import subprocess  # One interpreter per size, since the app reads DATABASE_URL at import time
+import sys  # Path of the running interpreter
+import time  # Wall clock
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Event log backfill, timeline and SLA report latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="grievances")
+    parser.add_argument("--comments-per-grievance", type=int, default=2)
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+# Worker: seed one database, start the app on it (backfilling the log) and time both reads
+def measure(size: int, comments_per_grievance: int) -> dict:
+    from common import (make_session_factory, seed_comments, seed_departments, seed_grievances, seed_users,
+                        time_calls)
+    from roles import RoleEnum
+    from sqlalchemy import text
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, 20)
+    seed_users(engine, 1_000)
+    seed_users(engine, 50, start=1_000, role=RoleEnum.employee, department_id=department_ids[0])
+    seed_users(engine, 1, start=1_050, role=RoleEnum.admin)
+    seed_grievances(engine, size, list(range(1, 1_001)), department_ids, employee_ids=list(range(1_001, 1_051)))
+    seed_comments(engine, size * comments_per_grievance, size, list(range(1, 1_051)))
+
+    started = time.perf_counter()
+    import main  # Startup finds an empty event log and backfills it from the current state
+    startup_ms = (time.perf_counter() - started) * 1000
+    from fastapi.testclient import TestClient
+    from dependencies import create_access_token
+
+    with engine.connect() as conn:
+        events = conn.execute(text("SELECT count(*) FROM grievance_events")).scalar()
+
+    client = TestClient(main.app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1051"})}
+    rng = random.Random(3)
+
+    def timeline(_):
+        r = client.get(f"/grievances/{rng.randrange(1, size + 1)}/timeline", headers=headers)
+        assert r.status_code == 200, r.text
+
+    now = datetime.datetime.utcnow()
+    windows = {}
+    for name, days in (("day", 1), ("week", 7), ("month", 30)):
+        params = {"created_from": (now - datetime.timedelta(days=days)).isoformat(), "created_to": now.isoformat()}
+        windows[name] = {
+            "grievances": client.get("/admin/sla", params=params, headers=headers).json()["grievances"],
+            "latency": time_calls(lambda _: client.get("/admin/sla", params=params, headers=headers), 10),
+        }
+
+    return {
+        "grievances": size,
+        "events": events,
+        "startup_with_backfill_ms": round(startup_ms, 1),
+        "timeline": time_calls(timeline, 500),
+        "sla": windows,
+    }
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.comments_per_grievance)))
+        return
+
+    from common import temp_sqlite_url
+    report = []
+    for size in args.sizes:
+        env = dict(os.environ, DATABASE_URL=temp_sqlite_url(), METRICS_ENABLED="false")
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", str(size),
+             "--comments-per-grievance", str(args.comments_per_grievance)],
+            env=env, check=True, capture_output=True, text=True,
+        )
+        report.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_login.py
+# Drives a concurrent login storm through the ASGI app and measures login throughput,
+# 503 rejections from the bcrypt pool, and the latency of an unrelated endpoint meanwhile
+#
+# Usage: python benchmarks/bench_login.py [--users 200] [--requests 400] [--concurrency 100]
+#                                         [--pool-size 4] [--queue-limit 32]
+
+import argparse  # Command line options
+import asyncio  # Concurrent in-process clients
+import json  # Results are printed as JSON
+import os  # Settings are passed to the app through environment variables
+import time  # Wall clock for throughput
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Login throughput under concurrency")
+    parser.add_argument("--users", type=int, default=200, help="seeded accounts")
+    parser.add_argument("--requests", type=int, default=400, help="total login attempts")
+    parser.add_argument("--concurrency", type=int, default=100, help="logins in flight at once")
+    parser.add_argument("--pool-size", type=int, default=None, help="HASH_POOL_SIZE override")
+    parser.add_argument("--queue-limit", type=int, default=None, help="HASH_QUEUE_LIMIT override")
+    return parser.parse_args()
+
+
+async def run(args):
+    import httpx  # In-process ASGI client
+    # Shared helpers; importing common also points the app at a temporary database
+    from common import SEED_PASSWORD, make_session_factory, seed_users, summarize
+    from dependencies import create_access_token  # Token for the probe requests
+    from roles import RoleEnum
+    import main  # The application under test (reads the environment on import)
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    seed_users(engine, args.users)
+    seed_users(engine, 1, start=args.users, role=RoleEnum.admin)
+    probe_headers = {"Authorization": "Bearer " + create_access_token({"sub": str(args.users + 1)})}
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        gate = asyncio.Semaphore(args.concurrency)
+        login_ms, statuses = [], {}
+        probe_ms = []
+        storm_done = asyncio.Event()
+
+        async def login(i):
+            async with gate:
+                started = time.perf_counter()
+                response = await client.post("/login", data={"username": f"user{i % args.users}@bench.local",
+                                                             "password": SEED_PASSWORD})
+                login_ms.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe():
+            # A cheap authenticated read that must stay responsive during the storm
+            while not storm_done.is_set():
+                started = time.perf_counter()
+                await client.get("/departments/", headers=probe_headers)
+                probe_ms.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        storm_done.set()
+        await probe_task
+
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "successful_logins_per_s": round(statuses.get(200, 0) / elapsed, 1),
+        "status_counts": statuses,
+        "login_latency": summarize(login_ms),
+        "probe_latency": summarize(probe_ms),
+    }
+
+
+def main():
+    args = parse_args()
+    # Apply pool overrides before common / the app read the configuration
+    if args.pool_size is not None:
+        os.environ["HASH_POOL_SIZE"] = str(args.pool_size)
+    if args.queue_limit is not None:
+        os.environ["HASH_QUEUE_LIMIT"] = str(args.queue_limit)
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_search.py
+# Latency of GET /search/ over a large comment table: rare and common words, relevance and newest-first
+# order, and the role-scoped searches of a user and an employee, next to a LIKE scan of the same table
+#
+# Usage: python benchmarks/bench_search.py [--comments 1000000] [--grievances 100000] [--repeat 30]
+
+import argparse  # Command line options
+import json  # Results are printed as JSON
+import os  # Seeding targets the temporary DATABASE_URL chosen by common
+import time  # Startup (index build) time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search latency over many comments")
+    parser.add_argument("--comments", type=int, default=1_000_000)
+    parser.add_argument("--grievances", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    from common import make_session_factory, seed_comments, seed_departments, seed_grievances, seed_users, \
+        time_calls
+    from sqlalchemy import text
+    from roles import RoleEnum
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, 10)
+    seed_users(engine, args.users)
+    seed_users(engine, args.employees, start=args.users, role=RoleEnum.employee, department_id=department_ids[0])
+    seed_users(engine, 1, start=args.users + args.employees, role=RoleEnum.admin)
+    user_ids = list(range(1, args.users + 1))
+    employee_ids = list(range(args.users + 1, args.users + args.employees + 1))
+    seed_grievances(engine, args.grievances, user_ids, department_ids, employee_ids=employee_ids)
+    seed_comments(engine, args.comments, args.grievances, user_ids)
+
+    started = time.perf_counter()
+    import main as app_main  # Startup builds the FTS index from the existing comments
+    index_build_s = time.perf_counter() - started
+    from fastapi.testclient import TestClient
+    from dependencies import create_access_token
+
+    # A rare word in 100 comments, written after startup so the triggers index them
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO comments (grievance_id, user_id, content, timestamp) "
+                          "VALUES (:g, 1, 'pipe leak in the hostel', CURRENT_TIMESTAMP)"),
+                     [{"g": 1 + i * (args.grievances // 100)} for i in range(100)])
+
+    client = TestClient(app_main.app)
+
+    def headers(user_id):
+        return {"Authorization": "Bearer " + create_access_token({"sub": str(user_id)})}
+
+    admin, user, employee = headers(args.users + args.employees + 1), headers(1), headers(employee_ids[0])
+    # "water" is one of the ten seed words: it occurs in more than half of all comments
+    cases = {
+        "admin rare word": (admin, {"q": "leak"}),
+        "admin common word, relevance": (admin, {"q": "water"}),
+        "admin common word, recent": (admin, {"q": "water", "sort": "recent"}),
+        "admin two words, relevance": (admin, {"q": "water refund"}),
+        "user common word (own grievances)": (user, {"q": "water"}),
+        "employee common word (assigned grievances)": (employee, {"q": "water"}),
+        "employee common word, recent": (employee, {"q": "water", "sort": "recent"}),
+    }
+    report = {"comments": args.comments, "index_build_s": round(index_build_s, 2), "search": {}}
+    for name, (hdrs, params) in cases.items():
+        first = client.get("/search/", params=params, headers=hdrs)
+        assert first.status_code == 200, first.text
+        report["search"][name] = {
+            "hits_on_page": len(first.json()),
+            **time_calls(lambda _: client.get("/search/", params=params, headers=hdrs), args.repeat),
+        }
+
+    # What finding a comment took without the index: a scan of the whole table
+    with engine.connect() as conn:
+        report["like_scan_rare_word"] = time_calls(
+            lambda _: conn.execute(text("SELECT id FROM comments WHERE content LIKE '%leak%' LIMIT 50")).all(),
+            max(args.repeat // 10, 3))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_signup.py
+# Measures signup duplicate-check and insert latency as the users table grows
+#
+# Usage: python benchmarks/bench_signup.py [--sizes 1000 10000 100000 1000000] [--repeat 200]
+
+import argparse  # Command line options
+import json  # Results are printed as JSON
+
+from common import make_session_factory, seed_users, temp_sqlite_url, time_calls  # Shared benchmark helpers
+
+from User import crud, schemas, models  # Code under test
+from roles import RoleEnum  # Role for the signed-up users
+
+
+# Legacy duplicate check: load every user and scan in Python (what /signup used to do)
+def legacy_exists(db, email: str) -> bool:
+    return any(u.email == email for u in crud.get_users(db, role_filter=None))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Signup latency versus users table size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=200, help="duplicate checks per size")
+    parser.add_argument("--signups", type=int, default=10, help="full signups (with bcrypt) per size")
+    parser.add_argument("--legacy-max", type=int, default=100_000, help="largest size to run the legacy scan on")
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_session_factory(temp_sqlite_url())
+    seeded = 0
+    results = []
+    for size in sorted(args.sizes):
+        # Grow the table incrementally up to the requested size
+        seed_users(engine, size - seeded, start=seeded)
+        seeded = size
+        db = SessionLocal()
+        try:
+            row = {"users": size}
+            # Indexed EXISTS probe for an email in the middle of the table
+            row["email_exists"] = time_calls(lambda i: crud.email_exists(db, f"user{(i * 7919) % size}@bench.local"), args.repeat)
+            if size <= args.legacy_max:
+                row["legacy_scan"] = time_calls(lambda i: legacy_exists(db, f"user{(i * 7919) % size}@bench.local"), 5)
+                db.expunge_all()
+
+            # Full signup path: duplicate check plus create_user (dominated by bcrypt)
+            def signup(i):
+                email = f"new{size}-{i}@bench.local"
+                if not crud.email_exists(db, email):
+                    crud.create_user(db, schemas.UserCreate(email=email, password="pw", role=RoleEnum.user, department_id=1))
+
+            row["signup"] = time_calls(signup, args.signups)
+            results.append(row)
+        finally:
+            db.close()
+        # Remove the signups so the next size starts from a clean count
+        with engine.begin() as conn:
+            conn.execute(models.User.__table__.delete().where(models.User.email.like("new%")))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_sla_monitor.py
+# Cost of the SLA monitor (Grievances/sla.py) with many open tickets: the full recount done at startup
+# (what every cycle would cost if it scanned the overdue tickets), the first-start catch-up that escalates
+# every overdue ticket, the catch-up after a restart (nothing left to escalate), and steady-state cycles,
+# which read only the tickets that crossed the threshold since the previous cycle
+#
+# Usage: python benchmarks/bench_sla_monitor.py [--open 100000 1000000] [--days 365]
+
+import argparse  # Command line options
+import json  # Results are exchanged and printed as JSON
+import os  # DATABASE_URL is passed to each worker through the environment
+import subprocess  # One interpreter per size, since the app reads DATABASE_URL at import time
+import sys  # Path of the running interpreter
+import time  # Wall clock
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="SLA monitor recount, catch-up and steady-state cycles")
+    parser.add_argument("--open", type=int, nargs="+", default=[100_000, 1_000_000], help="pending grievances")
+    parser.add_argument("--days", type=int, default=365, help="grievances are spread over this many days")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def timed(fn) -> tuple:
+    started = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - started) * 1000, 1)
+
+
+# Worker: seed one database and time the monitor's operations on it
+def measure(open_count: int, days: int) -> dict:
+    from datetime import timedelta
+    from common import make_session_factory, seed_departments, seed_grievances, seed_users
+    from roles import RoleEnum
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, 20)
+    seed_users(engine, 1_000)
+    seed_users(engine, 50, start=1_000, role=RoleEnum.employee, department_id=department_ids[0])
+    # Half of the seeded grievances are resolved
+    seed_grievances(engine, 2 * open_count, list(range(1, 1_001)), department_ids,
+                    employee_ids=list(range(1_001, 1_051)), days=days)
+
+    import main  # Startup backfills the event log and counts the breaches once
+    from database import SessionLocal
+    from Grievances.sla import SLAMonitor
+
+    db = SessionLocal()
+    monitor = SLAMonitor()
+    _, recount_ms = timed(lambda: monitor.rebuild(db))
+    breached = monitor.snapshot()["breached"]
+    first, first_ms = timed(lambda: monitor.run_once(db))
+
+    restarted = SLAMonitor()
+    restarted.rebuild(db)
+    again, restart_ms = timed(lambda: restarted.run_once(db))
+
+    _, idle_ms = timed(lambda: restarted.run_once(db))
+    steady = {}
+    for name, window in (("minute", timedelta(minutes=1)), ("hour", timedelta(hours=1)), ("day", timedelta(days=1))):
+        # Pretend the previous cycle ran `window` earlier: the tickets that aged past the threshold
+        # in that time are escalated again
+        restarted._watermarks = {hours: mark - window for hours, mark in restarted._watermarks.items()}
+        escalated, ms = timed(lambda: restarted.run_once(db))
+        steady[name] = {"escalated": escalated, "ms": ms}
+    db.close()
+
+    return {
+        "open": open_count,
+        "breached": breached,
+        "recount_ms": recount_ms,
+        "first_start_catch_up": {"escalated": first, "ms": first_ms},
+        "restart_catch_up": {"escalated": again, "ms": restart_ms},
+        "idle_cycle_ms": idle_ms,
+        "cycle_after": steady,
+    }
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.days)))
+        return
+
+    from common import temp_sqlite_url
+    report = []
+    for open_count in args.open:
+        env = dict(os.environ, DATABASE_URL=temp_sqlite_url(), METRICS_ENABLED="false", SLA_MONITOR_ENABLED="false")
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", str(open_count), "--days", str(args.days)],
+            env=env, check=True, capture_output=True, text=True,
+        )
+        report.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_sqlite_concurrency.py
+# Measures concurrent read and write throughput on one SQLite file for each engine configuration
+# produced by database.make_engine (default rollback journal vs the tuned WAL PRAGMAs)
+#
+# Usage: python benchmarks/bench_sqlite_concurrency.py [--readers 8] [--writers 2] [--seconds 5]
+
+import argparse  # Command line options
+import json  # Results are printed as JSON
+import threading  # Reader and writer threads
+import time  # Wall clock and latency samples
+
+from common import make_session_factory, seed_departments, seed_grievances, seed_users, summarize, temp_sqlite_url
+
+from sqlalchemy import text  # Plain SQL for the workload
+from database import SQLITE_PRAGMAS, make_engine  # Engine factory under test
+
+# Engine configurations to compare: PRAGMAs applied on connect
+MODES = {
+    # What database.py used to do: no PRAGMAs (rollback journal, synchronous=FULL)
+    "default": {},
+    # The tuned defaults from config.py
+    "wal": SQLITE_PRAGMAS,
+}
+
+
+def run_mode(url: str, pragmas: dict, readers: int, writers: int, seconds: float, users: int) -> dict:
+    engine = make_engine(url, sqlite_pragmas=pragmas, pool_size=readers + writers, max_overflow=0)
+    stop = threading.Event()
+    read_ms, write_ms, errors = [], [], []
+
+    def reader(n):
+        i = n
+        with engine.connect() as conn:
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    conn.execute(text("SELECT id, status, created_at FROM grievances WHERE user_id = :u"),
+                                 {"u": 1 + i % users}).fetchall()
+                    conn.rollback()  # End the read transaction so WAL checkpoints can progress
+                    read_ms.append((time.perf_counter() - started) * 1000)
+                except Exception as exc:  # Typically "database is locked"
+                    errors.append(type(exc).__name__)
+                i += readers
+
+    def writer(n):
+        i = n
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text("INSERT INTO comments (grievance_id, user_id, content, timestamp) "
+                                      "VALUES (:g, :u, 'bench', CURRENT_TIMESTAMP)"),
+                                 {"g": 1 + i % 1000, "u": 1 + i % users})
+                write_ms.append((time.perf_counter() - started) * 1000)
+            except Exception as exc:
+                errors.append(type(exc).__name__)
+            i += writers
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    return {
+        "reads_per_s": round(len(read_ms) / seconds, 1),
+        "writes_per_s": round(len(write_ms) / seconds, 1),
+        "errors": len(errors),
+        "read_latency": summarize(read_ms),
+        "write_latency": summarize(write_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite read/write concurrency per engine configuration")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--grievances", type=int, default=50_000)
+    args = parser.parse_args()
+
+    report = {}
+    for mode, pragmas in MODES.items():
+        # A fresh, identically seeded file per mode (journal_mode=WAL persists in the file)
+        url = temp_sqlite_url(f"{mode}.db")
+        seed_engine, _ = make_session_factory(url)
+        department_ids = seed_departments(seed_engine, 10)
+        seed_users(seed_engine, args.users)
+        seed_grievances(seed_engine, args.grievances, list(range(1, args.users + 1)), department_ids)
+        seed_engine.dispose()
+        report[mode] = run_mode(url, pragmas, args.readers, args.writers, args.seconds, args.users)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
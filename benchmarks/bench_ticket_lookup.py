@@ -0,0 +1,115 @@
+# benchmarks/bench_ticket_lookup.py
+# GET /grievances/ticket/{ticket_id} with ticket IDs stored as text and as 16-byte blobs (TICKET_ID_STORAGE):
+# size of the ticket_id index and of the grievances table, lookup latency with the hot-ticket cache cleared
+# before every call and with every ticket cached, against the old way of finding a ticket's status
+# (the owner reading a page of their grievances)
+#
+# Usage: python benchmarks/bench_ticket_lookup.py [--sizes 100000 1000000] [--storage text blob]
+
+import argparse  # Command line options
+import json  # Results are exchanged and printed as JSON
+import os  # DATABASE_URL is passed to each worker through the environment
+import subprocess  # One interpreter per run, since the app reads DATABASE_URL at import time
+import sys  # Path of the running interpreter
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ticket lookup latency and ticket_id index size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="grievances")
+    parser.add_argument("--storage", nargs="+", default=["text", "blob"], choices=["text", "blob"])
+    parser.add_argument("--requests", type=int, default=2_000, help="lookups per measurement")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+# Worker: seed one database with the storage selected by TICKET_ID_STORAGE and time the lookups
+def measure(size: int, requests: int) -> dict:
+    from common import make_session_factory, seed_departments, seed_grievances, seed_users, time_calls
+    from Grievances.models import Grievance
+    from roles import RoleEnum
+    from sqlalchemy import func, text
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, 20)
+    seed_users(engine, 1_000)
+    seed_users(engine, 50, start=1_000, role=RoleEnum.employee, department_id=department_ids[0])
+    seed_users(engine, 1, start=1_050, role=RoleEnum.admin)
+    seed_grievances(engine, size, list(range(1, 1_001)), department_ids, employee_ids=list(range(1_001, 1_051)))
+
+    import main
+    from fastapi.testclient import TestClient
+    from database import SessionLocal
+    from dependencies import create_access_token
+    from Grievances import crud
+    from Grievances.ticket_cache import ticket_cache
+
+    def size_of(name):
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT sum(pgsize) FROM dbstat WHERE name = :name"), {"name": name}).scalar()
+
+    with SessionLocal() as db:
+        # Read through the ORM column type, so blobs come back as ticket ID strings
+        tickets = db.query(Grievance.ticket_id, Grievance.user_id).order_by(func.random()).limit(requests).all()
+
+    client = TestClient(main.app)
+    headers = {user_id: {"Authorization": "Bearer " + create_access_token({"sub": str(user_id)})}
+               for user_id in {user_id for _, user_id in tickets}}
+
+    def lookup(i, cold: bool):
+        ticket_id, user_id = tickets[i]
+        if cold:
+            ticket_cache.clear()
+        r = client.get(f"/grievances/ticket/{ticket_id}", headers=headers[user_id])
+        assert r.status_code == 200, r.text
+
+    def own_page(i):
+        _, user_id = tickets[i]
+        r = client.get("/grievances/", params={"limit": 500}, headers=headers[user_id])
+        assert r.status_code == 200, r.text
+
+    def load(i):
+        ticket_cache.clear()
+        assert crud.load_ticket(db, tickets[i][0]) is not None
+
+    with SessionLocal() as db:
+        database_only = time_calls(load, requests)  # The index lookup without HTTP and authentication
+    uncached = time_calls(lambda i: lookup(i, True), requests)
+    for i in range(requests):
+        lookup(i, False)  # Warm the cache with every ticket
+    cached = time_calls(lambda i: lookup(i, False), requests)
+    listing = time_calls(own_page, min(requests, 200))
+
+    return {
+        "grievances": size,
+        "storage": os.environ["TICKET_ID_STORAGE"],
+        "ticket_index_bytes": size_of("ix_grievances_ticket_id"),
+        "grievances_table_bytes": size_of("grievances"),
+        "load_ticket": database_only,
+        "lookup_uncached": uncached,
+        "lookup_cached": cached,
+        "own_grievances_page": listing,
+    }
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.requests)))
+        return
+
+    from common import temp_sqlite_url
+    report = []
+    for size in args.sizes:
+        for storage in args.storage:
+            env = dict(os.environ, DATABASE_URL=temp_sqlite_url(), METRICS_ENABLED="false",
+                       SLA_MONITOR_ENABLED="false", TICKET_ID_STORAGE=storage)
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", str(size), "--requests", str(args.requests)],
+                env=env, check=True, capture_output=True, text=True,
+            )
+            report.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# benchmarks/common.py
+# Shared helpers for the benchmark scripts: temporary databases, fast seeding and timing
+
+import os  # Filesystem paths for temporary database files
+import sys  # Used to make the repository root importable
+import tempfile  # Temporary directories for throwaway databases
+import time  # High resolution timers
+import statistics  # Percentile and mean calculations
+
+# Make the application modules (database, User, Grievances, ...) importable from benchmarks/
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+# Function to create a throwaway SQLite file and return its URL
+def temp_sqlite_url(name: str = "bench.db") -> str:
+    directory = tempfile.mkdtemp(prefix="grievance-bench-")
+    return "sqlite:///" + os.path.join(directory, name)
+
+
+# Never let a benchmark touch the real grievance.db: unless DATABASE_URL is set explicitly,
+# the application modules imported below are pointed at a temporary SQLite file
+os.environ.setdefault("DATABASE_URL", temp_sqlite_url())
+# Seeded grievances are up to a year old; keep the SLA monitor from escalating them in the middle of a run
+os.environ.setdefault("SLA_MONITOR_ENABLED", "false")
+
+import datetime  # Timestamps for seeded grievances and comments
+import random  # Deterministic pseudo-random seeding
+import uuid  # Ticket IDs for seeded grievances
+
+from sqlalchemy import create_engine, insert  # Engine factory and Core bulk insert
+from sqlalchemy.orm import sessionmaker  # Session factory bound to the temporary engine
+
+from database import Base  # Declarative base holding every table definition
+from Department.models import Department  # Imported so the departments table is registered
+from User.models import User  # Users table used for seeding
+from Grievances.models import Grievance, GrievanceStatus  # Grievances table used for seeding
+from Comments.models import Comment  # Comments table used for seeding
+from roles import RoleEnum  # Roles assigned to seeded users
+
+# A fixed, precomputed bcrypt hash so seeding never pays for bcrypt
+# (it is the hash of the string "password")
+SEED_PASSWORD = "password"
+SEED_PASSWORD_HASH = "$2b$12$McpkfRpB/JSAE1N2rVhWr.6L2tDMuGduZRKqI6VIjfJ8wf8fSKgTu"
+
+
+# Function to create an engine and session factory with all tables created
+def make_session_factory(url: str):
+    engine = create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {})
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+# Function to bulk-insert users with executemany in batches
+def seed_users(engine, count: int, start: int = 0, role: RoleEnum = RoleEnum.user,
+               department_id: int | None = None, batch_size: int = 50_000):
+    with engine.begin() as conn:
+        for offset in range(start, start + count, batch_size):
+            rows = [
+                {
+                    "email": f"user{i}@bench.local",
+                    "password": SEED_PASSWORD_HASH,
+                    "department_id": department_id,
+                    "role": role,
+                }
+                for i in range(offset, min(offset + batch_size, start + count))
+            ]
+            conn.execute(insert(User), rows)
+
+
+# Function to bulk-insert departments named dept0..deptN and return their ids
+def seed_departments(engine, count: int) -> list[int]:
+    with engine.begin() as conn:
+        conn.execute(insert(Department), [{"name": f"dept{i}"} for i in range(count)])
+        return [row[0] for row in conn.execute(Department.__table__.select().with_only_columns(Department.id))]
+
+
+# Function to bulk-insert grievances spread over the given users/departments and the last `days` days
+def seed_grievances(engine, count: int, user_ids: list[int], department_ids: list[int],
+                    employee_ids: list[int] | None = None, days: int = 365, batch_size: int = 50_000, seed: int = 1):
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+    with engine.begin() as conn:
+        for offset in range(0, count, batch_size):
+            rows = []
+            for _ in range(min(batch_size, count - offset)):
+                resolved = rng.random() < 0.5
+                created = now - datetime.timedelta(seconds=rng.randrange(days * 86400))
+                rows.append({
+                    "ticket_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                    "user_id": rng.choice(user_ids),
+                    "department_id": rng.choice(department_ids),
+                    "assigned_to": rng.choice(employee_ids) if employee_ids else None,
+                    "status": GrievanceStatus.solved if resolved else GrievanceStatus.pending,
+                    "created_at": created,
+                    "resolved_at": created + datetime.timedelta(hours=rng.randrange(1, 240)) if resolved else None,
+                })
+            conn.execute(insert(Grievance), rows)
+
+
+# Function to bulk-insert comments on grievance IDs 1..grievance_count
+def seed_comments(engine, count: int, grievance_count: int, user_ids: list[int],
+                  batch_size: int = 50_000, seed: int = 2):
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+    words = ["delay", "refund", "network", "billing", "hostel", "exam", "water", "library", "fees", "portal"]
+    with engine.begin() as conn:
+        for offset in range(0, count, batch_size):
+            rows = [
+                {
+                    "grievance_id": rng.randrange(1, grievance_count + 1),
+                    "user_id": rng.choice(user_ids),
+                    "content": " ".join(rng.choice(words) for _ in range(8)),
+                    "timestamp": now - datetime.timedelta(seconds=rng.randrange(365 * 86400)),
+                }
+                for _ in range(min(batch_size, count - offset))
+            ]
+            conn.execute(insert(Comment), rows)
+
+
+# Function to time repeated calls of fn and return latency statistics in milliseconds
+def time_calls(fn, repeat: int) -> dict:
+    samples = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+# Function to reduce a list of millisecond samples to mean/p50/p95/p99
+def summarize(samples: list[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
@@ -0,0 +1,269 @@
+# benchmarks/loadtest.py
+# Reproducible load test: seeds a fresh database (departments, users, employees, grievances, comments),
+# then drives a weighted mix of login / create grievance / list / comment / resolve requests through the
+# ASGI app in-process or through a local uvicorn, and reports throughput and p50/p95/p99 per endpoint.
+# The report is JSON so runs from different releases can be diffed, or checked against a saved baseline
+#
+# Usage: python benchmarks/loadtest.py [--target asgi|uvicorn] [--requests 5000] [--concurrency 50]
+#            [--mix login=1,create=2,list=4,comment=2,resolve=1] [--output run.json]
+#            [--baseline previous.json --tolerance 0.25]
+
+import argparse  # Command line options
+import asyncio  # Concurrent clients
+import json  # Reports are written and compared as JSON
+import os  # DATABASE_URL is shared with the uvicorn subprocess through the environment
+import random  # Deterministic request mix
+import socket  # Free port for the uvicorn target
+import subprocess  # The uvicorn target runs in its own process
+import sys  # Path of the running interpreter
+import time  # Wall clock for throughput and latencies
+
+from common import ROOT, SEED_PASSWORD, make_session_factory, seed_comments, seed_departments, \
+    seed_grievances, seed_users, summarize
+from roles import RoleEnum
+
+# Request kinds, in report order, with the default weights of the mix
+DEFAULT_MIX = {"login": 1, "create": 2, "list": 4, "comment": 2, "resolve": 1}
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown request kind {name!r} (choose from {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed a database and drive a realistic request mix against the app")
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi",
+                        help="in-process ASGI transport, or a local uvicorn server started on the seeded database")
+    parser.add_argument("--uvicorn-workers", type=int, default=1)
+    parser.add_argument("--departments", type=int, default=10)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--grievances", type=int, default=20_000)
+    parser.add_argument("--comments", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=5_000, help="measured requests")
+    parser.add_argument("--warmup", type=int, default=200, help="unmeasured requests sent first")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. login=1,create=2,list=4")
+    parser.add_argument("--seed", type=int, default=1, help="seeds both the data and the request sequence")
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--baseline", help="earlier report to compare against; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative p95 increase / throughput drop before flagging a regression")
+    return parser.parse_args()
+
+
+# Seed the database at DATABASE_URL; IDs are 1..users, then employees, then one admin
+def seed(args):
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, args.departments)
+    seed_users(engine, args.users)
+    seed_users(engine, args.employees, start=args.users, role=RoleEnum.employee, department_id=department_ids[0])
+    seed_users(engine, 1, start=args.users + args.employees, role=RoleEnum.admin)
+    user_ids = list(range(1, args.users + 1))
+    employee_ids = list(range(args.users + 1, args.users + args.employees + 1))
+    seed_grievances(engine, args.grievances, user_ids, department_ids, employee_ids=employee_ids, seed=args.seed)
+    seed_comments(engine, args.comments, max(args.grievances, 1), user_ids, seed=args.seed + 1)
+    engine.dispose()
+    return department_ids, employee_ids
+
+
+# The requests one simulated client sends; each returns (endpoint label, response)
+class Workload:
+    def __init__(self, args, department_ids, employee_ids):
+        from dependencies import create_access_token
+        self.args = args
+        self.department_ids = department_ids
+        self.employee_ids = employee_ids
+        self.created = []  # Grievances created during the run, resolved before older ones
+        # Tokens are minted up front, so only the login requests pay for bcrypt
+        self.tokens = {user_id: {"Authorization": "Bearer " + create_access_token({"sub": str(user_id)})}
+                       for user_id in range(1, args.users + args.employees + 1)}
+
+    async def login(self, client, rng):
+        index = rng.randrange(self.args.users)
+        r = await client.post("/login", data={"username": f"user{index}@bench.local", "password": SEED_PASSWORD})
+        return "POST /login", r
+
+    async def create(self, client, rng):
+        user_id = rng.randrange(1, self.args.users + 1)
+        r = await client.post("/grievances/", json={"department_id": rng.choice(self.department_ids)},
+                              headers=self.tokens[user_id])
+        if r.status_code == 200:
+            self.created.append(r.json()["id"])
+        return "POST /grievances/", r
+
+    async def list(self, client, rng):
+        # Users list their own grievances, employees their assigned ones
+        if rng.random() < 0.8:
+            headers = self.tokens[rng.randrange(1, self.args.users + 1)]
+        else:
+            headers = self.tokens[rng.choice(self.employee_ids)]
+        r = await client.get("/grievances/", params={"limit": 50}, headers=headers)
+        return "GET /grievances/", r
+
+    async def comment(self, client, rng):
+        user_id = rng.randrange(1, self.args.users + 1)
+        r = await client.post("/comments/", headers=self.tokens[user_id], json={
+            "grievance_id": rng.randrange(1, self.args.grievances + 1), "user_id": user_id, "content": "load test"})
+        return "POST /comments/", r
+
+    async def resolve(self, client, rng):
+        grievance_id = self.created.pop() if self.created else rng.randrange(1, self.args.grievances + 1)
+        employee_id = rng.choice(self.employee_ids)
+        r = await client.post(f"/grievances/{grievance_id}/resolve", params={"resolver_id": employee_id},
+                              headers=self.tokens[employee_id])
+        return "POST /grievances/{id}/resolve", r
+
+
+# Send `count` requests drawn from the mix with at most `concurrency` in flight
+async def run_phase(client, workload, args, rng, count: int) -> dict:
+    kinds = list(args.mix)
+    weights = [args.mix[k] for k in kinds]
+    plan = rng.choices(kinds, weights=weights, k=count)
+    rngs = [random.Random(rng.getrandbits(64)) for _ in range(count)]
+    gate = asyncio.Semaphore(args.concurrency)
+    latencies, statuses = {}, {}
+
+    async def one(kind, request_rng):
+        async with gate:
+            started = time.perf_counter()
+            label, r = await getattr(workload, kind)(client, request_rng)
+            latencies.setdefault(label, []).append((time.perf_counter() - started) * 1000)
+            by_status = statuses.setdefault(label, {})
+            by_status[r.status_code] = by_status.get(r.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(kind, request_rng) for kind, request_rng in zip(plan, rngs)))
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for label in sorted(latencies):
+        samples = latencies[label]
+        endpoints[label] = {
+            "requests_per_s": round(len(samples) / elapsed, 1),
+            "errors": sum(n for code, n in statuses[label].items() if code >= 400),
+            "status_codes": {str(code): n for code, n in sorted(statuses[label].items())},
+            "latency": summarize(samples),
+        }
+    all_samples = [ms for samples in latencies.values() for ms in samples]
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "total": {
+            "requests_per_s": round(count / elapsed, 1),
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "latency": summarize(all_samples),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# Start uvicorn on the seeded database and wait until it answers
+def start_uvicorn(args):
+    import httpx
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.uvicorn_workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=dict(os.environ),
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"uvicorn exited with code {server.returncode}")
+        try:
+            if httpx.get(url + "/openapi.json", timeout=1).status_code == 200:
+                return server, url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("uvicorn did not start within 60 s")
+
+
+async def drive(args, department_ids, employee_ids) -> dict:
+    import httpx
+    server = None
+    if args.target == "uvicorn":
+        server, url = start_uvicorn(args)
+        client = httpx.AsyncClient(base_url=url, timeout=None,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+    else:
+        import main  # Imported after seeding, since startup loads the scheduler and dashboard counters
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://loadtest",
+                                   timeout=None)
+    try:
+        async with client:
+            workload = Workload(args, department_ids, employee_ids)
+            rng = random.Random(args.seed)
+            if args.warmup:
+                await run_phase(client, workload, args, rng, args.warmup)
+            return await run_phase(client, workload, args, rng, args.requests)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+# Function to list endpoints whose p95 grew, or whose throughput fell, by more than the tolerance
+def compare(report: dict, baseline: dict, tolerance: float) -> list[dict]:
+    regressions = []
+    for label, current in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(label)
+        if before is None:
+            continue
+        p95, p95_before = current["latency"]["p95_ms"], before["latency"]["p95_ms"]
+        if p95 > p95_before * (1 + tolerance):
+            regressions.append({"endpoint": label, "metric": "p95_ms", "baseline": p95_before, "current": p95})
+        rps, rps_before = current["requests_per_s"], before["requests_per_s"]
+        if rps < rps_before * (1 - tolerance):
+            regressions.append({"endpoint": label, "metric": "requests_per_s", "baseline": rps_before,
+                                "current": rps})
+    return regressions
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+    department_ids, employee_ids = seed(args)
+    seed_s = time.perf_counter() - started
+
+    report = {
+        "config": {
+            "target": args.target,
+            "db_mode": os.getenv("DB_MODE", "sync"),
+            "departments": args.departments, "users": args.users, "employees": args.employees,
+            "grievances": args.grievances, "comments": args.comments,
+            "requests": args.requests, "warmup": args.warmup, "concurrency": args.concurrency,
+            "mix": args.mix, "seed": args.seed,
+        },
+        "seed_s": round(seed_s, 2),
+        **asyncio.run(drive(args, department_ids, employee_ids)),
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
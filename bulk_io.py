@@ -0,0 +1,221 @@
+# bulk_io.py
+# Streaming NDJSON/CSV import and export shared by the grievance and user bulk endpoints
+# Imports parse the request body as it arrives and insert validated rows in batched transactions;
+# exports page through the table by id, so neither side holds a full data set in memory
+
+import codecs  # Incremental UTF-8 decoding of the request stream
+import csv  # CSV rows in and out
+import io  # Buffer for CSV output
+import json  # NDJSON rows in and out
+import time  # Import duration
+from datetime import datetime
+from enum import Enum
+from typing import Awaitable, Callable, List, Optional, Type
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import EXPORT_PAGE_SIZE, IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS
+from database import run_db, session_scope
+
+# Content types accepted by the import endpoints and produced by the exports
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+# One rejected input row (numbered from 1, not counting the CSV header)
+class RowError(BaseModel):
+    row: int
+    error: str
+
+
+# Schema reporting the outcome of an import
+class ImportReport(BaseModel):
+    received: int = 0               # Data rows read from the body
+    inserted: int = 0               # Rows stored
+    failed: int = 0                 # Rows rejected (see errors)
+    batches: int = 0                # Transactions committed
+    elapsed_seconds: float = 0.0    # Wall-clock duration of the import
+    errors: List[RowError] = []     # First IMPORT_MAX_ERRORS rejected rows
+    errors_truncated: bool = False  # True if more rows failed than are listed
+
+    def add_error(self, row: int, error: str):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append(RowError(row=row, error=error))
+        else:
+            self.errors_truncated = True
+
+
+# Function to pick the import format from the request's Content-Type
+def request_format(request: Request) -> str:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("application/x-ndjson", "application/jsonl", "application/json-lines"):
+        return "ndjson"
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    raise HTTPException(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                        "Send the rows as application/x-ndjson or text/csv")
+
+
+# Yield the body line by line as it is received
+async def _iter_lines(request: Request):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+# Yield (row number, record dict, error) for every non-blank data row of the body
+# CSV input needs a header row and one record per line; empty cells are left out so defaults apply
+async def iter_records(request: Request, fmt: str):
+    header, row = None, 0
+    async for line in _iter_lines(request):
+        line = line.rstrip("\r")
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = [name.strip() for name in next(csv.reader([line]))]
+            continue
+        row += 1
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield row, None, f"Invalid JSON: {exc}"
+                continue
+            if not isinstance(record, dict):
+                yield row, None, "Expected a JSON object"
+                continue
+        else:
+            values = next(csv.reader([line]))
+            if len(values) != len(header):
+                yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+                continue
+            record = {name: value for name, value in zip(header, values) if value != ""}
+        yield row, record, None
+
+
+# Function to flatten a pydantic ValidationError into one line
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" if e["loc"] else e["msg"]
+                     for e in exc.errors())
+
+
+# Function to validate the streamed rows against `schema` and store them in batches
+# insert_batch(db, items) runs on the session and returns (position in items, message) for rejected rows;
+# prepare(items), if given, runs on the event loop before each batch (e.g. to hash passwords)
+async def import_rows(
+    request: Request,
+    db,
+    schema: Type[BaseModel],
+    insert_batch: Callable[[Session, list], list],
+    prepare: Optional[Callable[[list], Awaitable[None]]] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> ImportReport:
+    fmt = request_format(request)
+    report = ImportReport()
+    started = time.perf_counter()
+    batch = []  # (row number, validated item)
+
+    async def flush():
+        items = [item for _, item in batch]
+        if prepare is not None:
+            await prepare(items)
+        failures = await run_db(db, insert_batch, items)
+        for position, message in failures:
+            report.add_error(batch[position][0], message)
+        report.inserted += len(items) - len(failures)
+        report.batches += 1
+        batch.clear()
+
+    async for row, record, error in iter_records(request, fmt):
+        report.received += 1
+        if error is None:
+            try:
+                batch.append((row, schema(**record)))
+            except ValidationError as exc:
+                error = _describe(exc)
+        if error is not None:
+            report.add_error(row, error)
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    report.errors.sort(key=lambda e: e.row)
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    return report
+
+
+# Function to insert rows (dicts with identical keys) with one executemany and commit
+# If the batch violates a constraint, the rows are retried one at a time to find the offenders;
+# returns (position, message) for every rejected row
+def insert_many(db: Session, model, rows: List[dict], positions: List[int]) -> list:
+    if not rows:
+        return []
+    try:
+        db.execute(insert(model), rows)
+        db.commit()
+        return []
+    except IntegrityError:
+        db.rollback()
+    failures = []
+    for position, values in zip(positions, rows):
+        try:
+            db.execute(insert(model), [values])
+            db.commit()
+        except IntegrityError as exc:
+            db.rollback()
+            failures.append((position, f"Rejected by the database: {exc.orig}"))
+    return failures
+
+
+# Function to turn a column value into its plain NDJSON/CSV form
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+# Function to render a page of rows in the export format
+def _render(rows, columns: List[str], fmt: str) -> str:
+    if fmt == "ndjson":
+        return "".join(json.dumps({c: _plain(v) for c, v in zip(columns, r)}, default=str) + "\n"
+                       for r in rows)
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerows([["" if v is None else _plain(v) for v in r] for r in rows])
+    return out.getvalue()
+
+
+# Yield the export body page by page; fetch_page(db, after_id, limit) returns rows whose first column is the id
+# Each page uses its own short-lived session, so a slow client does not hold a pooled connection
+async def export_rows(fetch_page: Callable, columns: List[str], fmt: str, page_size: int = EXPORT_PAGE_SIZE):
+    if fmt == "csv":
+        yield ",".join(columns) + "\n"
+    after_id = 0
+    while True:
+        async with session_scope() as db:
+            rows = await run_db(db, fetch_page, after_id, page_size)
+        if rows:
+            yield _render(rows, columns, fmt)
+        if len(rows) < page_size:
+            break
+        after_id = rows[-1][0]
+
+
+# Function to build the streaming response for an export
+def export_response(fetch_page: Callable, columns: List[str], fmt: str, name: str) -> StreamingResponse:
+    return StreamingResponse(export_rows(fetch_page, columns, fmt), media_type=MEDIA_TYPES[fmt],
+                             headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'})
@@ -0,0 +1,109 @@
+# config.py
+# Runtime settings for the application, read from environment variables with development defaults
+
+import os  # Access to environment variables
+
+# Authentication cache settings (see auth_cache.py)
+# Entries are per process, so TTL bounds how stale another worker's view can be
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))  # Maximum cached tokens / principals
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))  # Lifetime of a cached entry
+
+# Database connection URL (defaults to the local SQLite file)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./grievance.db")
+
+# Password hashing pool settings (see User/hashing.py)
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", str(os.cpu_count() or 4)))  # Threads running bcrypt
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "64"))  # Hash jobs allowed to wait before rejecting with 503
+
+# Database access mode: "sync" runs CRUD on Starlette's threadpool with Session,
+# "async" runs it on the event loop through an AsyncSession (aiosqlite / asyncpg)
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+# Async driver URL; derived from DATABASE_URL when not given explicitly
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or (
+    DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    .replace("postgresql://", "postgresql+asyncpg://", 1)
+)
+
+# Connection pool sizing (per process), see database.make_engine
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))  # Connections kept open in the pool
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))  # Extra connections allowed under bursts
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Reconnect after this many seconds (server databases)
+
+# SQLite PRAGMAs applied to every new connection
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")  # WAL lets readers run alongside a writer
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))  # Wait for locks instead of failing
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # Durable in WAL mode, fewer fsyncs than FULL
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # Bytes of the file to memory-map
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # Page cache; negative values are KiB (64 MiB)
+
+# Page sizes for keyset-paginated list endpoints
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+# Grievances assigned per transaction by the bulk assignment engine (see Grievances/assignment.py)
+ASSIGN_CHUNK_SIZE = int(os.getenv("ASSIGN_CHUNK_SIZE", "1000"))
+
+# Background job queue (see jobs.py)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))  # Threads running background jobs
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "100"))  # Finished jobs kept for polling
+
+# Assign each new grievance to the least-loaded employee of its department at creation time
+AUTO_ASSIGN_ON_CREATE = os.getenv("AUTO_ASSIGN_ON_CREATE", "true").lower() in ("1", "true", "yes")
+
+# Group commit for POST /comments/ (see Comments/writer.py): one writer thread stores the comments that
+# arrive within a short window in a single transaction instead of committing each one separately
+COMMENT_GROUP_COMMIT = os.getenv("COMMENT_GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+COMMENT_BATCH_WINDOW_MS = float(os.getenv("COMMENT_BATCH_WINDOW_MS", "5"))  # How long a batch collects comments
+COMMENT_BATCH_MAX_ROWS = int(os.getenv("COMMENT_BATCH_MAX_ROWS", "500"))  # Comments per transaction at most
+COMMENT_WRITER_QUEUE_LIMIT = int(os.getenv("COMMENT_WRITER_QUEUE_LIMIT", "10000"))  # Waiting comments before 503
+
+# Live event streams (see events.py)
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))  # Undelivered events kept per subscriber
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))  # SSE keep-alive interval
+
+# Bulk import/export (see bulk_io.py)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))  # Rows inserted per transaction
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))  # Row errors listed in an import report
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))  # Rows fetched per query while exporting
+
+# Serialized response bodies of cached list endpoints (see response_cache.py)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))  # Maximum cached bodies
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))  # Lifetime of a cached body
+
+# Serialize list endpoints from Core column selects with orjson (falls back to the json module if orjson is
+# not installed) instead of ORM objects validated through response_model schemas
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+# Request instrumentation and the Prometheus /metrics endpoint (see metrics.py); off unless enabled.
+# /metrics reveals per-route traffic and per-department SLA breaches, so it requires an admin or super_admin
+# bearer token (give the scraper one, e.g. through Prometheus' authorization.credentials_file)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))  # SQL statements at least this slow are logged
+
+# SLA breach monitor (see Grievances/sla.py): a background thread escalates pending grievances that have
+# waited longer than their department's threshold, and keeps breach counts per department
+SLA_MONITOR_ENABLED = os.getenv("SLA_MONITOR_ENABLED", "true").lower() in ("1", "true", "yes")
+SLA_PENDING_HOURS = float(os.getenv("SLA_PENDING_HOURS", "72"))  # Default threshold
+SLA_DEPARTMENT_HOURS = {  # Per-department thresholds, e.g. "3=24,7=120" (department ID=hours)
+    int(department): float(hours)
+    for department, hours in (item.split("=") for item in os.getenv("SLA_DEPARTMENT_HOURS", "").split(",")
+                              if item.strip())
+}
+SLA_CHECK_INTERVAL_SECONDS = float(os.getenv("SLA_CHECK_INTERVAL_SECONDS", "60"))  # Time between checks
+# What an escalation does: "flag" records the breach; "reassign" also moves the ticket to the least-loaded
+# employee of its department
+SLA_ESCALATION = os.getenv("SLA_ESCALATION", "flag").lower()
+
+# Archival of closed grievances (see Grievances/archive.py): solved / not_solved grievances resolved more than
+# ARCHIVE_AFTER_DAYS ago are moved, with their comments and events, to archive tables by POST /grievances/archive
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_CHUNK_SIZE = int(os.getenv("ARCHIVE_CHUNK_SIZE", "1000"))  # Grievances moved per transaction
+
+# Ticket lookups (GET /grievances/ticket/{ticket_id}, see Grievances/ticket_cache.py): recently read tickets are
+# kept in a per-process LRU; the write paths drop changed tickets and the TTL bounds staleness across processes
+TICKET_CACHE_SIZE = int(os.getenv("TICKET_CACHE_SIZE", "10000"))  # Maximum cached tickets
+TICKET_CACHE_TTL_SECONDS = float(os.getenv("TICKET_CACHE_TTL_SECONDS", "30"))  # Lifetime of a cached ticket
+# How ticket IDs are stored: "text" (36-character UUID strings) or "blob" (16-byte UUIDs, a smaller
+# ticket_id index; every ticket ID must then be a UUID). Only applies to a new database
+TICKET_ID_STORAGE = os.getenv("TICKET_ID_STORAGE", "text").lower()
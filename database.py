@@ -1,25 +1,141 @@
 # Database configuration and session management for SQLAlchemy
 
-from sqlalchemy import create_engine  # Import function to create database engine
+from contextlib import asynccontextmanager, contextmanager  # Session scope and statement counting blocks
+from datetime import datetime  # When a data migration was applied
+from sqlalchemy import Column, DateTime, String, Table, create_engine, event, insert, text  # Engine factory, hooks, DDL
+from sqlalchemy.exc import IntegrityError  # Another process recorded the same data migration first
 from sqlalchemy.ext.declarative import declarative_base  # Import function to create base class for models
 from sqlalchemy.orm import sessionmaker  # Import function to create session factory
+from sqlalchemy.pool import StaticPool  # Single shared connection for in-memory SQLite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # Async engine and sessions
+from fastapi.concurrency import run_in_threadpool  # Runs blocking CRUD calls off the event loop in sync mode
+from config import (  # Configured database URLs, access mode, pool sizing and SQLite tuning
+    DATABASE_URL, ASYNC_DATABASE_URL, DB_MODE,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    SQLITE_JOURNAL_MODE, SQLITE_BUSY_TIMEOUT_MS, SQLITE_SYNCHRONOUS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE,
+)
 
-# Define the database URL for SQLite, pointing to a local file 'grievance.db'
-SQLALCHEMY_DATABASE_URL = "sqlite:///./grievance.db"
+# Define the database URL, by default SQLite pointing to a local file 'grievance.db'
+SQLALCHEMY_DATABASE_URL = DATABASE_URL
+
+# PRAGMAs applied to every new SQLite connection (order matters: journal mode first)
+SQLITE_PRAGMAS = {
+    "journal_mode": SQLITE_JOURNAL_MODE,
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    "synchronous": SQLITE_SYNCHRONOUS,
+    "mmap_size": SQLITE_MMAP_SIZE,
+    "cache_size": SQLITE_CACHE_SIZE,
+}
+
+# Function to build a sync or async engine for SQLite or a server database (e.g. Postgres)
+# SQLite gets the PRAGMAs above on every connection; server databases get a sized QueuePool
+def make_engine(url: str, async_engine: bool = False, sqlite_pragmas: dict | None = None, **overrides):
+    factory = create_async_engine if async_engine else create_engine
+    if url.startswith("sqlite"):
+        # check_same_thread is disabled so pooled connections can move between threadpool workers
+        options = {"connect_args": {"check_same_thread": False}}
+        if ":memory:" in url or url.rstrip("/").endswith(("sqlite:", "aiosqlite:")):
+            # Every connection to an in-memory database would see a different, empty database
+            options["poolclass"] = StaticPool
+        else:
+            options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+        options.update(overrides)
+        new_engine = factory(url, **options)
+        pragmas = SQLITE_PRAGMAS if sqlite_pragmas is None else sqlite_pragmas
+        # Async engines expose connection events on their underlying sync engine
+        event.listen(new_engine.sync_engine if async_engine else new_engine, "connect",
+                     lambda dbapi_connection, record: _apply_pragmas(dbapi_connection, pragmas))
+        return new_engine
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,  # Avoid connections closed by the server or a proxy
+        "pool_pre_ping": True,  # Detect dead connections before handing them out
+    }
+    options.update(overrides)
+    return factory(url, **options)
+
+# Function to run PRAGMA statements on a freshly opened DBAPI connection
+def _apply_pragmas(dbapi_connection, pragmas: dict):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
 
 # Create SQLAlchemy engine for database connection
-# connect_args disables thread checking for SQLite to allow multi-threaded access
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
 
 # Create a session factory bound to the engine
 # autocommit=False ensures manual transaction control, autoflush=False prevents auto-flushing
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory, only created when the async mode is selected
+# expire_on_commit=False keeps loaded attributes usable after commit without an implicit (blocking) reload
+async_engine = make_engine(ASYNC_DATABASE_URL, async_engine=True) if DB_MODE == "async" else None
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False) if async_engine else None
+)
+
 # Create a base class for declarative models to inherit from
 Base = declarative_base()
 
-# Generator function to provide a database session
-def get_db():
+# Context manager counting the SQL statements executed on an engine inside the block
+# (used to guard list endpoints against N+1 query regressions)
+@contextmanager
+def count_statements(bind=None):
+    target = bind or (async_engine.sync_engine if async_engine is not None else engine)
+    counter = {"statements": 0}
+
+    def on_execute(*args):
+        counter["statements"] += 1
+
+    event.listen(target, "before_cursor_execute", on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(target, "before_cursor_execute", on_execute)
+
+# Indexes declared by earlier versions of the models and since replaced; dropped from existing databases
+RETIRED_INDEXES = [
+    "ix_comments_grievance_timestamp_id",          # Threads are now walked in id order
+    "ix_comments_archive_grievance_timestamp_id",
+]
+
+# Function to create indexes declared on the models that an existing database does not have yet
+# (create_all skips tables that already exist, including their new indexes), and drop retired ones
+def ensure_indexes(bind=None):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind or engine, checkfirst=True)
+    with (bind or engine).begin() as conn:
+        for name in RETIRED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+# One-time data migrations already applied to this database, by name
+schema_migrations = Table(
+    "schema_migrations", Base.metadata,
+    Column("name", String, primary_key=True),
+    Column("applied_at", DateTime),
+)
+
+# Function to apply a data migration once per database: migrate(connection) runs in the transaction that
+# records it. The record is inserted first, so a second process starting at the same time waits for the
+# write lock and then finds it (IntegrityError) instead of applying the migration again.
+# Returns False if it had already been applied
+def run_once(name: str, migrate, bind=None) -> bool:
+    try:
+        with (bind or engine).begin() as conn:
+            conn.execute(insert(schema_migrations).values(name=name, applied_at=datetime.utcnow()))
+            migrate(conn)
+    except IntegrityError:
+        return False
+    return True
+
+# Generator function to provide a synchronous database session
+def get_sync_db():
     # Create a new database session
     db = SessionLocal()
     try:
@@ -28,3 +144,41 @@ def get_db():
     finally:
         # Ensure the session is closed after use
         db.close()
+
+# Async generator function to provide an AsyncSession
+async def get_async_db():
+    # The context manager closes the session (and returns its connection) after use
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency used by every router: yields a Session or an AsyncSession depending on DB_MODE
+get_db = get_async_db if DB_MODE == "async" else get_sync_db
+
+# Async context manager for a short-lived session of the configured kind, outside request dependencies
+# (e.g. long-lived streams that must not hold a pooled connection for their whole lifetime)
+@asynccontextmanager
+async def session_scope():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+# Function to run a CRUD function written against Session with whichever session get_db provided
+# In async mode it runs on the AsyncSession via run_sync, in sync mode on the threadpool
+async def run_db(db, fn, *args, **kwargs):
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+# Function to give a request's pooled connection back early (e.g. before waiting on another thread that
+# needs a connection itself); the session stays usable and checks out a new connection if used again
+async def release_db(db):
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
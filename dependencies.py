@@ -2,11 +2,14 @@ from fastapi import Depends, HTTPException, status  # Import FastAPI dependencie
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorizationCredentials  # OAuth2 and Bearer token handling
 from sqlalchemy.orm import Session  # SQLAlchemy session management
 from jose import JWTError, jwt  # JWT encoding and decoding
-from database import get_db  # Function to get DB session
-from User import models  # User model for querying database
+from database import get_db, run_db  # Session dependency and CRUD runner (sync or async)
+from User import models, crud  # User model and lookups
 from roles import RoleEnum as Role  # Enum for user roles
 from typing import List  # For type annotations
 from datetime import datetime, timedelta  # For time-based token expiration
+import time  # Wall clock used to bound cache lifetime by token expiry
+from auth_cache import Principal, token_cache, principal_cache  # Verified-token and principal caches
+import metrics  # Time spent signing and verifying JWTs, per route
 
 # Constants for JWT creation
 SECRET_KEY = "your-secret-key"  # Secret key for signing JWTs (replace with a secure value in production)
@@ -20,38 +23,59 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()  # Create a copy of the payload data
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))  # Set expiration time
     to_encode.update({"exp": expire})  # Add expiration to payload
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)  # Encode and return JWT token
+    started = time.perf_counter()
+    token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)  # Encode the JWT token
+    metrics.record_crypto("jwt_encode", time.perf_counter() - started)
+    return token
 
-# Optional helper function to retrieve a database session
-def get_db_session():
-    return get_db()
+# Optional helper alias to retrieve a database session (a Session or AsyncSession, see database.DB_MODE)
+get_db_session = get_db
 
-# Dependency to get the currently authenticated user from a JWT token
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme), db: Session = Depends(get_db_session)):
-    token = credentials.credentials  # Extract token from Authorization header
+# Function to resolve a JWT into the authenticated Principal (raises HTTP 401 if it cannot)
+# Verified tokens and resolved principals are cached, so a warm request does no decoding and no query
+async def resolve_principal(token: str, db) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        # Decode the token and extract user ID
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = int(payload.get("sub"))  # Extract user ID from the 'sub' claim
-        if user_id is None:
+    user_id = token_cache.get(token)  # Reuse an earlier verification of this token
+    if user_id is None:
+        try:
+            # Decode the token and extract user ID
+            started = time.perf_counter()
+            try:
+                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            finally:
+                metrics.record_crypto("jwt_decode", time.perf_counter() - started)
+            user_id: int = int(payload.get("sub"))  # Extract user ID from the 'sub' claim
+            if user_id is None:
+                raise credentials_exception
+        except (JWTError, TypeError, ValueError):
+            # Raise error if token is invalid, decoding fails or 'sub' is not an ID
             raise credentials_exception
-    except JWTError:
-        # Raise error if token is invalid or decoding fails
-        raise credentials_exception
+        # Never keep a token cached past its own expiry
+        exp = payload.get("exp")
+        token_cache.set(token, user_id, ttl=exp - time.time() if exp else None)
+
+    principal = principal_cache.get(user_id)  # Reuse the resolved user if still cached
+    if principal is None:
+        # Fetch the user from the database
+        user = await run_db(db, crud.get_user, user_id)
+        if user is None:
+            raise credentials_exception  # Raise error if user doesn't exist
+        principal = Principal(id=user.id, role=user.role, department_id=user.department_id)
+        principal_cache.set(user_id, principal)
+    return principal  # Return the authenticated user
 
-    # Fetch the user from the database
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if user is None:
-        raise credentials_exception  # Raise error if user doesn't exist
-    return user  # Return the authenticated user
+# Dependency to get the currently authenticated user from a JWT token
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme), db: Session = Depends(get_db_session)):
+    token = credentials.credentials  # Extract token from Authorization header
+    return await resolve_principal(token, db)
 
 # Dependency that returns the current authenticated and active user
-def get_current_active_user(current_user: models.User = Depends(get_current_user)):
+# (async so that, like the role check below, it runs inline instead of taking a threadpool hop)
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)):
     return current_user
 
 # Class-based dependency to enforce role-based access control
@@ -60,7 +84,7 @@ class RoleChecker:
         # Convert Enum values to string if necessary
         self.allowed_roles = [role.value if isinstance(role, Role) else role for role in allowed_roles]
 
-    def __call__(self, current_user: models.User = Depends(get_current_active_user)):
+    async def __call__(self, current_user: Principal = Depends(get_current_active_user)):
         # Check if current user's role is in the list of allowed roles
         if current_user.role not in self.allowed_roles:
             raise HTTPException(
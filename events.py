@@ -0,0 +1,123 @@
+# events.py
+# In-process pub/sub hub for grievance and comment updates; the CRUD write paths publish here and
+# Events/APIs.py streams the events to clients over SSE and WebSocket, so they no longer need to poll
+
+import asyncio  # Subscriber queues and the event loop the hub delivers on
+import json  # Events are serialized once per publish, not once per subscriber
+import threading  # Guards the subscriber registry
+from datetime import datetime  # Event timestamps
+from typing import Iterable, Optional
+
+from config import EVENT_QUEUE_SIZE
+from roles import RoleEnum
+
+# Roles that receive every event
+ADMIN_ROLES = (RoleEnum.admin, RoleEnum.super_admin)
+
+
+# One connected client: a bounded queue of serialized events, owned by the client's event loop
+class Subscriber:
+    def __init__(self, user_id: int, role: str, queue_size: int):
+        self.user_id = user_id
+        self.role = role
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0  # Events discarded because the client was not reading
+
+    # Queue an event; a slow client loses its oldest events instead of growing without bound
+    def push(self, payload: str) -> bool:
+        dropped = False
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            dropped = True
+        self.queue.put_nowait(payload)
+        return dropped
+
+
+class EventHub:
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._by_user = {}  # user ID -> set of Subscriber
+        self._admins = set()  # Subscribers that see everything
+        self.published = 0  # Events published while at least one client was connected
+        self.delivered = 0  # Event copies queued for clients
+        self.dropped = 0  # Event copies discarded for slow clients
+
+    # True when at least one client is connected (publishers skip extra lookups otherwise)
+    @property
+    def active(self) -> bool:
+        return bool(self._by_user or self._admins)
+
+    # Register a client; must be called on the client's event loop
+    def subscribe(self, user_id: int, role: str) -> Subscriber:
+        subscriber = Subscriber(user_id, role, self.queue_size)
+        with self._lock:
+            if role in ADMIN_ROLES:
+                self._admins.add(subscriber)
+            else:
+                self._by_user.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    # Remove a client
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._admins.discard(subscriber)
+            subscribers = self._by_user.get(subscriber.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._by_user[subscriber.user_id]
+
+    # Publish an event to admins (unless admins=False) and to the given users (owner, assignee, ...)
+    # Only the interested subscribers are looked up: O(recipients), not O(connected clients).
+    # Safe to call from any thread; queues are only touched on the loop that owns them
+    def publish(self, event_type: str, data: dict, user_ids: Iterable[Optional[int]] = (), admins: bool = True):
+        if not self.active:
+            return
+        audience = {uid for uid in user_ids if uid is not None}
+        with self._lock:
+            targets = list(self._admins) if admins else []
+            for uid in audience:
+                targets.extend(self._by_user.get(uid, ()))
+        self.published += 1
+        if not targets:
+            return
+        payload = json.dumps({"type": event_type, "at": datetime.utcnow().isoformat(), "data": data},
+                             default=str)
+
+        # One hand-off per loop rather than one per subscriber
+        by_loop = {}
+        for subscriber in targets:
+            by_loop.setdefault(subscriber.loop, []).append(subscriber)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for loop, subscribers in by_loop.items():
+            if loop is running:
+                self._deliver(payload, subscribers)
+            else:
+                try:
+                    loop.call_soon_threadsafe(self._deliver, payload, subscribers)
+                except RuntimeError:  # Loop already closed; its subscribers are gone
+                    pass
+
+    # Queue one payload for each subscriber; runs on the subscribers' loop
+    def _deliver(self, payload: str, subscribers: list):
+        for subscriber in subscribers:
+            if subscriber.push(payload):
+                self.dropped += 1
+        self.delivered += len(subscribers)
+
+    # Counters for monitoring
+    def stats(self) -> dict:
+        with self._lock:
+            connected = len(self._admins) + sum(len(s) for s in self._by_user.values())
+        return {"connected": connected, "published": self.published,
+                "delivered": self.delivered, "dropped": self.dropped}
+
+
+# Shared hub fed by the CRUD write paths
+hub = EventHub()
@@ -0,0 +1,139 @@
+# jobs.py
+# In-process background job queue with progress polling, cancellation and coalescing of
+# repeated triggers, so long admin operations do not run inside an HTTP request
+
+import threading  # Cancellation flags and the registry lock
+import traceback  # Error details recorded on failed jobs
+import uuid  # Job IDs
+from collections import OrderedDict  # Registry of jobs, oldest first
+from concurrent.futures import ThreadPoolExecutor  # Worker threads
+from datetime import datetime  # Job timestamps
+from enum import Enum  # Job states
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel  # Response schema for job status
+
+from config import JOB_WORKERS, JOB_HISTORY
+
+
+# Lifecycle states of a job
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+# Schema returned by job endpoints
+class JobOut(BaseModel):
+    id: str
+    kind: str
+    status: JobStatus
+    progress: dict = {}                   # Latest progress snapshot published by the job
+    result: Optional[Any] = None          # Final result of a succeeded (or cancelled) job
+    error: Optional[str] = None           # Error message of a failed job
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+        from_attributes = True
+
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = JobStatus.queued
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    # True once cancellation was requested; long-running jobs check it between steps
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    # Publish a progress snapshot for pollers
+    def report(self, **progress):
+        self.progress = progress
+
+    @property
+    def active(self) -> bool:
+        return self.status in (JobStatus.queued, JobStatus.running)
+
+
+class JobQueue:
+    def __init__(self, workers: int = JOB_WORKERS, history: int = JOB_HISTORY):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jobs")
+        self._jobs = OrderedDict()  # job ID -> Job
+        self._active = {}  # kind -> queued or running Job of that kind
+        self._history = history
+        self._lock = threading.Lock()
+
+    # Queue fn(job) to run in the background; returns (job, created)
+    # If a job of the same kind is still queued or running, that job is returned instead (coalescing)
+    def submit(self, kind: str, fn: Callable[[Job], Any]) -> tuple[Job, bool]:
+        with self._lock:
+            existing = self._active.get(kind)
+            if existing is not None and existing.active:
+                return existing, False
+            job = Job(kind)
+            self._jobs[job.id] = job
+            self._active[kind] = job
+            self._trim()
+        self._executor.submit(self._run, job, fn)
+        return job, True
+
+    # Look up a job by ID
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    # Request cancellation; a queued job never starts, a running job stops at its next check
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job._cancel.set()
+        with self._lock:
+            if job.status == JobStatus.queued:
+                self._finish(job, JobStatus.cancelled)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]):
+        with self._lock:
+            if job.status != JobStatus.queued:
+                return  # Cancelled while waiting
+            job.status = JobStatus.running
+            job.started_at = datetime.utcnow()
+        try:
+            job.result = fn(job)
+            outcome = JobStatus.cancelled if job.cancel_requested() else JobStatus.succeeded
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+            traceback.print_exc()
+            outcome = JobStatus.failed
+        with self._lock:
+            self._finish(job, outcome)
+
+    # Record a terminal state (caller holds the lock)
+    def _finish(self, job: Job, status: JobStatus):
+        job.status = status
+        job.finished_at = datetime.utcnow()
+        if self._active.get(job.kind) is job:
+            del self._active[job.kind]
+
+    # Forget the oldest finished jobs beyond the history limit (caller holds the lock)
+    def _trim(self):
+        finished = [j for j in self._jobs.values() if not j.active]
+        for job in finished[:max(0, len(finished) - self._history)]:
+            del self._jobs[job.id]
+
+
+# Shared queue used by the routers
+jobs = JobQueue()
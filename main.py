@@ -1,17 +1,36 @@
 # Main FastAPI application setup with middleware, routers, and database initialization
 
-from fastapi import FastAPI  # Import FastAPI framework for building APIs
+from fastapi import Depends, FastAPI, Request  # Import FastAPI framework for building APIs
+from fastapi.responses import JSONResponse  # JSON response used by exception handlers
 from fastapi.middleware.cors import CORSMiddleware  # Import CORS middleware for cross-origin requests
 
-from database import engine, Base  # Import SQLAlchemy engine and base class for database
+from database import engine, async_engine, Base, ensure_indexes, run_once, SessionLocal  # Import SQLAlchemy engines, base class, index helper and sessions
+from Comments.migrations import TIMESTAMPS_TO_UTC, timestamps_to_utc  # Comment timestamps from local time to UTC
 from Department.APIs import router as dept_router  # Import Department API router
 from User.APIs import router as user_router  # Import User API router
 from Grievances.APIs import router as grv_router  # Import Grievances API router
 from Comments.APIs import router as com_router  # Import Comments API router
+from Events.APIs import router as events_router  # Import live event stream router
 import auth  # Import authentication module (assumed to contain auth router)
 import User.APIs as user_apis  # Import User APIs module (assumed to contain additional router)
 from Department import models as dept_models  # Import Department database models
 from User import models as user_models  # Import User database models
+from User.hashing import HashingPoolSaturated  # Raised when the bcrypt pool is full
+from Comments.writer import CommentWriterSaturated  # Raised when the comment writer's queue is full
+from Comments.crud import GrievanceClosedForComments  # Raised when a comment targets an archived or unknown grievance
+from Grievances.scheduler import assignment_scheduler  # Creation-time grievance assignment
+from Grievances.stats import grievance_stats  # Dashboard counters
+from Grievances.history import ensure_history  # Grievance lifecycle log
+from Grievances.models import check_ticket_storage  # Ticket ID column format check
+from Grievances.sla import sla_monitor  # SLA breach detection and escalation
+from Admin.APIs import router as admin_router  # Import admin dashboard router
+from Search.APIs import router as search_router  # Import full-text search router
+from Search.index import ensure_search_index  # FTS5 index over comment text
+from config import METRICS_ENABLED, SLA_MONITOR_ENABLED  # Metrics and SLA monitor switches
+from metrics import MetricsMiddleware, instrument_engine, registry, router as metrics_router  # Request/SQL/crypto metrics
+from pagination import NEXT_CURSOR_HEADER  # Response header carrying the next page's cursor
+from dependencies import RoleChecker  # Role check guarding /metrics
+from roles import RoleEnum as Role  # Roles allowed to read /metrics
 
 # Create all database tables defined in the Base metadata
 Base.metadata.create_all(bind=engine)
@@ -19,10 +38,38 @@ Base.metadata.create_all(bind=engine)
 dept_models.Base.metadata.create_all(bind=engine)
 # Create User-specific database tables
 user_models.Base.metadata.create_all(bind=engine)
+# Add indexes introduced after an existing database was created
+ensure_indexes(engine)
+# Convert comment timestamps written in local time to UTC, once per database and before any new comment
+run_once(TIMESTAMPS_TO_UTC, timestamps_to_utc, engine)
+# Stop early if ticket IDs are stored differently from TICKET_ID_STORAGE
+check_ticket_storage(engine)
+# Create the full-text index and the triggers that keep it in sync (filled from existing comments once)
+ensure_search_index(engine)
+# Load employees and their open-ticket counts into the assignment scheduler
+# and compute the dashboard counters; on the first start with the lifecycle log, fill it from current state
+with SessionLocal() as db:
+    assignment_scheduler.rebuild(db)
+    grievance_stats.rebuild(db)
+    ensure_history(db)
+    sla_monitor.rebuild(db)
+
+# Check for pending grievances past their SLA threshold in the background
+if SLA_MONITOR_ENABLED:
+    sla_monitor.start()
 
 # Initialize FastAPI application with debug mode enabled
 app = FastAPI(debug=True)
 
+# Count and time SQL statements per route, and serve the collected numbers at /metrics (admins only)
+if METRICS_ENABLED:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router, dependencies=[Depends(RoleChecker([Role.admin, Role.super_admin]))])
+    registry.collectors.append(sla_monitor.metric_lines)
+
 # Register API routers to include their endpoints in the application
 app.include_router(dept_router)  # Include Department API endpoints
 app.include_router(user_router)  # Include User API endpoints
@@ -30,6 +77,9 @@ app.include_router(user_apis.router)  # Include additional User API endpoints
 app.include_router(auth.router)  # Include authentication API endpoints
 app.include_router(grv_router)  # Include Grievances API endpoints
 app.include_router(com_router)  # Include Comments API endpoints
+app.include_router(events_router)  # Include SSE / WebSocket event streams
+app.include_router(admin_router)  # Include admin dashboard endpoints
+app.include_router(search_router)  # Include full-text search endpoints
 
 # Add CORS middleware to allow cross-origin requests
 app.add_middleware(
@@ -38,4 +88,30 @@ app.add_middleware(
     allow_credentials=True,  # Allow credentials (e.g., cookies) in requests
     allow_methods=["*"],  # Allow all HTTP methods (GET, POST, etc.)
     allow_headers=["*"],  # Allow all headers in requests
+    expose_headers=[NEXT_CURSOR_HEADER],  # Let browser clients read the next page's cursor
 )
+
+# Reject password work quickly with 503 when the bcrypt pool and its queue are full
+@app.exception_handler(HashingPoolSaturated)
+async def hashing_pool_saturated(request: Request, exc: HashingPoolSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"},  # Hint clients to back off briefly
+    )
+
+# Reject comments with 503 when the group-commit writer already has a full queue
+@app.exception_handler(CommentWriterSaturated)
+async def comment_writer_saturated(request: Request, exc: CommentWriterSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+# Reject comments on archived grievances with 409 (their threads are closed) and on unknown ones with 404
+@app.exception_handler(GrievanceClosedForComments)
+async def grievance_closed_for_comments(request: Request, exc: GrievanceClosedForComments):
+    if exc.archived:
+        return JSONResponse(status_code=409, content={"detail": "Grievance is archived"})
+    return JSONResponse(status_code=404, content={"detail": "Grievance not found"})
@@ -0,0 +1,212 @@
+# metrics.py
+# Request instrumentation: per-route latency histograms, SQL statement counts and DB time (from SQLAlchemy
+# engine events), time spent in bcrypt and JWT, a slow-query log, and a Prometheus /metrics endpoint.
+# Per-request numbers travel in a context variable, which follows requests into the threadpool and run_sync
+
+import logging  # Slow-query log
+import threading  # Guards the process-wide registry
+import time  # Latency measurements
+from bisect import bisect_left  # Histogram bucket lookup
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+
+from config import SLOW_QUERY_MS
+
+# Latency buckets in seconds (upper bounds, Prometheus "le")
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Route label used for work outside any request (background jobs, startup)
+BACKGROUND = "(background)"
+# Route label for requests that matched no route, so bad URLs cannot create unbounded label values
+UNMATCHED = "(unmatched)"
+
+slow_query_log = logging.getLogger("grievance.slow_query")
+
+
+# Numbers collected while one request is being handled
+class RequestStats:
+    __slots__ = ("statements", "db_seconds", "crypto")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.crypto = {}  # operation -> (calls, seconds)
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+# Process-wide totals, keyed by label tuples
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}  # (method, route) -> Histogram
+        self.requests = {}  # (method, route, status) -> count
+        self.statements = {}  # route -> SQL statements
+        self.db_seconds = {}  # route -> seconds spent executing SQL
+        self.crypto_calls = {}  # (route, operation) -> calls
+        self.crypto_seconds = {}  # (route, operation) -> seconds
+        self.slow_queries = 0
+        self.collectors = []  # Functions returning extra exposition lines (gauges kept by other modules)
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            self.latency.setdefault((method, route), Histogram()).observe(seconds)
+            key = (method, route, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.statements[route] = self.statements.get(route, 0) + stats.statements
+            self.db_seconds[route] = self.db_seconds.get(route, 0.0) + stats.db_seconds
+            for operation, (calls, spent) in stats.crypto.items():
+                self._add_crypto(route, operation, calls, spent)
+
+    def record_background(self, statements: int = 0, db_seconds: float = 0.0, operation: str = None,
+                          crypto_seconds: float = 0.0):
+        with self._lock:
+            self.statements[BACKGROUND] = self.statements.get(BACKGROUND, 0) + statements
+            self.db_seconds[BACKGROUND] = self.db_seconds.get(BACKGROUND, 0.0) + db_seconds
+            if operation is not None:
+                self._add_crypto(BACKGROUND, operation, 1, crypto_seconds)
+
+    def _add_crypto(self, route, operation, calls, seconds):
+        key = (route, operation)
+        self.crypto_calls[key] = self.crypto_calls.get(key, 0) + calls
+        self.crypto_seconds[key] = self.crypto_seconds.get(key, 0.0) + seconds
+
+    # Prometheus text exposition format, version 0.0.4
+    def render(self) -> str:
+        def labels(**values):
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in values.items()) + "}"
+
+        lines = []
+        with self._lock:
+            lines += ["# HELP http_request_duration_seconds Request latency by route.",
+                      "# TYPE http_request_duration_seconds histogram"]
+            for (method, route), histogram in sorted(self.latency.items()):
+                cumulative = 0
+                bounds = [str(b) for b in histogram.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append("http_request_duration_seconds_bucket"
+                                 f"{labels(method=method, route=route, le=bound)} {cumulative}")
+                lines.append(f"http_request_duration_seconds_sum{labels(method=method, route=route)} {histogram.sum}")
+                lines.append(f"http_request_duration_seconds_count{labels(method=method, route=route)} {cumulative}")
+            lines += ["# HELP http_requests_total Requests by route and status code.",
+                      "# TYPE http_requests_total counter"]
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{labels(method=method, route=route, status=status)} {count}")
+            lines += ["# HELP db_statements_total SQL statements executed, by route.",
+                      "# TYPE db_statements_total counter"]
+            for route, count in sorted(self.statements.items()):
+                lines.append(f"db_statements_total{labels(route=route)} {count}")
+            lines += ["# HELP db_time_seconds_total Time spent executing SQL, by route.",
+                      "# TYPE db_time_seconds_total counter"]
+            for route, seconds in sorted(self.db_seconds.items()):
+                lines.append(f"db_time_seconds_total{labels(route=route)} {seconds}")
+            lines += ["# HELP crypto_operations_total bcrypt and JWT operations, by route.",
+                      "# TYPE crypto_operations_total counter"]
+            for (route, operation), count in sorted(self.crypto_calls.items()):
+                lines.append(f"crypto_operations_total{labels(route=route, operation=operation)} {count}")
+            lines += ["# HELP crypto_seconds_total Time spent in bcrypt and JWT, by route.",
+                      "# TYPE crypto_seconds_total counter"]
+            for (route, operation), seconds in sorted(self.crypto_seconds.items()):
+                lines.append(f"crypto_seconds_total{labels(route=route, operation=operation)} {seconds}")
+            lines += ["# HELP db_slow_queries_total SQL statements slower than SLOW_QUERY_MS.",
+                      "# TYPE db_slow_queries_total counter",
+                      f"db_slow_queries_total {self.slow_queries}"]
+        for collect in self.collectors:
+            lines += collect()
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+
+
+# Function to charge time spent in bcrypt or JWT to the current request (or to background work)
+def record_crypto(operation: str, seconds: float):
+    stats = _current.get()
+    if stats is None:
+        registry.record_background(operation=operation, crypto_seconds=seconds)
+        return
+    calls, spent = stats.crypto.get(operation, (0, 0.0))
+    stats.crypto[operation] = (calls + 1, spent + seconds)
+
+
+# Engine event hooks: time every statement and charge it to the current request
+# The start time lives on the statement's execution context, not the pooled connection:
+# after_cursor_execute does not fire for a failing statement, and nothing would clean up after it
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - context._metrics_started
+    stats = _current.get()
+    if stats is None:
+        registry.record_background(statements=1, db_seconds=seconds)
+    else:
+        stats.statements += 1
+        stats.db_seconds += seconds
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        with registry._lock:
+            registry.slow_queries += 1
+        slow_query_log.warning("slow query (%.1f ms): %s", seconds * 1000, " ".join(statement.split()))
+
+
+# Function to attach the statement hooks to an engine (sync Engine, or AsyncEngine.sync_engine)
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ASGI middleware timing every HTTP request; labels use the matched route template, not the raw path
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = _current.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", UNMATCHED)
+            registry.record_request(scope["method"], route, status_code, time.perf_counter() - started, stats)
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+# Endpoint exposing the collected metrics for Prometheus to scrape
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
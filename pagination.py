@@ -0,0 +1,58 @@
+# pagination.py
+# Opaque cursors for keyset pagination over (timestamp, id), plain id and (score, id) orderings
+
+import base64  # URL-safe encoding of the cursor payload
+import json  # Cursor payload format
+from datetime import datetime  # Timestamp half of the cursor
+
+from fastapi import HTTPException  # Reported when a client sends a malformed cursor
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# Function to encode the sort key of the last row of a page into an opaque cursor string
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    payload = json.dumps([timestamp.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+# Function to decode a cursor back into (timestamp, id); raises HTTP 400 if it was tampered with
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Function to encode the id of the last row of a page ordered by id alone (e.g. the user listing)
+def encode_id_cursor(row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([row_id]).encode()).decode().rstrip("=")
+
+
+# Function to decode an id cursor; raises HTTP 400 if it was tampered with
+def decode_id_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (row_id,) = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Function to encode the (score, id) of the last row of a relevance-ranked page (e.g. search results)
+def encode_rank_cursor(score: float, row_id: int) -> str:
+    payload = json.dumps([score, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+# Function to decode a rank cursor back into (score, id); raises HTTP 400 if it was tampered with
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(score), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
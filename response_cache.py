@@ -0,0 +1,125 @@
+# response_cache.py
+# Conditional GET support for read endpoints: per-resource version counters bumped by the CRUD write paths,
+# weak ETags derived from (resource version, request variant), 304 answers to If-None-Match, and a cache of
+# serialized bodies so an unchanged list is neither queried nor re-serialized.
+# Like the assignment scheduler, the counters live in this process, so a write handled by another worker
+# process is never seen here. ETags therefore also carry the current RESPONSE_CACHE_TTL_SECONDS window:
+# when it ends, every ETag changes, and both cached bodies and 304 answers are at most one window stale
+
+import hashlib  # Short digest of the request variant inside the ETag
+import json  # Fallback encoder for dump_rows
+import threading  # Writes bump counters from several request threads
+import time  # Wall clock numbering the ETag windows
+import uuid  # Per-process prefix so ETags from another process (or an earlier run) never match
+from functools import lru_cache
+from typing import Awaitable, Callable, Hashable, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+try:
+    import orjson  # Optional: fast encoder used by dump_rows
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+from config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS
+from ttl_cache import TTLCache
+
+# Resources with version counters
+DEPARTMENTS = "departments"
+USERS = "users"
+GRIEVANCES = "grievances"
+
+# Authenticated, per-user responses: browsers may keep them but must revalidate every time
+CACHE_CONTROL = "private, no-cache"
+
+_boot = uuid.uuid4().hex[:8]
+_lock = threading.Lock()
+_versions = {}  # resource -> number of writes seen by this process
+# ETag -> (body bytes, extra headers)
+body_cache = TTLCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECONDS)
+
+
+# Function called by the CRUD write paths after a commit that changes what a resource's reads return
+def bump(resource: str):
+    with _lock:
+        _versions[resource] = _versions.get(resource, 0) + 1
+
+
+# Function to read a resource's current version
+def version(resource: str) -> int:
+    return _versions.get(resource, 0)
+
+
+# Function to number the current RESPONSE_CACHE_TTL_SECONDS window (a fresh number on every call when
+# the TTL is 0, which turns the cache and 304 answers off)
+def window() -> int:
+    if RESPONSE_CACHE_TTL_SECONDS <= 0:
+        return time.monotonic_ns()
+    return int(time.time() // RESPONSE_CACHE_TTL_SECONDS)
+
+
+# Function to build the weak ETag of one variant (role, filters, page, ...) of a resource at a version
+def make_etag(resource: str, resource_version: int, variant: Hashable) -> str:
+    digest = hashlib.blake2b(repr(variant).encode(), digest_size=8).hexdigest()
+    return f'W/"{_boot}-{resource}-{resource_version}.{window()}-{digest}"'
+
+
+# Function to check an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires)
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+# Cached TypeAdapter per response type (building one is far more expensive than using it)
+@lru_cache(maxsize=None)
+def _adapter(response_type) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+# Function to serialize ORM objects (or dicts) to JSON bytes through a response schema
+def dump_json(response_type, content) -> bytes:
+    adapter = _adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+# Function to serialize rows that were selected column by column (FAST_JSON mode)
+# The columns are labelled like the response schema's fields, so the rows are encoded as they are, without validation
+def dump_rows(rows) -> bytes:
+    records = [row._asdict() for row in rows]
+    if orjson is not None:
+        return orjson.dumps(records)
+    return json.dumps(records, default=_json_default, separators=(",", ":")).encode()
+
+
+# Encoder hook for the json module fallback (datetimes; str enums encode as their values already)
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+# Function to answer a read from the version counters and body cache
+# render() runs only on a cache miss and returns (JSON body bytes, extra response headers)
+async def conditional_response(
+    request: Request,
+    resource: str,
+    variant: Hashable,
+    render: Callable[[], Awaitable[Tuple[bytes, dict]]],
+) -> Response:
+    current = version(resource)  # Read before rendering, so a body is never newer-tagged than its data
+    etag = make_etag(resource, current, variant)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    cached = body_cache.get(etag)
+    if cached is None:
+        cached = await render()
+        if version(resource) == current:  # Skip caching if a write landed while rendering
+            body_cache.set(etag, cached)
+    body, extra = cached
+    return Response(content=body, media_type="application/json", headers={**headers, **extra})
@@ -0,0 +1,52 @@
+# tests/conftest.py
+# Shared setup for the test suite: the application modules read DATABASE_URL at import time, so point them
+# at a throwaway SQLite file before any test imports them; every module shares one database seeded with the fast
+# seeders of benchmarks/common.py
+
+import os  # Environment read by config.py
+import sys  # Makes the repository root and benchmarks/ importable
+import tempfile  # Directory of the throwaway database
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Never touch the real grievance.db, and keep the SLA monitor from escalating year-old seeded tickets
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="grievance-test-"), "test.db")
+os.environ["SLA_MONITOR_ENABLED"] = "false"
+
+ROWS = 200  # Grievances and comments seeded for the list endpoints
+
+# Seeded accounts (IDs in insertion order): users 1-50, employees 51-60, admins 61-62
+ADMIN_ID = 61
+OTHER_ADMIN_ID = 62
+
+
+# Function to build the Authorization header of a seeded account
+def bearer(user_id: int) -> dict:
+    from dependencies import create_access_token
+
+    return {"Authorization": "Bearer " + create_access_token({"sub": str(user_id)})}
+
+
+# Fixture seeding one database for the whole session and returning a client running the app's lifespan
+@pytest.fixture(scope="session")
+def client():
+    from common import make_session_factory, seed_comments, seed_departments, seed_grievances, seed_users
+    from fastapi.testclient import TestClient
+    from roles import RoleEnum
+    import main
+
+    engine, _ = make_session_factory(os.environ["DATABASE_URL"])
+    department_ids = seed_departments(engine, 5)
+    seed_users(engine, 50)
+    seed_users(engine, 10, start=50, role=RoleEnum.employee, department_id=department_ids[0])
+    seed_users(engine, 2, start=60, role=RoleEnum.admin)
+    seed_grievances(engine, ROWS, list(range(1, 51)), department_ids, employee_ids=list(range(51, 61)))
+    seed_comments(engine, ROWS, 1, list(range(1, 61)))
+
+    with TestClient(main.app) as client:
+        yield client
@@ -0,0 +1,54 @@
+# tests/test_comment_targets.py
+# Comments are only accepted on live grievances: an archived grievance answers 409 and an unknown one 404,
+# and neither leaves a comment behind
+
+import datetime
+
+from sqlalchemy import func, insert, select
+
+from conftest import ADMIN_ID, ROWS, bearer
+
+ARCHIVED_ID = ROWS + 1  # Past every seeded grievance, so it only exists in the archive
+
+
+# Function to post a comment as the admin and return the response
+def post_comment(client, grievance_id: int):
+    body = {"grievance_id": grievance_id, "user_id": ADMIN_ID, "content": "still waiting"}
+    return client.post("/comments/", json=body, headers=bearer(ADMIN_ID))
+
+
+# Function to count the comments stored on a grievance
+def comment_count(grievance_id: int) -> int:
+    from Comments.models import Comment
+    from database import engine
+
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).where(Comment.grievance_id == grievance_id))
+
+
+def test_comment_on_archived_grievance_is_rejected(client):
+    from Grievances.models import ArchivedGrievance, GrievanceStatus
+    from database import engine
+
+    now = datetime.datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(ArchivedGrievance).values(
+            id=ARCHIVED_ID, user_id=1, department_id=1, status=GrievanceStatus.solved,
+            created_at=now, resolved_at=now, archived_at=now,
+        ))
+
+    response = post_comment(client, ARCHIVED_ID)
+    assert response.status_code == 409
+    assert comment_count(ARCHIVED_ID) == 0
+
+
+def test_comment_on_unknown_grievance_is_rejected(client):
+    response = post_comment(client, ARCHIVED_ID + 1)
+    assert response.status_code == 404
+    assert comment_count(ARCHIVED_ID + 1) == 0
+
+
+def test_comment_on_live_grievance_is_accepted(client):
+    response = post_comment(client, 1)
+    assert response.status_code == 200, response.text
+    assert response.json()["grievance_id"] == 1
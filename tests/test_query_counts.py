@@ -0,0 +1,31 @@
+# tests/test_query_counts.py
+# Guards the list endpoints against N+1 query regressions: seeds a database, calls each endpoint once warm,
+# and fails if it issues more SQL statements than its budget (which does not depend on the page size)
+
+import pytest
+
+from conftest import ADMIN_ID, ROWS, bearer
+
+# Statement budgets per request
+BUDGETS = {
+    "/grievances/": 1,
+    "/grievances/expanded": 4,
+    "/comments/grievance/1": 1,
+    "/comments/grievance/1/expanded": 2,
+}
+
+
+@pytest.mark.parametrize("path, budget", BUDGETS.items())
+def test_list_endpoint_statement_budget(client, path, budget):
+    from database import count_statements
+    import response_cache
+
+    params, headers = {"limit": ROWS}, bearer(ADMIN_ID)
+    client.get(path, params=params, headers=headers)  # Warm the auth caches
+    response_cache.body_cache.clear()  # Measure the queries, not a cached body
+    with count_statements() as counter:
+        response = client.get(path, params=params, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == ROWS
+    assert counter["statements"] <= budget
@@ -0,0 +1,57 @@
+# tests/test_reset_password.py
+# Access rules of POST /users/reset-password: who may reset whose password, and what a caller learns about
+# accounts it may not touch. Only rejected resets are exercised, so no password is ever hashed
+
+import pytest
+from sqlalchemy import update
+
+from conftest import ADMIN_ID, OTHER_ADMIN_ID, bearer
+
+URL = "/users/reset-password"
+
+
+# Fixture giving the accounts under test addresses EmailStr accepts (it rejects the seeded .local domain)
+@pytest.fixture(scope="module", autouse=True)
+def emails(client):
+    from User.models import User
+    from database import engine
+
+    with engine.begin() as conn:
+        for user_id in (1, 2, OTHER_ADMIN_ID):
+            conn.execute(update(User).where(User.id == user_id).values(email=email(user_id)))
+
+
+# Function to build the address of an account under test
+def email(user_id: int) -> str:
+    return f"user{user_id}@example.com"
+
+
+# Function to build a reset request body for an account under test
+def reset(user_id: int, **fields) -> dict:
+    return {"email": email(user_id), "new_password": "new-secret", **fields}
+
+
+def test_requires_a_token(client):
+    assert client.post(URL, json=reset(1)).status_code == 401
+
+
+def test_self_reset_requires_old_password(client):
+    response = client.post(URL, json=reset(1), headers=bearer(1))
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Old password is incorrect"
+
+
+def test_user_cannot_reset_another_account(client):
+    assert client.post(URL, json=reset(2), headers=bearer(1)).status_code == 403
+
+
+def test_admin_cannot_reset_another_admin(client):
+    response = client.post(URL, json=reset(OTHER_ADMIN_ID), headers=bearer(ADMIN_ID))
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Only super_admin can reset an admin's password"
+
+
+def test_unknown_email_is_hidden_from_non_admins(client):
+    body = {"email": "nobody@example.com", "new_password": "new-secret"}
+    assert client.post(URL, json=body, headers=bearer(1)).status_code == 403
+    assert client.post(URL, json=body, headers=bearer(ADMIN_ID)).status_code == 404
@@ -0,0 +1,60 @@
+# ttl_cache.py
+# A small thread-safe LRU cache whose entries also expire after a time-to-live
+
+import threading  # Lock protecting the cache across threadpool workers
+import time  # Monotonic clock used for expiry
+from collections import OrderedDict  # Keeps keys in least-recently-used order
+
+# Sentinel returned internally when a key is absent
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize  # Maximum number of entries before the LRU entry is evicted
+        self.ttl = ttl  # Default lifetime of an entry in seconds
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0  # Number of lookups answered from the cache
+        self.misses = 0  # Number of lookups that fell through (absent or expired)
+
+    def get(self, key, default=None):
+        # Return the cached value, or default when absent or expired
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)  # Mark as most recently used
+                    self.hits += 1
+                    return value
+                del self._data[key]  # Drop the expired entry
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float | None = None):
+        # Store a value, optionally with a shorter lifetime than the default
+        lifetime = self.ttl if ttl is None else min(ttl, self.ttl)
+        if lifetime <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + lifetime, value)
+            self._data.move_to_end(key)
+            # Evict least recently used entries beyond the size bound
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        # Remove a key if present
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        # Remove every entry (counters are kept)
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        # Snapshot of the cache counters
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}